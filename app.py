@@ -1,10 +1,5 @@
-import gspread
-from google.oauth2.service_account import Credentials
-
 import streamlit as st
-import sys, os, datetime, re
-import pandas as pd
-from streamlit_gsheets import GSheetsConnection
+import sys, os, datetime
 
 # -------------------------------
 # 0. 페이지 기본 설정
@@ -15,69 +10,206 @@ st.set_page_config(page_title="곱셈·인수분해 공식 연습", layout="cent
 # 1. 모듈 로드 및 연결 설정
 # -------------------------------
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# sympy / gspread 같은 무거운 모듈은 로그인 화면을 그린 뒤 워밍업 스레드가 불러온다
 try:
-    from quizgen import basic_formulas as bf
+    from quizgen import answer_input as qanswer
+    from quizgen import bank as qbank
+    from quizgen import record as qrecord
+    from quizgen import sampler as qsampler
+    from services import media
+    from services import metrics
+    from services import session_store
+    from services import storage
+    from services.prefetch import ProblemPrefetcher
+    from services.startup import Warmup
 except ImportError:
     st.error("quizgen 모듈을 찾을 수 없습니다.")
     st.stop()
 
-# 구글 시트 연결
-try:
-    conn = st.connection("gsheets", type=GSheetsConnection)
-except Exception as e:
-    st.error(f"구글 시트 연결 실패: {e}")
-    st.stop()
+# 사용자/기록 저장소 (secrets.toml 의 [storage] 로 구글 시트 또는 로컬 SQLite 를 고른다)
+@st.cache_resource
+def get_storage():
+    # 구글 시트면 클라이언트, 로그인 색인(60초 캐시), 로그 스풀을 프로세스 전체에서 공유
+    return storage.from_secrets(st.secrets, os.path.dirname(os.path.abspath(__file__)))
+
+@st.cache_resource
+def get_warmup():
+    return Warmup()
+
+get_warmup()
+
+# 세션 진행 상태 공유 저장소 (secrets.toml 의 [session_store], 기본은 로컬 SQLite).
+# 워커를 여러 개 띄워도 다시 연결된 학생이 다른 워커에서 이어서 푼다
+@st.cache_resource
+def get_session_store():
+    return session_store.from_config(session_store.config_from(st.secrets),
+                                     os.path.dirname(os.path.abspath(__file__)))
+
+# 구간 시간 측정 (secrets.toml 의 [metrics] enabled = true 또는 MATHAPP_METRICS=1 일 때만)
+@st.cache_resource
+def get_metrics():
+    config = metrics.config_from(st.secrets)
+    if not config.get("enabled"):
+        return None
+    metrics.enable()
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    textfile = config.get("textfile")
+    return metrics.Exporter(textfile=os.path.join(base_dir, textfile) if textfile else None,
+                            port=config.get("port"), interval=config.get("interval", 15.0))
+
+get_metrics()
+metrics.begin_rerun()
 
 # -------------------------------
 # 2. 유틸리티 함수
 # -------------------------------
-def normalize_login_data(value):
-    if pd.isna(value): return ""
-    value = str(value).strip()
-    try:
-        num_val = float(value)
-        if num_val.is_integer(): value = str(int(num_val))
-    except: pass
-    if value.startswith("'"): value = value[1:]
-    value = re.sub(r"[\s\u200b\u200c\u200d\ufeff]+", "", value)
-    return value
+# st.stop / st.rerun 은 예외로 스크립트를 끝내므로, rerun 시간을 재려면 이것을 거친다
+def stop():
+    save_progress()
+    metrics.end_rerun()
+    st.stop()
+
+def rerun():
+    save_progress()
+    metrics.end_rerun()
+    st.rerun()
+
+# 공유 저장소에 두는 진행 기록 (current_problem 은 정수 3개로 따로, 위젯은 key 로 같이 되살린다)
+PROGRESS_KEYS = ("user_name", "current_type", "correct_count", "wrong_count", "show_answer",
+                 "problem_seed", "problem_cursors", "option", "direction", "answer_mode")
+
+def save_progress():
+    # rerun 이 끝날 때마다 대기 목록에 넣기만 한다 (바뀐 것이 없으면 아무것도 안 함, 쓰기는 백그라운드)
+    store = get_session_store()
+    if store is None or not st.session_state.get("session_id"):
+        return
+    record = {key: st.session_state.get(key) for key in PROGRESS_KEYS}
+    problem = st.session_state.current_problem
+    record["current_problem"] = None if problem is None else [problem.type_id, problem.index, problem.perm]
+    store.save(st.session_state.session_id, record)
+
+def start_session(user_name):
+    # 로그인할 때: 주소의 ?sid= 기록이 같은 학생의 것이면 진행 상태를 이어받고 (다시 연결 / 다른 워커),
+    # 아니면 새 세션 키를 주소에 붙인다. 키만으로는 로그인되지 않는다 (주소가 새어도 비밀번호가 필요)
+    store = get_session_store()
+    if store is None:
+        return
+    sid = st.query_params.get("sid")
+    record = None
+    if sid:
+        try:
+            record = store.load(sid)
+        except Exception:
+            record = None  # 저장소에 닿지 않으면 처음부터
+    if record is None or record.get("user_name") != user_name:
+        st.session_state.session_id = session_store.new_session_id()
+        st.query_params["sid"] = st.session_state.session_id
+        return
+    for key in PROGRESS_KEYS:
+        if record.get(key) is not None:
+            st.session_state[key] = record[key]
+    problem = record.get("current_problem")
+    st.session_state.current_problem = qrecord.ProblemRecord(*problem) if problem else None
+    st.session_state.session_id = sid
 
 def append_log(result_text):
     try:
-        # 1. 권한 설정 (secrets에서 직접 가져오기)
-        scope = ["https://www.googleapis.com/auth/spreadsheets"]
-        # secrets.toml의 구조에 따라 st.secrets.connections.gsheets 또는 st.secrets["connections"]["gsheets"] 사용
-        s = st.secrets["connections"]["gsheets"]
-        
-        credentials = Credentials.from_service_account_info({
-            "project_id": s["project_id"],
-            "private_key": s["private_key"],
-            "client_email": s["client_email"],
-            "token_uri": s["token_uri"],
-        }, scopes=scope)
-        
-        # 2. 시트 열기
-        gc = gspread.authorize(credentials)
-        # URL로 직접 열기 (가장 확실함)
-        sh = gc.open_by_url(s["spreadsheet"])
-        worksheet = sh.worksheet("logs")
-        
         # 3. 데이터 추가 (순서: timestamp, name, type, result)
         now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         row = [now, st.session_state.user_name, st.session_state.current_type, result_text]
-        worksheet.append_row(row)
+        with metrics.span("append_log"):
+            get_storage().append_log(row)
         
     except Exception as e:
         st.sidebar.error(f"최종 기록 실패: {e}")
 
-def make_problem(option):
-    mapping = {
-        "완전제곱식": bf.generate_type1_expansion,
-        "합차공식": bf.generate_type2_expansion,
-        "(x+a)(x+b)": bf.generate_type3_expansion,
-        "(ax+b)(cx+d)": bf.generate_type4_expansion,
-    }
-    return mapping.get(option, lambda: None)()
+@st.cache_resource
+def load_problem_bank():
+    # 미리 계산된 문제 은행 (python -m quizgen.bank 로 생성), 없으면 None
+    return qbank.load_bank()
+
+@st.cache_resource
+def get_renderer():
+    # 세션에는 ProblemRecord(정수 3개)만 두고, 화면용 LaTeX 는 모든 세션이 같이 쓰는 캐시에서 꺼낸다
+    # (문제 은행 파일이 없으면 템플릿으로 만든다)
+    return qrecord.RecordRenderer(load_problem_bank())
+
+BANK_TYPES = {
+    "완전제곱식": "type1",
+    "합차공식": "type2",
+    "(x+a)(x+b)": "type3",
+    "(ax+b)(cx+d)": "type4",
+}
+# 문제 종류 → (문제 은행 유형 뒷부분, 직접 입력 답이 갖춰야 할 꼴)
+DIRECTIONS = {
+    "전개": ("expansion", "expanded"),
+    "인수분해": ("factorization", "factored"),
+}
+
+def make_problem(problem_type, seed, cursor):
+    # 세션 시드로 만든 순열의 cursor 번째 문제 (공간을 다 돌기 전에는 겹치지 않음, 수 µs)
+    with metrics.span("make_problem"):
+        return qsampler.record_at(problem_type, seed, cursor)
+
+@st.cache_resource
+def get_prefetcher():
+    # 다음 문제 레코드는 스크립트 스레드가 뽑고, 공용 스레드 풀은 렌더러 캐시만 미리 채운다
+    # (보기 LaTeX + 직접 입력 채점용 정답. stats["empty"] 로 큐 크기 조절)
+    renderer = get_renderer()
+
+    def warm(record):
+        renderer.render(record)
+        renderer.answer_poly(record)
+
+    return ProblemPrefetcher(warm)
+
+def next_problem(problem_type):
+    # 유형마다 정수 커서 하나만 세션에 둔다 (같은 시드 + 커서면 그 자리에서 이어서 뽑는다)
+    cursors = st.session_state.problem_cursors
+    cursor = cursors.get(problem_type, 0)
+    cursors[problem_type] = cursor + 1
+    st.session_state.pop("answer_text", None)  # 직접 입력 칸 비우기
+    seed = st.session_state.problem_seed
+    record = make_problem(problem_type, seed, cursor)
+    # 그다음 문제들은 커서를 옮기지 않고 앞서 읽기만 해서 미리 그리도록 맡긴다
+    upcoming = [qsampler.record_at(problem_type, seed, c)
+                for c in range(cursor + 1, cursor + 1 + get_prefetcher().depth)]
+    st.session_state.problem_queue.pop(record, upcoming)
+    return record
+
+@st.cache_resource
+def get_media():
+    # 힌트 영상 매니페스트 (경로/크기/해시) 를 프로세스가 뜰 때 한 번 만든다.
+    # 정적 제공(.streamlit/config.toml)이 켜져 있으면 영상은 /app/static 주소로 나간다
+    return media.MediaLibrary(os.path.dirname(os.path.abspath(__file__)), tuple(BANK_TYPES),
+                              static_serving=st.get_option("server.enableStaticServing"))
+
+get_media()
+
+def show_video(option):
+    # rerun 마다 파일을 찾거나 읽지 않고 매니페스트의 주소만 넘긴다. 영상이 없으면 False
+    video = get_media().video(option)
+    if video is None:
+        return False
+    st.video(video)
+    return True
+
+def sympy_grade(record, text, form):
+    # polyparse 가 못 읽는 입력(소수 등)만 기존 sympy 채점기로 (sympy 는 여기서 처음 필요).
+    # 기존 채점기는 값만 비교하므로 답의 꼴(전개 / 인수분해)은 여기서 먼저 확인한다
+    from sympy import expand
+    from quizgen import basic_formulas as bf
+    from quizgen import guard
+    try:
+        user_expr = guard.parse(bf.normalize_input(text), bf.allowed, bf.transformations, global_dict={})
+        if (expand(user_expr) == user_expr) != (form == "expanded"):
+            return False
+    except Exception:
+        return False
+    problem = get_renderer().sympy_problem(record)
+    if record.problem_type.endswith("_expansion"):
+        return bf.check_expansion_answer(text, problem["answer_obj"])
+    return bf.check_factor_answer(text, problem["expanded_obj"])
 
 # -------------------------------
 # 3. 상태 초기화
@@ -90,6 +222,12 @@ if "logged_in" not in st.session_state:
     st.session_state.correct_count = 0
     st.session_state.wrong_count = 0
     st.session_state.show_answer = False
+    st.session_state.problem_seed = int.from_bytes(os.urandom(8), "little")
+    st.session_state.problem_cursors = {}
+    st.session_state.problem_queue = get_prefetcher().new_queue()
+    # 직접 입력 답안의 파싱 결과 (rerun 마다 같은 입력을 다시 파싱하지 않는다)
+    st.session_state.answer_cache = qanswer.AnswerParseCache()
+    st.session_state.session_id = ""
 
 # -------------------------------
 # 4. 로그인 UI
@@ -100,42 +238,73 @@ if not st.session_state.logged_in:
     input_name = st.text_input("이름")
     input_pw = st.text_input("비밀번호", type="password")
     if st.button("로그인", use_container_width=True):
-        df_users = conn.read(worksheet="users", ttl=0)
-        in_n = normalize_login_data(input_name)
-        in_p = normalize_login_data(input_pw)
-        matched = df_users[
-            (df_users["name"].apply(normalize_login_data) == in_n) &
-            (df_users["password"].apply(normalize_login_data) == in_p)
-        ]
-        if not matched.empty:
+        try:
+            with metrics.span("login"):
+                matched_name = get_storage().find_user(input_name, input_pw)
+        except Exception as e:
+            st.error(f"저장소 연결 실패: {e}")
+            stop()
+        if matched_name is not None:
             st.session_state.logged_in = True
-            st.session_state.user_name = matched.iloc[0]["name"]
-            st.rerun()
+            st.session_state.user_name = matched_name
+            start_session(matched_name)
+            rerun()
         else:
             st.error("이름 또는 비밀번호가 틀렸습니다.")
-    st.stop()
+    stop()
 
 # -------------------------------
 # 5. 메인 UI 및 문제 풀이
 # -------------------------------
 st.title("곱셈 / 인수분해 공식 연습")
 
+try:
+    get_storage()
+except Exception as e:
+    st.error(f"저장소 연결 실패: {e}")
+    stop()
+
 with st.sidebar:
     st.write(f"👤 **{st.session_state.user_name}** 학생")
     if st.button("로그아웃"):
+        if st.session_state.session_id:
+            get_session_store().delete(st.session_state.session_id)
+            st.query_params.pop("sid", None)
         st.session_state.clear()
-        st.rerun()
+        rerun()
     st.divider()
+    # 누적 기록 (학생별 요약만 읽으므로 로그가 아무리 길어도 바로 나온다)
+    my_stats = get_storage().student_stats(st.session_state.user_name)
+    if my_stats:
+        st.caption("누적 기록")
+        for problem_type, s in my_stats.items():
+            st.caption(f"{problem_type}: 정답 {s['correct']} / 제출 {s['attempts']}")
+    # 관리자만 보는 구간 시간 (secrets.toml 의 [metrics] admins = ["이름", ...])
+    if metrics.enabled and st.session_state.user_name in metrics.config_from(st.secrets).get("admins", []):
+        with st.expander("⏱ 구간 시간 (관리자)"):
+            st.dataframe(metrics.snapshot(), hide_index=True)
+            st.caption(f"다음 문제 미리 그리기: {get_prefetcher().snapshot()}")
 
-option = st.selectbox("연습할 공식을 선택하세요:", ("완전제곱식", "합차공식", "(x+a)(x+b)", "(ax+b)(cx+d)"))
+option = st.selectbox("연습할 공식을 선택하세요:", ("완전제곱식", "합차공식", "(x+a)(x+b)", "(ax+b)(cx+d)"),
+                      key="option")
 
-if st.session_state.current_type != option:
-    st.session_state.current_type = option
-    st.session_state.current_problem = make_problem(option)
+col_direction, col_mode = st.columns(2)
+with col_direction:
+    direction = st.radio("문제 종류", tuple(DIRECTIONS), horizontal=True, key="direction")
+with col_mode:
+    answer_mode = st.radio("답 입력", ("보기 고르기", "직접 입력"), horizontal=True, key="answer_mode")
+kind, answer_form = DIRECTIONS[direction]
+problem_type = f"{BANK_TYPES[option]}_{kind}"
+# 기록의 type 칸: 전개는 예전처럼 공식 이름, 인수분해는 뒤에 붙여서 따로 센다
+type_label = option if kind == "expansion" else f"{option} 인수분해"
+
+if st.session_state.current_type != type_label:
+    st.session_state.current_type = type_label
+    st.session_state.current_problem = next_problem(problem_type)
     st.session_state.correct_count = 0
     st.session_state.wrong_count = 0
     st.session_state.show_answer = False
-    st.rerun()
+    rerun()
 
 # --- 10문제 완료 체크 ---
 if st.session_state.correct_count >= 10:
@@ -143,71 +312,88 @@ if st.session_state.correct_count >= 10:
     st.success(f"🎊 대단합니다! {st.session_state.user_name} 학생, 10문제를 모두 맞혔습니다! 🎊")
     if st.button("다시 처음부터 도전하기", type="primary", use_container_width=True):
         st.session_state.correct_count = 0
-        st.rerun()
-    st.stop()
+        rerun()
+    stop()
 
-problem = st.session_state.current_problem
+record = st.session_state.current_problem
+with metrics.span("render"):
+    problem = get_renderer().render(record) if record is not None else None
 if problem:
-    st.markdown("### 문제")
+    st.markdown("### 문제" if kind == "expansion" else "### 문제 (인수분해하세요)")
     st.latex(problem["latex_question"])
     st.progress(st.session_state.correct_count/10, text=f"현재 {st.session_state.correct_count}/10 문제 성공")
 
-    # --- 보기 출력 (정렬된 수식 버전) ---
-    st.write("정답을 고르세요:")
     choices = problem["choices"]
-    
-    # 이 부분이 강사님이 원하시던 LaTeX 정렬 버전입니다.
-    st.markdown(f'''
-    $\quad\quad ① \enspace\enspace {choices[0]}$  
-    $\quad\quad ② \enspace\enspace {choices[1]}$  
-    $\quad\quad ③ \enspace\enspace {choices[2]}$  
-    $\quad\quad ④ \enspace\enspace {choices[3]}$
-    ''')
-    st.write("")
+    if answer_mode == "보기 고르기":
+        # --- 보기 출력 (정렬된 수식 버전) ---
+        st.write("정답을 고르세요:")
+
+        # 이 부분이 강사님이 원하시던 LaTeX 정렬 버전입니다.
+        st.markdown(f'''
+        $\quad\quad ① \enspace\enspace {choices[0]}$  
+        $\quad\quad ② \enspace\enspace {choices[1]}$  
+        $\quad\quad ③ \enspace\enspace {choices[2]}$  
+        $\quad\quad ④ \enspace\enspace {choices[3]}$
+        ''')
+        st.write("")
 
     # --- 정답 처리 로직 ---
-    def handle_answer(user_choice):
-        if user_choice == problem["latex_answer"]:
+    def handle_answer(is_correct):
+        if is_correct:
             append_log("정답")
             st.session_state.correct_count += 1
             st.session_state.wrong_count = 0
-            st.session_state.current_problem = make_problem(option)
+            st.session_state.current_problem = next_problem(problem_type)
             st.success("정답입니다! 🎉")
-            st.rerun()
+            rerun()
         else:
             st.session_state.wrong_count += 1
             append_log(f"오답({st.session_state.wrong_count}차)")
             if st.session_state.wrong_count >= 3:
                 st.session_state.show_answer = True
-            st.rerun()
+            rerun()
 
     # --- UI 분기: 일반 상황 vs 3번 틀린 상황 ---
     if st.session_state.show_answer:
         st.error(f"오답입니다! (3/3)")
         st.warning(f"정답: $ {problem['latex_answer']} $")
         
-        video_path = f"media/{option}.mp4"
-        if os.path.exists(video_path):
-            st.video(video_path)
+        if show_video(option):
             st.info("💡 설명을 보고 '공부 완료' 버튼을 누르세요.")
         
         if st.button("공부 완료! 다음 문제 풀기", type="primary", use_container_width=True):
             st.session_state.show_answer = False
             st.session_state.wrong_count = 0
-            st.session_state.current_problem = make_problem(option)
-            st.rerun()
-    else:
+            st.session_state.current_problem = next_problem(problem_type)
+            rerun()
+    elif answer_mode == "보기 고르기":
         # 일반 버튼 UI
         cols = st.columns(4)
         for i, col in enumerate(cols):
             with col:
                 if st.button(f"{['①','②','③','④'][i]}", key=f"btn_{i}", use_container_width=True):
-                    handle_answer(choices[i])
-        
-        # 1~2회 오답 시 힌트와 영상 노출
-        if 0 < st.session_state.wrong_count < 3:
-            st.error(f"오답입니다! ({st.session_state.wrong_count}/3)")
-            video_path = f"media/{option}.mp4"
-            if os.path.exists(video_path):
-                st.video(video_path)
+                    handle_answer(choices[i] == problem["latex_answer"])
+    else:
+        # 직접 입력: rerun 마다 입력을 확인해서 문법 오류나 미리보기를 보여 준다 (세션별 파싱 캐시)
+        answer_text = st.text_input("답을 입력하세요 (예: x^2+6x+9, (x+3)^2)", key="answer_text")
+        check = st.session_state.answer_cache.validate(answer_text)
+        if check.status == qanswer.OK:
+            st.latex(check.latex)
+        elif check.status == qanswer.ERROR:
+            st.caption(f"⚠️ {check.message}")
+        elif check.status == qanswer.FALLBACK:
+            st.caption(f"미리보기를 할 수 없는 입력입니다 ({check.message}). 제출하면 채점합니다.")
+        if st.button("제출", type="primary", use_container_width=True,
+                     disabled=check.status in (qanswer.EMPTY, qanswer.ERROR)):
+            with metrics.span("grade"):
+                is_correct = qanswer.grade(check, get_renderer().answer_poly(record), answer_form,
+                                           fallback=lambda text: sympy_grade(record, text, answer_form))
+            handle_answer(is_correct)
+
+    # 1~2회 오답 시 힌트와 영상 노출 (보기 고르기 / 직접 입력 모두)
+    if 0 < st.session_state.wrong_count < 3:
+        st.error(f"오답입니다! ({st.session_state.wrong_count}/3)")
+        show_video(option)
 
+save_progress()
+metrics.end_rerun()
@@ -0,0 +1,140 @@
+from collections import OrderedDict
+
+from quizgen import limits
+from quizgen import polyparse
+
+# -------------------------------
+# 직접 입력 답안: 입력 확인 + 미리보기 + 채점 (세션별 파싱 캐시)
+# -------------------------------
+# Streamlit 은 입력이 바뀔 때마다 스크립트 전체를 다시 돌리므로, 같은 답안을 rerun 마다
+# 처음부터 다시 나누고 파싱하지 않도록 세션마다 AnswerParseCache 를 하나 둔다.
+#   - 정규화한 입력 → 확인 결과(Validation) 를 LRU 로 기억 (지웠다 다시 쓴 입력, 제출 시 채점)
+#   - 새 입력이 바로 전 입력과 앞부분이 같으면, 끝 위치가 그 앞부분 안에 있는 토큰은
+#     다시 쓰고 나머지 뒷부분만 토큰으로 나눈다 (polyparse.tokenize_from 참고)
+# 채점은 확인 때 만든 Node 로 바로 하므로 sympy 를 거치지 않는다 (수십 µs).
+# polyparse 가 다루지 않는 입력(소수 등)만 fallback 으로 기존 sympy 채점기에 넘긴다.
+
+MAX_LENGTH = limits.LIMITS["length"]  # guard 와 같은 제한 (guard 는 sympy 를 불러오므로 limits 를 쓴다)
+
+EMPTY, OK, ERROR, FALLBACK = "empty", "ok", "error", "fallback"
+
+
+class Validation:
+    """status: empty / ok / error(문법 오류) / fallback(제출하면 sympy 로 채점)"""
+
+    __slots__ = ("text", "status", "message", "latex", "node")
+
+    def __init__(self, text, status, message="", latex="", node=None):
+        self.text = text
+        self.status = status
+        self.message = message
+        self.latex = latex
+        self.node = node
+
+    def __repr__(self):
+        return f"Validation({self.text!r}, {self.status}, {self.message!r})"
+
+
+class AnswerParseCache:
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self._results = OrderedDict()
+        self._last_text = ""
+        self._last_spans = []  # 바로 전 입력의 [(토큰, 끝 위치)] (토큰으로 다 나눈 경우만)
+        self.stats = {"hits": 0, "misses": 0, "reused_tokens": 0, "tokenized_chars": 0}
+
+    def _tokens(self, text):
+        common = 0
+        limit = min(len(text), len(self._last_text))
+        while common < limit and text[common] == self._last_text[common]:
+            common += 1
+        spans = []
+        for span in self._last_spans:
+            if span[1] >= common:
+                break
+            spans.append(span)
+        start = spans[-1][1] if spans else 0
+        self.stats["reused_tokens"] += len(spans)
+        self.stats["tokenized_chars"] += len(text) - start
+        try:
+            spans.extend(polyparse.tokenize_from(text, start))
+        finally:
+            self._last_text = text
+            self._last_spans = spans
+        return [tok for tok, _ in spans]
+
+    def _validate(self, text):
+        if not text:
+            return Validation(text, EMPTY)
+        if len(text) > MAX_LENGTH:
+            return Validation(text, ERROR, f"입력이 너무 깁니다 ({MAX_LENGTH}자 이하)")
+        try:
+            tokens = self._tokens(text)
+            node = polyparse.parse_tokens(tokens)
+        except polyparse.ParseError as e:
+            return Validation(text, ERROR, str(e))
+        except polyparse.Unsupported as e:
+            return Validation(text, FALLBACK, str(e))
+        except Exception as e:  # 파서가 예상하지 못한 입력이라도 rerun 을 죽이지 않는다
+            return Validation(text, ERROR, f"식으로 읽을 수 없습니다 ({e})")
+        return Validation(text, OK, latex=polyparse.input_latex(tokens), node=node)
+
+    def validate(self, raw):
+        """입력 문자열 → Validation (같은 입력은 다시 파싱하지 않는다)"""
+        text = polyparse.normalize_input(raw or "")
+        result = self._results.get(text)
+        if result is not None:
+            self._results.move_to_end(text)
+            self.stats["hits"] += 1
+            return result
+        self.stats["misses"] += 1
+        result = self._results[text] = self._validate(text)
+        if len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+        return result
+
+
+def grade(validation, answer_poly, form=None, fallback=None):
+    """True/False. form 은 polyparse.check_node 와 같고, fallback(text) 는 sympy 채점"""
+    if validation.status == OK:
+        return polyparse.check_node(validation.node, answer_poly, form)
+    if validation.status == FALLBACK and fallback is not None:
+        return fallback(validation.text)
+    return False
+
+
+# -------------------------------
+# 테스트 실행
+# -------------------------------
+if __name__ == "__main__":
+    import time
+
+    answer = {(("x", 2),): 1, (("x", 1),): 6, (): 9}  # x^2 + 6x + 9 = (x+3)^2
+    cache = AnswerParseCache()
+    for s in ["", "x^2+6x+9", "(x+3)^2", "(x+3)(x + 3)", "2·3x", "x/2+1", "(x+3", "x^", "0.5x", "x^2+6y+9"]:
+        v = cache.validate(s)
+        print(f"{s!r:>16} {v.status:<8} {v.message or v.latex!r:<30} "
+              f"전개 {grade(v, answer, 'expanded')}  인수분해 {grade(v, answer, 'factored')}")
+
+    # 한 글자씩 치는 동안: 앞부분 토큰은 다시 쓰고, 같은 입력은 캐시에서
+    typed = "(3x+1)^2-(x-2)(x+2)+5x^3"
+    cache = AnswerParseCache()
+    for k in range(1, len(typed) + 1):
+        v = cache.validate(typed[:k])
+        fresh = AnswerParseCache().validate(typed[:k])
+        assert (v.status, v.message, v.latex) == (fresh.status, fresh.message, fresh.latex)
+        assert v.status != OK or v.node.poly == fresh.node.poly
+    for k in range(len(typed), 0, -1):  # 지우기
+        cache.validate(typed[:k])
+    print("타이핑 후:", cache.stats, "|", v.latex)
+
+    start = time.perf_counter()
+    N = 20_000
+    for i in range(N):
+        cache = AnswerParseCache()
+        grade(cache.validate(f"(x+{i % 7})^2"), answer, "factored")
+    print(f"입력 확인 + 채점 (캐시 없음): {(time.perf_counter() - start) / N * 1e6:.0f} µs")
+    start = time.perf_counter()
+    for i in range(N):
+        grade(cache.validate("(x+3)^2"), answer, "factored")
+    print(f"채점 (같은 입력, 캐시): {(time.perf_counter() - start) / N * 1e6:.1f} µs")
@@ -0,0 +1,212 @@
+import mmap
+import os
+import random
+import struct
+from fractions import Fraction
+
+# -------------------------------
+# 문제 은행 (미리 계산해 둔 문제 + mmap 조회)
+# -------------------------------
+# get_coeff, randint(1, 5), 변수 3개로 만들 수 있는 경우의 수는 유한하므로
+# 모든 조합을 미리 만들어 파일에 저장해 두고,
+# 앱에서는 무작위 인덱스 하나만 읽어 문제를 꺼낸다 (sympy 연산 없음).
+#
+# 파일 구조 (리틀 엔디언)
+#   헤더      : magic(4s) version(H) n_types(H) n_strings(I)
+#   유형 목록 : name(24s) first_record(I) n_records(I)  × n_types
+#   오프셋    : u32 × (n_strings + 1)
+#   문자열    : UTF-8 바이트를 이어 붙인 영역
+# 레코드 r 의 문자열은 6r ~ 6r+5 (문제, 정답, 보기 4개) 이다.
+
+MAGIC = b"QBNK"
+VERSION = 1
+STRINGS_PER_RECORD = 6
+
+_HEADER = struct.Struct("<4sHHI")
+_TYPE_ENTRY = struct.Struct("<24sII")
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "problem_bank.bin")
+
+# get_coeff 가 만들 수 있는 값 (정수 1~5 + Rational(1~3, 2~4) 를 약분한 값)
+COEFFS = sorted(
+    {Fraction(n) for n in range(1, 6)}
+    | {Fraction(p, q) for p in range(1, 4) for q in range(2, 5)}
+)
+_COEFF_INDEX = {c: i for i, c in enumerate(COEFFS)}
+VARIABLE_NAMES = ["x", "a", "b"]
+
+# 유형별 매개변수 축의 크기 (혼합 기수 인덱스로 레코드 번호를 만든다)
+PARAM_SPACES = {
+    "type1_expansion": (len(VARIABLE_NAMES), len(COEFFS), len(COEFFS)),
+    "type1_factorization": (len(VARIABLE_NAMES), len(COEFFS), len(COEFFS)),
+    "type2_expansion": (len(VARIABLE_NAMES), len(COEFFS)),
+    "type2_factorization": (len(VARIABLE_NAMES), len(COEFFS)),
+    "type3_expansion": (5, 5),
+    "type3_factorization": (5, 5),
+    "type4_expansion": (5, 5, 5, 5),
+    "type4_factorization": (5, 5, 5, 5),
+}
+PROBLEM_TYPES = list(PARAM_SPACES)
+
+
+def _sample_coeff_index():
+    """basic_formulas.get_coeff 와 같은 분포로 COEFFS 의 인덱스를 뽑는다"""
+    if random.random() < 0.3:
+        return _COEFF_INDEX[Fraction(random.randint(1, 3), random.randint(2, 4))]
+    return _COEFF_INDEX[Fraction(random.randint(1, 5))]
+
+
+def sample_params(problem_type):
+    """generate_* 함수와 같은 분포로 매개변수 인덱스 튜플을 뽑는다"""
+    if problem_type.startswith("type1"):
+        return (random.randrange(len(VARIABLE_NAMES)), _sample_coeff_index(), _sample_coeff_index())
+    if problem_type.startswith("type2"):
+        return (random.randrange(len(VARIABLE_NAMES)), _sample_coeff_index())
+    if problem_type.startswith("type3"):
+        return (random.randint(1, 5) - 1, random.randint(1, 5) - 1)
+    if problem_type.startswith("type4"):
+        return tuple(random.randint(1, 5) - 1 for _ in range(4))
+    raise KeyError(problem_type)
+
+
+def params_to_index(problem_type, params):
+    index = 0
+    for radix, p in zip(PARAM_SPACES[problem_type], params):
+        index = index * radix + p
+    return index
+
+
+def index_to_params(problem_type, index):
+    params = []
+    for radix in reversed(PARAM_SPACES[problem_type]):
+        index, p = divmod(index, radix)
+        params.append(p)
+    return tuple(reversed(params))
+
+
+def space_size(problem_type):
+    size = 1
+    for radix in PARAM_SPACES[problem_type]:
+        size *= radix
+    return size
+
+
+# -------------------------------
+# 빌드 (오프라인 전용)
+# -------------------------------
+def _build_problem(problem_type, params):
+    from sympy import Rational, Symbol
+    from quizgen import basic_formulas as bf
+
+    builder = getattr(bf, f"build_{problem_type}")
+    if problem_type.startswith(("type1", "type2")):
+        var = Symbol(VARIABLE_NAMES[params[0]])
+        coeffs = [COEFFS[i] for i in params[1:]]
+        coeffs = [c.numerator if c.denominator == 1 else Rational(c.numerator, c.denominator) for c in coeffs]
+        return builder(var, *coeffs)
+    return builder(*(p + 1 for p in params))
+
+
+def build_bank(path=DEFAULT_PATH, seed=0):
+    """모든 유형의 모든 매개변수 조합을 만들어 path 에 저장한다"""
+    random.seed(seed)  # 오답 보기 선택을 재현 가능하게
+    strings = []
+    type_entries = []
+    for problem_type in PROBLEM_TYPES:
+        first = len(strings) // STRINGS_PER_RECORD
+        n = space_size(problem_type)
+        for index in range(n):
+            problem = _build_problem(problem_type, index_to_params(problem_type, index))
+            strings.append(problem["latex_question"])
+            strings.append(problem["latex_answer"])
+            strings.extend(sorted(problem["choices"]))  # 꺼낼 때 섞으므로 파일은 정렬해 둔다
+        type_entries.append((problem_type, first, n))
+
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(type_entries), len(encoded)))
+        for name, first, n in type_entries:
+            f.write(_TYPE_ENTRY.pack(name.encode("ascii"), first, n))
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        for data in encoded:
+            f.write(data)
+    os.replace(tmp_path, path)
+    return len(encoded) // STRINGS_PER_RECORD
+
+
+# -------------------------------
+# 조회 (앱 실행 중, sympy 없음)
+# -------------------------------
+class ProblemBank:
+    """mmap 으로 연 문제 은행 파일"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_types, n_strings = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"문제 은행 파일 형식이 맞지 않습니다: {path}")
+
+        pos = _HEADER.size
+        self.types = {}
+        for _ in range(n_types):
+            name, first, n = _TYPE_ENTRY.unpack_from(self._mm, pos)
+            self.types[name.rstrip(b"\0").decode("ascii")] = (first, n)
+            pos += _TYPE_ENTRY.size
+        self._offsets_pos = pos
+        self._blob_pos = pos + 4 * (n_strings + 1)
+
+    def _string(self, i):
+        start, end = struct.unpack_from("<II", self._mm, self._offsets_pos + 4 * i)
+        return self._mm[self._blob_pos + start:self._blob_pos + end].decode("utf-8")
+
+    def strings(self, problem_type, index):
+        """(문제, 정답, 보기 4개(정렬된 순서)) 문자열 6개"""
+        first, n = self.types[problem_type]
+        if not 0 <= index < n:
+            raise IndexError(index)
+        base = (first + index) * STRINGS_PER_RECORD
+        return tuple(self._string(base + k) for k in range(STRINGS_PER_RECORD))
+
+    def get(self, problem_type, index):
+        question, answer, *choices = self.strings(problem_type, index)
+        random.shuffle(choices)
+        return {
+            "latex_question": question,
+            "latex_answer": answer,
+            "choices": choices,
+        }
+
+    def sample(self, problem_type):
+        """generate_* 와 같은 분포로 문제 하나를 꺼낸다"""
+        return self.get(problem_type, params_to_index(problem_type, sample_params(problem_type)))
+
+    def close(self):
+        self._mm.close()
+
+
+def load_bank(path=DEFAULT_PATH):
+    """파일이 없거나 형식이 다르면 None (호출한 쪽에서 실시간 생성으로 대체)"""
+    try:
+        return ProblemBank(path)
+    except (OSError, ValueError):
+        return None
+
+
+# -------------------------------
+# 빌드 실행: python -m quizgen.bank
+# -------------------------------
+if __name__ == "__main__":
+    n = build_bank()
+    bank = ProblemBank()
+    print(f"{n}개 문제 저장 완료: {DEFAULT_PATH}")
+    for problem_type in PROBLEM_TYPES:
+        print(problem_type, bank.types[problem_type], bank.sample(problem_type)["latex_question"])
@@ -1,10 +1,15 @@
 import random
-from sympy import symbols, expand, latex, Rational, factor, simplify, Integer, Symbol, Number  # 👈 Symbol, Number 추가
+from sympy import symbols, expand, Rational, factor, simplify, Integer, Symbol, Number  # 👈 Symbol, Number 추가
 from sympy.parsing.sympy_parser import (
     parse_expr,
     standard_transformations,
     implicit_multiplication_application
 )
+from quizgen import distractors
+from quizgen import guard
+from quizgen.latex_cache import latex  # sympy latex() + 공용 LRU 캐시
+from quizgen import polyparse
+from quizgen import templates as tpl
 
 # -------------------------------
 # 기본 설정
@@ -24,15 +29,9 @@ allowed = {
 
 
 # -------------------------------
-# 입력 정규화
+# 입력 정규화 (sympy 없이도 쓰도록 polyparse 에 있다)
 # -------------------------------
-def normalize_input(s: str) -> str:
-    return (s.replace("−", "-")   # 유니코드 마이너스
-              .replace("–", "-")
-              .replace("×", "*")
-              .replace("·", "*")
-              .replace("^", "**")
-              .replace(" ", ""))
+normalize_input = polyparse.normalize_input
 
 # -------------------------------
 # 계수 생성
@@ -43,7 +42,11 @@ def get_coeff():
     return random.randint(1, 5)
 
 def generate_choices(correct_obj):
-    """정답 객체를 받아 LaTeX 형태의 선택지 4개를 반환 (정답 1 + 오답 3)"""
+    """정답 객체를 받아 LaTeX 형태의 선택지 4개를 반환 (정답 1 + 오답 3)
+
+    이전 방식 (simplify 사용). 문제 생성기는 distractors.make_choices 를 쓰고,
+    이 함수는 sympy 식만 가진 호출자와 성능 비교용으로 남겨 둔다.
+    """
     choices = set()
     correct_latex = latex(correct_obj)
     choices.add(correct_latex)
@@ -74,138 +77,119 @@ def generate_choices(correct_obj):
     random.shuffle(final_choices) # 순서 섞기
     return final_choices
 
+def _expansion_problem(template, var_names, args):
+    problem = tpl.make_problem(template, var_names, args, expansion=True)
+    problem["choices"] = distractors.make_choices(template, var_names, args, expansion=True)
+    return problem
+
+def _factorization_problem(template, var_names, args):
+    problem = tpl.make_problem(template, var_names, args, expansion=False)
+    problem["choices"] = distractors.make_choices(template, var_names, args, expansion=False)
+    return problem
+
 
 # -------------------------------
 # 1. 완전제곱식
 # -------------------------------
+def build_type1_expansion(var, c1, c2):
+    # (c1*var + c2)**2
+    return _expansion_problem(tpl.SQUARE, [var.name], (c1, c2))
+
+def build_type1_factorization(var, c1, c2):
+    return _factorization_problem(tpl.SQUARE, [var.name], (c1, c2))
+
 def generate_type1_expansion():
     var = random.choice(variables)
     c1 = get_coeff()
     c2 = get_coeff()
-    expr = (c1*var + c2)**2
-    expanded = expand(expr)
-    return {
-        "latex_question": latex(expr),
-        "answer_obj": expand(expr),
-        "latex_answer": latex(expand(expr)),
-        "choices": generate_choices(expanded) 
-    }
+    return build_type1_expansion(var, c1, c2)
 
 def generate_type1_factorization():
     var = random.choice(variables)
     c1 = get_coeff()
     c2 = get_coeff()
-    expr = (c1*var + c2)**2
-    expanded = expand(expr)
-    return {
-        "latex_question": latex(expanded),
-        "answer_obj": expr,
-        "latex_answer": latex(expr),
-        "expanded_obj": expanded,
-        "choices": generate_choices(expr)
-    }
+    return build_type1_factorization(var, c1, c2)
 
 # -------------------------------
 # 2. 합차공식
 # -------------------------------
+def build_type2_expansion(var, c1):
+    # (var + c1)*(var - c1)
+    return _expansion_problem(tpl.SUM_DIFF, [var.name], (c1,))
+
+def build_type2_factorization(var, c1):
+    return _factorization_problem(tpl.SUM_DIFF, [var.name], (c1,))
+
 def generate_type2_expansion():
     var = random.choice(variables)
     c1 = get_coeff()
-    expr = (var + c1)*(var - c1)
-    expanded = expand(expr)
-    return {
-        "latex_question": latex(expr),
-        "answer_obj": expand(expr),
-        "latex_answer": latex(expand(expr)),
-        "choices": generate_choices(expanded)
-    }
+    return build_type2_expansion(var, c1)
 
 def generate_type2_factorization():
     var = random.choice(variables)
     c1 = get_coeff()
-    expr = (var + c1)*(var - c1)
-    expanded = expand(expr)
-    return {
-        "latex_question": latex(expanded),
-        "answer_obj": expr,
-        "latex_answer": latex(expr),
-        "expanded_obj": expanded,
-        "choices": generate_choices(expr)
-    }
+    return build_type2_factorization(var, c1)
 
 # -------------------------------
 # 3. (x+a)(x+b)
 # -------------------------------
+def build_type3_expansion(a_val, b_val):
+    # (x + a_val) * (x + b_val)
+    return _expansion_problem(tpl.TWO_LINEAR, ["x"], (1, a_val, 1, b_val))
+
+def build_type3_factorization(a_val, b_val):
+    return _factorization_problem(tpl.TWO_LINEAR, ["x"], (1, a_val, 1, b_val))
+
 def generate_type3_expansion():
     a_val = random.randint(1, 5)
     b_val = random.randint(1, 5)
-    expr = (x + a_val) * (x + b_val)
-    expanded = expand(expr)
-    return {
-        "latex_question": latex(expr),
-        "answer_obj": expand(expr),
-        "latex_answer": latex(expand(expr)),
-        "choices": generate_choices(expanded)
-    }
+    return build_type3_expansion(a_val, b_val)
 
 def generate_type3_factorization():
     a_val = random.randint(1, 5)
     b_val = random.randint(1, 5)
-    expr = (x + a_val) * (x + b_val)
-    expanded = expand(expr)
-    return {
-        "latex_question": latex(expanded),
-        "answer_obj": expr,
-        "latex_answer": latex(expr),
-        "expanded_obj": expanded,
-        "choices": generate_choices(expr)
-    }
+    return build_type3_factorization(a_val, b_val)
 
 # -------------------------------
 # 4. (ax+b)(cx+d)
 # -------------------------------
+def build_type4_expansion(a_val, b_val, c_val, d_val):
+    # (a_val*x + b_val) * (c_val*x + d_val)
+    return _expansion_problem(tpl.TWO_LINEAR, ["x"], (a_val, b_val, c_val, d_val))
+
+def build_type4_factorization(a_val, b_val, c_val, d_val):
+    return _factorization_problem(tpl.TWO_LINEAR, ["x"], (a_val, b_val, c_val, d_val))
+
 def generate_type4_expansion():
     a_val = random.randint(1, 5)
     b_val = random.randint(1, 5)
     c_val = random.randint(1, 5)
     d_val = random.randint(1, 5)
-    expr = (a_val*x + b_val) * (c_val*x + d_val)
-    expanded = expand(expr)
-    return {
-        "latex_question": latex(expr),
-        "answer_obj": expand(expr),
-        "latex_answer": latex(expand(expr)),
-        "choices": generate_choices(expanded)
-    }
+    return build_type4_expansion(a_val, b_val, c_val, d_val)
 
 def generate_type4_factorization():
     a_val = random.randint(1, 5)
     b_val = random.randint(1, 5)
     c_val = random.randint(1, 5)
     d_val = random.randint(1, 5)
-    expr = (a_val*x + b_val) * (c_val*x + d_val)
-    expanded = expand(expr)
-    return {
-        "latex_question": latex(expanded),
-        "answer_obj": expr,
-        "latex_answer": latex(expr),
-        "expanded_obj": expanded,
-        "choices": generate_choices(expr)
-    }
+    return build_type4_factorization(a_val, b_val, c_val, d_val)
 
 # -------------------------------
 # 채점 로직
 # -------------------------------
 def check_expansion_answer(user_input_str, answer_obj):
+    """answer_obj: sympy 식 또는 polyparse 의 {단항식: 계수} 표현"""
     try:
         processed_input = normalize_input(user_input_str)
-        user_expr = parse_expr(
-            processed_input,
-            transformations=transformations,
-            local_dict=allowed,
-            global_dict={},
-            evaluate=True
-        )
+        # 학생들이 쓰는 입력은 전용 파서로 바로 채점하고, 파서 밖의 입력만 sympy 로
+        guard.check_length(processed_input)
+        result = polyparse.fast_check(processed_input, answer_obj)
+        if result is not None:
+            return result
+        if isinstance(answer_obj, dict):
+            answer_obj = polyparse.poly_to_sympy(answer_obj)
+        # sympy 로 넘기기 전에 길이/노드 수/지수/전개 항 수를 확인 (넘으면 GuardRejected → 오답)
+        user_expr = guard.parse(processed_input, allowed, transformations, global_dict={})
         if user_expr.free_symbols - answer_obj.free_symbols:
             return False
         return user_expr.equals(answer_obj)
@@ -214,15 +198,17 @@ def check_expansion_answer(user_input_str, answer_obj):
         return False
 
 def check_factor_answer(user_input_str, expanded_expr):
+    """expanded_expr: sympy 식 또는 polyparse 의 {단항식: 계수} 표현"""
     try:
         processed_input = normalize_input(user_input_str)
-        user_expr = parse_expr(
-            processed_input,
-            transformations=transformations,
-            local_dict=allowed,
-            global_dict={},
-            evaluate=True
-        )
+        guard.check_length(processed_input)
+        result = polyparse.fast_check(processed_input, expanded_expr)
+        if result is not None:
+            return result
+        if isinstance(expanded_expr, dict):
+            expanded_expr = polyparse.poly_to_sympy(expanded_expr)
+        # sympy 로 넘기기 전에 길이/노드 수/지수/전개 항 수를 확인 (넘으면 GuardRejected → 오답)
+        user_expr = guard.parse(processed_input, allowed, transformations, global_dict={})
         if user_expr.free_symbols - expanded_expr.free_symbols:
             return False
         correct = factor(expanded_expr)
@@ -0,0 +1,166 @@
+from fractions import Fraction
+
+import numpy as np
+
+from quizgen import bank as qbank
+from quizgen import distractors
+from quizgen import templates as tpl
+
+# -------------------------------
+# 대량 문제 생성 (seed 고정, NumPy 로 한 번에)
+# -------------------------------
+# generate_batch("type1_expansion", 100_000, seed=7) 은 n 문제의 계수를
+# NumPy 배열로 한 번에 뽑는다 (get_coeff 의 30% 분수 분기 포함, 약분까지).
+# 결과는 열(column) 단위로 보관하고, LaTeX 는 꺼내는 문제만 템플릿으로 그린다.
+# 같은 seed 면 항상 같은 문제가 같은 순서로 나온다.
+
+# 유형별 (템플릿, 매개변수 이름) : generate_* 와 같은 공식
+_TYPES = {
+    "type1": (tpl.SQUARE, ("c1", "c2")),
+    "type2": (tpl.SUM_DIFF, ("c1",)),
+    "type3": (tpl.TWO_LINEAR, ("a", "b")),
+    "type4": (tpl.TWO_LINEAR, ("a", "b", "c", "d")),
+}
+
+
+def _sample_coeffs(rng, n):
+    """get_coeff 와 같은 분포: 70% 정수 1~5, 30% 분수 (1~3)/(2~4) 를 약분"""
+    is_fraction = rng.random(n) < 0.3
+    numer = np.where(is_fraction, rng.integers(1, 4, n), rng.integers(1, 6, n))
+    denom = np.where(is_fraction, rng.integers(2, 5, n), 1)
+    g = np.gcd(numer, denom)
+    return numer // g, denom // g
+
+
+def _number(numer, denom):
+    return int(numer) if denom == 1 else Fraction(int(numer), int(denom))
+
+
+class ProblemBatch:
+    """generate_batch 결과 (열 단위)
+
+    numer, denom : (n, 매개변수 개수) 정수 배열. 계수 = numer / denom
+    var_index    : (n,) 정수 배열. bank.VARIABLE_NAMES 의 인덱스 (type3/4 는 모두 x)
+    """
+
+    def __init__(self, problem_type, numer, denom, var_index, seed=None):
+        family, _, kind = problem_type.partition("_")
+        self.problem_type = problem_type
+        self.template, self.param_names = _TYPES[family]
+        self.expansion = kind == "expansion"
+        self.numer = numer
+        self.denom = denom
+        self.var_index = var_index
+        self.seed = seed
+
+    def __len__(self):
+        return len(self.var_index)
+
+    def columns(self):
+        """{매개변수 이름: 분자 배열, 이름_den: 분모 배열, var_index: ...}"""
+        cols = {"var_index": self.var_index}
+        for k, name in enumerate(self.param_names):
+            cols[name] = self.numer[:, k]
+            cols[f"{name}_den"] = self.denom[:, k]
+        return cols
+
+    def values(self):
+        """계수를 float 배열 (n, 매개변수 개수) 로"""
+        return self.numer / self.denom
+
+    # -------------------------------
+    # 문제 하나 꺼내기 (여기서 처음 LaTeX 를 그린다)
+    # -------------------------------
+    def _args(self, i):
+        coeffs = [_number(n, d) for n, d in zip(self.numer[i], self.denom[i])]
+        if self.template is tpl.TWO_LINEAR and len(coeffs) == 2:
+            return (1, coeffs[0], 1, coeffs[1])  # (x + a)(x + b)
+        return tuple(coeffs)
+
+    def _names(self, i):
+        return [qbank.VARIABLE_NAMES[self.var_index[i]]]
+
+    def latex_question(self, i):
+        args = self._args(i)
+        if self.expansion:
+            return self.template.latex_factored(self._names(i), *args)
+        return self.template.latex_expanded(self._names(i), *args)
+
+    def latex_answer(self, i):
+        args = self._args(i)
+        if self.expansion:
+            return self.template.latex_expanded(self._names(i), *args)
+        return self.template.latex_factored(self._names(i), *args)
+
+    def problem(self, i, choices=True):
+        """generate_* 와 같은 모양의 문제 딕셔너리. 보기도 (seed, i) 로 고정된다"""
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        i %= len(self)
+        names, args = self._names(i), self._args(i)
+        problem = tpl.make_problem(self.template, names, args, self.expansion)
+        if choices:
+            problem["choices"] = distractors.make_choices(
+                self.template, names, args, self.expansion, seed=f"{self.seed}:{i}")
+        return problem
+
+    def __getitem__(self, i):
+        return self.problem(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.problem(i)
+
+    def iter_latex(self, start=0, stop=None):
+        """(문제 LaTeX, 정답 LaTeX) 를 차례로 (보기 없이, 학습지용)"""
+        for i in range(start, len(self) if stop is None else min(stop, len(self))):
+            yield self.latex_question(i), self.latex_answer(i)
+
+
+def generate_batch(problem_type, n, seed=None):
+    """problem_type: bank.PROBLEM_TYPES 중 하나 (예: "type1_expansion")"""
+    family = problem_type.partition("_")[0]
+    if problem_type not in qbank.PROBLEM_TYPES:
+        raise KeyError(problem_type)
+    if seed is None:
+        # 한 번 뽑아 두어야 보기 순서(seed:i)도 매번 달라지고, batch.seed 로 다시 만들 수 있다
+        seed = np.random.SeedSequence().entropy
+    rng = np.random.default_rng(seed)
+
+    if family in ("type1", "type2"):
+        var_index = rng.integers(0, len(qbank.VARIABLE_NAMES), n)
+        n_params = 2 if family == "type1" else 1
+        pairs = [_sample_coeffs(rng, n) for _ in range(n_params)]
+        numer = np.stack([p[0] for p in pairs], axis=1)
+        denom = np.stack([p[1] for p in pairs], axis=1)
+    else:
+        var_index = np.zeros(n, dtype=np.int64)  # 항상 x
+        n_params = 2 if family == "type3" else 4
+        numer = rng.integers(1, 6, (n, n_params))
+        denom = np.ones((n, n_params), dtype=np.int64)
+    return ProblemBatch(problem_type, numer, denom, var_index, seed)
+
+
+# -------------------------------
+# 테스트 실행
+# -------------------------------
+if __name__ == "__main__":
+    import time
+
+    for problem_type in qbank.PROBLEM_TYPES:
+        start = time.perf_counter()
+        batch = generate_batch(problem_type, 100_000, seed=7)
+        elapsed = time.perf_counter() - start
+        again = generate_batch(problem_type, 100_000, seed=7)
+        same = np.array_equal(batch.numer, again.numer) and np.array_equal(batch.denom, again.denom) \
+            and np.array_equal(batch.var_index, again.var_index)
+        print(f"{problem_type:<22} 100,000문제 {elapsed * 1e3:6.1f} ms  같은 seed 재현: {same}  "
+              f"예: {batch.latex_question(0)}  →  {batch.latex_answer(0)}")
+
+    batch = generate_batch("type1_expansion", 100_000, seed=7)
+    share = float(np.mean(batch.denom != 1))
+    print(f"분수 계수 비율: {share:.3f} (약분 후, 기대값 0.3 × 7/9 ≈ 0.233)")
+    unseeded = [generate_batch("type3_expansion", 1) for _ in range(2)]
+    assert unseeded[0].seed != unseeded[1].seed and unseeded[0].seed is not None
+    problem = batch[3]
+    print("문제 하나:", problem["latex_question"], problem["choices"])
@@ -0,0 +1,252 @@
+import gc
+import json
+import platform
+import random
+import sys
+import time
+
+from sympy import factor
+
+from quizgen import bank as qbank
+from quizgen import basic_formulas as bf
+from quizgen import batch
+from quizgen import cubic
+from quizgen import factorization
+from quizgen import square_binomial
+from quizgen import sumdiff
+
+# -------------------------------
+# 문제 생성 / 채점 벤치마크
+# -------------------------------
+# 모든 generate_*, generate_choices, 채점 함수, 예전 모듈(square_binomial, sumdiff,
+# factorization), 세제곱 공식(cubic) 과 문제 은행 조회(앱이 rerun 마다 타는 경로)를 고정 seed 로
+# 한 번씩 호출하며 걸린 시간을 잰다. 결과는 호출당 백분위(µs)와 초당 처리량.
+#
+#   python -m quizgen.benchmark --output bench.json              # 측정 + JSON 저장
+#   python -m quizgen.benchmark --baseline bench.json            # 저장한 결과와 비교
+#
+# 비교할 때 p50 이 기준보다 tolerance 이상 (그리고 min_delta_us 이상) 느려진
+# 항목이 하나라도 있으면 목록을 출력하고 종료 코드 1 로 끝난다.
+
+SEED = 1234
+PERCENTILES = (50, 90, 99)
+
+
+# -------------------------------
+# 채점 입력 만들기 (측정 전에 미리)
+# -------------------------------
+def _expansion_inputs(problem, fallback=False):
+    answer = problem["answer_obj"]
+    if fallback:
+        return [str(answer) + "+x**17-x**17"]   # 전용 파서 범위 밖 (지수 > 16) → sympy 로
+    return [str(answer), str(answer + 1)]      # 정답, 오답 (전용 파서)
+
+
+def _factor_inputs(problem, fallback=False):
+    expanded = problem["expanded_obj"]
+    if fallback:
+        return [str(factor(expanded)) + "+x**17-x**17"]
+    return [str(factor(expanded)), str(expanded)]   # 정답, 전개된 꼴
+
+
+def _grading_args(generate, make_inputs, key, fallback=False, n_problems=20):
+    args = []
+    for _ in range(n_problems):
+        problem = generate()
+        args.extend((s, problem[key]) for s in make_inputs(problem, fallback))
+    return args
+
+
+def _cubic_args(generate, n_problems=20):
+    # 정답(sympy 가 출력한 꼴)과 오답(+1)을 문제와 함께
+    args = []
+    for _ in range(n_problems):
+        problem = generate()
+        answer = str(problem["answer_obj"])
+        args.extend([(answer, problem), (answer + "+1", problem)])
+    return args
+
+
+def _choices_args(generate, n_problems=20):
+    return [(generate()["answer_obj"],) for _ in range(n_problems)]
+
+
+# -------------------------------
+# 측정 항목: (이름, 묶음, 함수, 인자 목록 만드는 함수 또는 None, 호출 수)
+# -------------------------------
+def _cases():
+    cases = []
+    for t in range(1, 5):
+        for kind in ("expansion", "factorization"):
+            name = f"generate_type{t}_{kind}"
+            cases.append((name, "generate", getattr(bf, name), None, 2000))
+
+    cases.append(("generate_batch[type1_expansion, 100k]", "generate",
+                  lambda: batch.generate_batch("type1_expansion", 100_000, seed=SEED), None, 20))
+    cases.append(("generate_choices", "choices", bf.generate_choices,
+                  lambda: _choices_args(bf.generate_type1_expansion), 40))
+
+    legacy_generators = [
+        ("square_binomial.generate_square_binomial", square_binomial.generate_square_binomial),
+        ("sumdiff.generate_square_binomial", sumdiff.generate_square_binomial),
+        ("sumdiff.generate_diff_of_squares", sumdiff.generate_diff_of_squares),
+        ("factorization.generate_factor_square_binomial", factorization.generate_factor_square_binomial),
+        ("factorization.generate_factor_diff_of_squares", factorization.generate_factor_diff_of_squares),
+    ]
+    cases += [(name, "legacy", fn, None, 2000) for name, fn in legacy_generators]
+
+    # (이름, 묶음, 채점 함수, 문제 생성 함수, 입력 만드는 함수, 정답 키)
+    graders = [
+        ("check_expansion_answer", "grade", bf.check_expansion_answer,
+         bf.generate_type1_expansion, _expansion_inputs, "answer_obj"),
+        ("check_factor_answer", "grade", bf.check_factor_answer,
+         bf.generate_type1_factorization, _factor_inputs, "expanded_obj"),
+        ("square_binomial.check_answer", "legacy", square_binomial.check_answer,
+         square_binomial.generate_square_binomial, _expansion_inputs, "answer_obj"),
+        ("sumdiff.check_answer", "legacy", sumdiff.check_answer,
+         sumdiff.generate_diff_of_squares, _expansion_inputs, "answer_obj"),
+        ("factorization.check_factor_answer", "legacy", factorization.check_factor_answer,
+         factorization.generate_factor_square_binomial, _factor_inputs, "expanded_obj"),
+    ]
+    for name, group, fn, generate, make_inputs, key in graders:
+        # 전용 파서로 끝나는 입력과 sympy 로 넘어가는 입력은 따로 잰다
+        cases.append((name, group, fn,
+                      lambda g=generate, m=make_inputs, k=key: _grading_args(g, m, k), 400))
+        cases.append((f"{name}[sympy]", group, fn,
+                      lambda g=generate, m=make_inputs, k=key: _grading_args(g, m, k, fallback=True), 100))
+
+    # 세제곱/세 항 제곱 (dense 다항식)
+    for name in ("cube_binomial", "sum_diff_cubes", "trinomial_square"):
+        for prefix in ("generate_", "generate_factor_"):
+            generate = getattr(cubic, prefix + name)
+            cases.append((f"cubic.{prefix}{name}", "cubic", generate, None, 2000))
+            cases.append((f"cubic.check_answer[{prefix[9:]}{name}]", "cubic", cubic.check_answer,
+                          lambda g=generate: _cubic_args(g), 400))
+
+    problem_bank = qbank.load_bank()
+    if problem_bank is not None:
+        for problem_type in qbank.PROBLEM_TYPES:
+            cases.append((f"bank.sample[{problem_type}]", "rerun",
+                          lambda t=problem_type: problem_bank.sample(t), None, 5000))
+    return cases
+
+
+# -------------------------------
+# 측정
+# -------------------------------
+def _percentile(sorted_values, p):
+    k = (len(sorted_values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def measure(fn, args_list, n, seed=SEED, warmup=5):
+    """fn 을 n 번 호출 (args_list 를 돌아가며) 하고 호출당 시간 통계를 µs 로"""
+    random.seed(seed)
+    args_list = args_list or [()]
+    for i in range(min(warmup, n)):
+        fn(*args_list[i % len(args_list)])
+
+    random.seed(seed)
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        clock = time.perf_counter_ns
+        for i in range(n):
+            args = args_list[i % len(args_list)]
+            start = clock()
+            fn(*args)
+            timings.append(clock() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    timings.sort()
+    total = sum(timings)
+    result = {"n": n}
+    for p in PERCENTILES:
+        result[f"p{p}_us"] = round(_percentile(timings, p) / 1000, 3)
+    result["max_us"] = round(timings[-1] / 1000, 3)
+    result["mean_us"] = round(total / n / 1000, 3)
+    result["ops_per_s"] = round(n / (total / 1e9), 1) if total else None
+    return result
+
+
+def run(groups=None, scale=1.0, seed=SEED, verbose=True):
+    results = {}
+    for name, group, fn, make_args, n in _cases():
+        if groups and group not in groups:
+            continue
+        random.seed(seed)
+        args_list = make_args() if make_args else None
+        result = measure(fn, args_list, max(1, int(n * scale)), seed)
+        result["group"] = group
+        results[name] = result
+        if verbose:
+            print(f"{name:<50} p50 {result['p50_us']:>10.1f} µs  p99 {result['p99_us']:>10.1f} µs  "
+                  f"{result['ops_per_s']:>12,.0f}/s")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "scale": scale,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, tolerance=0.25, min_delta_us=5.0):
+    """p50 기준으로 느려진 항목 [(이름, 기준 µs, 현재 µs, 비율)]"""
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        old, new = base["p50_us"], result["p50_us"]
+        if new > old * (1 + tolerance) and new - old > min_delta_us:
+            regressions.append((name, old, new, new / old if old else float("inf")))
+    return regressions
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="quizgen 문제 생성/채점 벤치마크")
+    parser.add_argument("--output", help="결과 JSON 을 저장할 경로")
+    parser.add_argument("--baseline", help="비교할 예전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="허용하는 p50 증가 비율")
+    parser.add_argument("--min-delta-us", type=float, default=5.0, help="이보다 작은 차이는 무시")
+    parser.add_argument("--group", action="append",
+                        choices=["generate", "choices", "grade", "legacy", "cubic", "rerun"])
+    parser.add_argument("--scale", type=float, default=1.0, help="호출 수 배율 (빠르게 보려면 0.1)")
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args(argv)
+
+    current = run(args.group, args.scale, args.seed)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f"저장: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.tolerance, args.min_delta_us)
+        if regressions:
+            print(f"\n!!! 성능 저하 {len(regressions)}건 (p50, 허용 +{args.tolerance:.0%}) !!!")
+            for name, old, new, ratio in regressions:
+                print(f"  {name:<50} {old:>10.1f} → {new:>10.1f} µs  ({ratio:.2f}배)")
+            return 1
+        print(f"\n기준 대비 성능 저하 없음 ({args.baseline})")
+    return 0
+
+
+# -------------------------------
+# 실행: python -m quizgen.benchmark
+# -------------------------------
+if __name__ == "__main__":
+    sys.exit(main())
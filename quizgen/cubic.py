@@ -0,0 +1,239 @@
+import random
+from fractions import Fraction
+from math import gcd
+
+from sympy import symbols, expand, Integer, Symbol, Number
+from sympy.parsing.sympy_parser import (
+    standard_transformations,
+    implicit_multiplication_application
+)
+from quizgen import guard
+from quizgen import polyparse
+from quizgen import templates as tpl
+from quizgen.dense import DegreeError, DensePoly
+
+# -------------------------------
+# 세제곱 공식 / 세 항의 제곱 (dense 다항식으로 생성·채점)
+# -------------------------------
+#   (a±b)^3       = a^3 ± 3a^2b + 3ab^2 ± b^3
+#   a^3±b^3       = (a±b)(a^2∓ab+b^2)
+#   (a+b+c)^2     = a^2 + b^2 + c^2 + 2ab + 2bc + 2ca
+# 인수를 DensePoly 로 만들어 곱하고 (배열 합성곱), LaTeX 는 templates 의 출력 함수로 그린다.
+# 채점도 학생 답을 DensePoly 로 바꿔 배열을 비교하므로, 차수와 변수 개수가 늘어도
+# 생성/채점 시간이 거의 같다 (sympy expand 는 항 수에 따라 느려진다).
+#
+# 문제 딕셔너리는 templates.make_problem 과 같은 모양에
+#   dense : 전개식 DensePoly, names : 축 변수 이름, form : 답이 갖춰야 할 꼴
+# 을 더한 것이다.
+
+# 변수 이름 후보 (알파벳 순, 앞에서부터 DensePoly 의 축)
+x, y, z, a, b, c = symbols('x y z a b c')
+variables = [("x",), ("a",), ("a", "b"), ("x", "y")]        # ("x",) 는 (px ± q) 꼴
+trinomial_variables = [("a", "b", "c"), ("x", "y", "z"), ("x", "y")]  # ("x", "y") 는 (px + qy + r) 꼴
+
+transformations = (standard_transformations + (implicit_multiplication_application,))
+# global_dict={} 로 파싱하므로 숫자/변수 생성에 필요한 이름도 넣어 둔다
+allowed = {
+    "x": x, "y": y, "z": z, "a": a, "b": b, "c": c,
+    "Integer": Integer,
+    "Symbol": Symbol,
+    "Number": Number
+}
+
+
+def get_coeff():
+    """계수: 세제곱하면 커지므로 정수 1~3, 가끔 1/2"""
+    if random.random() < 0.2:
+        return Fraction(1, 2)
+    return random.randint(1, 3)
+
+
+def _coprime_pair():
+    """인수가 (2a+2b) 처럼 공통 인수를 갖지 않도록 서로소인 두 계수"""
+    while True:
+        p, q = get_coeff(), get_coeff()
+        if gcd(Fraction(p).numerator, Fraction(q).numerator) == 1:
+            return p, q
+
+
+def _linear(names, coeffs, constant=0):
+    """coeffs[i] * names[i] 의 합 + constant"""
+    poly = DensePoly.constant(constant)
+    for axis, coeff in enumerate(coeffs):
+        poly = poly + coeff * DensePoly.variable(axis)
+    return poly
+
+
+def make_problem(factors, names, expansion=True):
+    """factors: 인수 DensePoly 목록 (같은 인수는 여러 번) → 문제 딕셔너리"""
+    n = len(names)
+    product = factors[0]
+    for f in factors[1:]:
+        product = product * f
+    expanded = product.to_coeffs(n)
+    merged = tpl.merge_factors([f.to_coeffs(n) for f in factors])
+    latex_expanded = tpl.latex_poly(expanded, names)
+    latex_factored = tpl.latex_factors(merged, names)
+    data = {"coeffs": expanded, "dense": product, "names": tuple(names)}
+    if expansion:
+        return tpl.LazyProblem(dict(data, latex_question=latex_factored, latex_answer=latex_expanded,
+                                    form="expanded"),
+                               {"answer_obj": lambda: tpl.sympy_poly(expanded, names)})
+    return tpl.LazyProblem(dict(data, latex_question=latex_expanded, latex_answer=latex_factored,
+                                form="factored"), {
+        "answer_obj": lambda: tpl.sympy_factors(merged, names),
+        "expanded_obj": lambda: tpl.sympy_poly(expanded, names),
+    })
+
+
+# -------------------------------
+# 1. 세제곱 공식 (a±b)^3
+# -------------------------------
+def _cube_binomial_factors():
+    names = random.choice(variables)
+    p, q = _coprime_pair()
+    q *= random.choice([1, -1])
+    if len(names) == 1:
+        factor = _linear(names, [p], q)          # (px ± q)^3
+    else:
+        factor = _linear(names, [p, q])          # (pa ± qb)^3
+    return [factor] * 3, names
+
+
+def generate_cube_binomial():
+    factors, names = _cube_binomial_factors()
+    return make_problem(factors, names)
+
+
+def generate_factor_cube_binomial():
+    factors, names = _cube_binomial_factors()
+    return make_problem(factors, names, expansion=False)
+
+
+# -------------------------------
+# 2. 세제곱의 합/차 a^3±b^3 = (a±b)(a^2∓ab+b^2)
+# -------------------------------
+def _sum_diff_cubes_factors():
+    names = random.choice(variables)
+    p, q = _coprime_pair()
+    sign = random.choice([1, -1])
+    u = p * DensePoly.variable(0)
+    v = q * (DensePoly.variable(1) if len(names) == 2 else DensePoly.constant(1))
+    return [u + sign * v, u * u - sign * u * v + v * v], names
+
+
+def generate_sum_diff_cubes():
+    factors, names = _sum_diff_cubes_factors()
+    return make_problem(factors, names)
+
+
+def generate_factor_sum_diff_cubes():
+    factors, names = _sum_diff_cubes_factors()
+    return make_problem(factors, names, expansion=False)
+
+
+# -------------------------------
+# 3. 세 항의 제곱 (a+b+c)^2
+# -------------------------------
+def _trinomial_square_factors():
+    names = random.choice(trinomial_variables)
+    coeffs = [get_coeff(), get_coeff() * random.choice([1, -1]), get_coeff() * random.choice([1, -1])]
+    if len(names) == 2:
+        factor = _linear(names, coeffs[:2], coeffs[2])   # (px + qy + r)^2
+    else:
+        factor = _linear(names, coeffs)
+    return [factor] * 2, names
+
+
+def generate_trinomial_square():
+    factors, names = _trinomial_square_factors()
+    return make_problem(factors, names)
+
+
+def generate_factor_trinomial_square():
+    factors, names = _trinomial_square_factors()
+    return make_problem(factors, names, expansion=False)
+
+
+# -------------------------------
+# 채점 로직
+# -------------------------------
+def _matches_form(is_expanded, form):
+    return not (form == "expanded" and not is_expanded or form == "factored" and is_expanded)
+
+
+def check_answer(user_input_str, problem):
+    """problem: 이 모듈의 문제 딕셔너리. 전개 문제는 전개된 꼴, 인수분해 문제는 곱 꼴이어야 정답"""
+    try:
+        processed_input = polyparse.normalize_input(user_input_str)
+        guard.check_length(processed_input)
+        form = problem["form"]
+        try:
+            node = polyparse.parse_poly(processed_input)
+        except polyparse.ParseError:
+            return False
+        except polyparse.Unsupported:
+            node = None
+        if node is not None:
+            if not _matches_form(node.expanded, form):
+                return False
+            user_poly = node.poly
+        else:
+            # 전용 파서 밖의 입력만 sympy 로 (계산량이 큰 입력은 guard 에서 바로 거부)
+            user_expr = guard.parse(processed_input, allowed, transformations, global_dict={})
+            expanded = expand(user_expr)
+            if not _matches_form(user_expr == expanded, form):
+                return False
+            user_poly = polyparse.poly_from_sympy(expanded)
+        # 3차를 넘거나 문제에 없는 변수가 있으면 DegreeError → 오답
+        return DensePoly.from_sparse(user_poly, problem["names"]) == problem["dense"]
+    except DegreeError:
+        return False
+    except Exception as e:
+        print("채점 에러:", e)
+        return False
+
+
+# -------------------------------
+# 테스트 실행
+# -------------------------------
+if __name__ == "__main__":
+    import time
+
+    from sympy import latex
+
+    generators = [generate_cube_binomial, generate_factor_cube_binomial, generate_sum_diff_cubes,
+                  generate_factor_sum_diff_cubes, generate_trinomial_square, generate_factor_trinomial_square]
+    random.seed(0)
+    for generate in generators:
+        for _ in range(200):
+            problem = generate()
+            # LaTeX 는 sympy 가 그린 것과 글자까지 같아야 한다
+            assert problem["latex_answer"] == latex(problem["answer_obj"]), problem["latex_answer"]
+            if problem["form"] == "factored":
+                assert problem["latex_question"] == latex(problem["expanded_obj"])
+                right, wrong = str(problem["answer_obj"]), str(problem["expanded_obj"])
+            else:
+                right, wrong = str(problem["answer_obj"]), str(problem["answer_obj"] + 1)
+            assert check_answer(right, problem) and not check_answer(wrong, problem), right
+        print(f"{generate.__name__:<34} {problem['latex_question']}  →  {problem['latex_answer']}")
+    assert check_answer("a^3+3a^2b+3ab^2+b^3", make_problem([_linear(("a", "b"), [1, 1])] * 3, ("a", "b")))
+    assert not check_answer("a^4", generate_cube_binomial())
+
+    # 1차 두 항의 제곱부터 세 변수 제곱까지: dense 는 거의 같고, sympy expand 는 항 수만큼 느려진다
+    def timed(fn, n=2000):
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        return (time.perf_counter() - start) / n * 1e6
+
+    cases = [("(x+1)^2", [_linear(("x",), [1], 1)] * 2, ("x",)),
+             ("(a+b)^3", [_linear(("a", "b"), [1, 1])] * 3, ("a", "b")),
+             ("(a+b+c)^2", [_linear(("a", "b", "c"), [1, 1, 1])] * 2, ("a", "b", "c"))]
+    for label, factors, names in cases:
+        problem = make_problem(factors, names)
+        answer = str(problem["answer_obj"])
+        sympy_expr = tpl.sympy_factors(tpl.merge_factors([f.to_coeffs(len(names)) for f in factors]), names)
+        print(f"{label:<10} 생성 {timed(lambda: make_problem(factors, names)):6.1f} µs  "
+              f"채점 {timed(lambda: check_answer(answer, problem)):6.1f} µs  "
+              f"(sympy expand+latex {timed(lambda: latex(expand(sympy_expr)), 200):7.1f} µs)")
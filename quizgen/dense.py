@@ -0,0 +1,231 @@
+from fractions import Fraction
+from math import gcd, lcm
+
+import numpy as np
+
+# -------------------------------
+# 3차 이하 다변수 다항식 (NumPy 조밀 계수 배열)
+# -------------------------------
+# 변수 3개까지, 전체 차수 3 이하인 다항식을 정수 계수 배열 num 과 공통 분모 den 하나로
+# 나타낸다 (계수 = num / den, 분수도 정확히). 배열 모양은 차수/변수 개수와 상관없이 항상 같아서
+# 더하기/곱하기/비교 비용이 (x+1)^2 이든 (a+b+c)^3 이든 같다.
+#
+# 단항식 a^i b^j c^k 의 자리는 i*R^2 + j*R + k (R = 2*MAX_DEGREE+1 = 7) 이다 (크로네커 치환).
+# 곱해도 한 축의 지수 합이 6 을 넘지 않아 자리올림이 없으므로, 두 다항식의 곱은
+# 1차원 배열의 합성곱 np.convolve 한 번이다. 곱한 뒤 차수 3 을 넘는 자리가 남으면 DegreeError.
+#
+# 축의 변수 이름은 이 모듈이 모른다. 호출하는 쪽이 names (알파벳 순) 를 같이 들고 다닌다.
+
+MAX_DEGREE = 3
+MAX_VARS = 3
+RADIX = 2 * MAX_DEGREE + 1
+_STRIDES = tuple(RADIX ** (MAX_VARS - 1 - axis) for axis in range(MAX_VARS))
+
+
+class DegreeError(ValueError):
+    """3차 / 변수 3개 / int64 범위를 넘는 다항식"""
+
+
+def _exponents(position):
+    exps = []
+    for stride in _STRIDES:
+        e, position = divmod(position, stride)
+        exps.append(e)
+    return tuple(exps)
+
+
+def _valid_mask(length):
+    return np.array([max(exps := _exponents(p)) <= MAX_DEGREE and sum(exps) <= MAX_DEGREE
+                     for p in range(length)])
+
+
+# 차수 3 이하 단항식 중 가장 큰 자리는 a^3 (= 3*R^2) 이다
+SIZE = MAX_DEGREE * _STRIDES[0] + 1
+_PRODUCT_INVALID = np.flatnonzero(~_valid_mask(2 * SIZE - 1))  # 곱에서 0 이어야 하는 자리
+_EXPONENTS = [_exponents(p) for p in range(SIZE)]
+
+
+class DensePoly:
+    __slots__ = ("num", "den")
+
+    def __init__(self, num, den=1):
+        """num: 길이 SIZE 의 int64 배열 (직접 만들 때는 constant / variable / from_sparse 를 쓴다)"""
+        if den < 0:
+            num, den = -num, -den
+        g = gcd(int(np.gcd.reduce(num)), den)
+        if g > 1:
+            num, den = num // g, den // g
+        if not num.any():
+            den = 1
+        self.num = num
+        self.den = den
+
+    # -------------------------------
+    # 만들기
+    # -------------------------------
+    @classmethod
+    def constant(cls, c):
+        c = Fraction(c)
+        num = np.zeros(SIZE, np.int64)
+        num[0] = c.numerator
+        return cls(num, c.denominator)
+
+    @classmethod
+    def monomial(cls, exps, c=1):
+        """exps: 축별 지수 (축 개수는 MAX_VARS 이하)"""
+        exps = tuple(exps) + (0,) * (MAX_VARS - len(exps))
+        if len(exps) > MAX_VARS or max(exps) > MAX_DEGREE or sum(exps) > MAX_DEGREE:
+            raise DegreeError(exps)
+        c = Fraction(c)
+        num = np.zeros(SIZE, np.int64)
+        num[sum(e * s for e, s in zip(exps, _STRIDES))] = c.numerator
+        return cls(num, c.denominator)
+
+    @classmethod
+    def variable(cls, axis):
+        return cls.monomial((0,) * axis + (1,))
+
+    @classmethod
+    def from_coeffs(cls, coeffs):
+        """templates 모양 {축별 지수 튜플: 계수} → DensePoly"""
+        den = lcm(1, *(Fraction(c).denominator for c in coeffs.values()))
+        num = np.zeros(SIZE, np.int64)
+        try:
+            for exps, c in coeffs.items():
+                if not c:
+                    continue
+                exps = tuple(exps) + (0,) * (MAX_VARS - len(exps))
+                if len(exps) > MAX_VARS or max(exps) > MAX_DEGREE or sum(exps) > MAX_DEGREE:
+                    raise DegreeError(exps)
+                num[sum(e * s for e, s in zip(exps, _STRIDES))] = Fraction(c) * den
+        except OverflowError as e:
+            raise DegreeError("계수가 너무 큼") from e
+        return cls(num, den)
+
+    @classmethod
+    def from_sparse(cls, poly, names):
+        """polyparse 모양 {(('x', 2), ('y', 1)): 계수} → DensePoly (names 에 없는 변수면 DegreeError)"""
+        axis = {name: i for i, name in enumerate(names)}
+        coeffs = {}
+        for monomial, c in poly.items():
+            exps = [0] * len(names)
+            for name, e in monomial:
+                if name not in axis:
+                    raise DegreeError(f"모르는 변수: {name}")
+                exps[axis[name]] = e
+            coeffs[tuple(exps)] = c
+        return cls.from_coeffs(coeffs)
+
+    # -------------------------------
+    # 꺼내기
+    # -------------------------------
+    def to_coeffs(self, n_vars=MAX_VARS):
+        """{앞 n_vars 축의 지수 튜플: int 또는 Fraction} (templates.latex_poly 에 바로 넣을 수 있다)"""
+        out = {}
+        for p in np.flatnonzero(self.num):
+            exps = _EXPONENTS[p]
+            if any(exps[n_vars:]):
+                raise DegreeError(f"축 {n_vars} 개 밖의 변수")
+            c = Fraction(int(self.num[p]), self.den)
+            out[exps[:n_vars]] = c.numerator if c.denominator == 1 else c
+        return out
+
+    def degree(self):
+        nonzero = np.flatnonzero(self.num)
+        return max((sum(_EXPONENTS[p]) for p in nonzero), default=0)
+
+    # -------------------------------
+    # 연산
+    # -------------------------------
+    @staticmethod
+    def _coerce(other):
+        if isinstance(other, DensePoly):
+            return other
+        if isinstance(other, (int, Fraction)):
+            return DensePoly.constant(other)
+        return NotImplemented
+
+    def __add__(self, other):
+        other = self._coerce(other)
+        if other is NotImplemented:
+            return other
+        den = lcm(self.den, other.den)
+        return DensePoly(self.num * (den // self.den) + other.num * (den // other.den), den)
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        return DensePoly(-self.num, self.den)
+
+    def __sub__(self, other):
+        other = self._coerce(other)
+        if other is NotImplemented:
+            return other
+        return self + (-other)
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def __mul__(self, other):
+        if isinstance(other, (int, Fraction)):
+            other = Fraction(other)
+            return DensePoly(self.num * other.numerator, self.den * other.denominator)
+        if not isinstance(other, DensePoly):
+            return NotImplemented
+        product = np.convolve(self.num, other.num)
+        if product[_PRODUCT_INVALID].any():
+            raise DegreeError("3차를 넘는 곱")
+        return DensePoly(product[:SIZE], self.den * other.den)
+
+    __rmul__ = __mul__
+
+    def __pow__(self, n):
+        result = DensePoly.constant(1)
+        for _ in range(n):
+            result = result * self
+        return result
+
+    def __eq__(self, other):
+        other = self._coerce(other)
+        if other is NotImplemented:
+            return other
+        return self.den == other.den and np.array_equal(self.num, other.num)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"DensePoly({self.to_coeffs()})"
+
+
+# -------------------------------
+# 테스트 실행
+# -------------------------------
+if __name__ == "__main__":
+    import time
+
+    a, b, c = (DensePoly.variable(i) for i in range(3))
+    half = Fraction(1, 2)
+    cube = (a + 2 * b) ** 3
+    print(cube.to_coeffs(2))
+    assert cube == a**3 + 6 * a**2 * b + 12 * a * b**2 + 8 * b**3
+    assert (a + b) * (a * a - a * b + b * b) == a**3 + b**3
+    assert ((half * a - b + 3 * c) ** 2).to_coeffs() == {
+        (2, 0, 0): Fraction(1, 4), (1, 1, 0): -1, (1, 0, 1): 3, (0, 2, 0): 1, (0, 1, 1): -6, (0, 0, 2): 9}
+    assert DensePoly.from_sparse({(("x", 1), ("y", 1)): half, (): 2}, ("x", "y")).to_coeffs(2) == {
+        (1, 1): half, (0, 0): 2}
+    for bad in (lambda: (a + 1) ** 4, lambda: DensePoly.monomial((4,)), lambda: a * b * c * a):
+        try:
+            bad()
+        except DegreeError:
+            pass
+        else:
+            raise AssertionError("DegreeError 가 나야 함")
+
+    # 차수/변수 개수가 늘어도 한 번 곱하는 비용은 같다
+    N = 20_000
+    for label, p, q in [("(x+1)(x+1)", a + 1, a + 1), ("(a+b)(a^2-ab+b^2)", a + b, a * a - a * b + b * b),
+                        ("(a+b+c)(a+b+c)^2", a + b + c, (a + b + c) ** 2)]:
+        start = time.perf_counter()
+        for _ in range(N):
+            p * q
+        print(f"{label:<22} 곱 {(time.perf_counter() - start) / N * 1e6:.1f} µs")
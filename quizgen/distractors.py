@@ -0,0 +1,203 @@
+import random
+
+from quizgen import templates as tpl
+
+# -------------------------------
+# 오답 보기 생성기
+# -------------------------------
+# 정답 문자열을 고치는 대신, 템플릿 매개변수에서 학생들이 자주 하는 실수를
+# 그대로 계산해서 오답을 만든다. (simplify 없음)
+#   전개: 중간항 빠뜨림, 중간항 2배 안 함, 계수 제곱 안 함, 부호 실수 ...
+#   인수분해: 괄호 안 부호 실수, 완전제곱/합차 혼동, 상수 바꿔 쓰기 ...
+# 중복은 문자열이 아니라 전개한 계수(정규 키)로 거른다. 그래서 정답과
+# 값이 같은 오답이나 서로 값이 같은 오답은 보기에 들어가지 않는다.
+# seed 를 주면 같은 문제에 항상 같은 보기가 같은 순서로 나온다.
+
+N_CHOICES = 4
+
+# 템플릿별 단항식 자리: (이차항, 중간항, 마지막 항, 인수의 첫 항, 인수의 둘째 항)
+_SHAPE_1VAR = ((2,), (1,), (0,), (1,), (0,))
+_SHAPE_2VAR = ((2, 0), (1, 1), (0, 2), (1, 0), (0, 1))
+
+
+def _square_expansions(p, q, S):
+    L, M, C = S[:3]
+    return [
+        {L: p * p, C: q * q},                  # 중간항 빠뜨림
+        {L: p * p, M: p * q, C: q * q},        # 중간항 2배 안 함
+        {L: p, M: 2 * p * q, C: q * q},        # 계수 제곱 안 함
+        {L: p * p, M: 2 * p * q, C: q},        # 상수 제곱 안 함
+        {L: p * p, M: -2 * p * q, C: q * q},   # 중간항 부호
+        {L: p * p, M: 2 * p * q, C: -q * q},   # 마지막 항 부호
+    ]
+
+
+def _square_factorizations(p, q, S):
+    V, K = S[3:]
+    return [
+        [{V: p, K: -q}] * 2,                   # 괄호 안 부호
+        [{V: p, K: q}, {V: p, K: -q}],         # 합차공식과 혼동
+        [{V: p, K: q * q}] * 2,                # 상수를 제곱한 채로
+        [{V: p, K: 2 * q}] * 2,                # 중간항의 2배를 그대로
+    ]
+
+
+def _sum_diff_expansions(p, q, S):
+    L, M, C = S[:3]
+    return [
+        {L: p * p, C: q * q},                  # 마지막 항 부호
+        {L: p, C: -q * q},                     # 계수 제곱 안 함
+        {L: p * p, C: -q},                     # 상수 제곱 안 함
+        {L: p * p, M: -2 * p * q, C: q * q},   # 완전제곱식과 혼동
+        {L: p * p, M: 2 * p * q, C: -q * q},   # 없는 중간항
+    ]
+
+
+def _sum_diff_factorizations(p, q, S):
+    V, K = S[3:]
+    return [
+        [{V: p, K: -q}] * 2,                   # 완전제곱식과 혼동 (-)
+        [{V: p, K: q}] * 2,                    # 완전제곱식과 혼동 (+)
+        [{V: p, K: q * q}, {V: p, K: -q * q}], # 상수를 제곱한 채로
+    ]
+
+
+def _two_linear_expansions(p, q, r, s, S):
+    L, M, C = S[:3]
+    return [
+        {L: p * r, M: p * s, C: q * s},                # 바깥 곱만
+        {L: p * r, M: q * r, C: q * s},                # 안쪽 곱만
+        {L: p * r, M: q * s, C: p * s + q * r},        # 중간항과 상수항 바꿈
+        {L: p * r, M: p * s + q * r, C: q + s},        # 상수항을 더함
+        {L: p + r, M: p * s + q * r, C: q * s},        # 계수를 더함
+        {L: p * r, M: -(p * s + q * r), C: q * s},     # 중간항 부호
+        {L: p * r, M: p * s + q * r, C: -q * s},       # 상수항 부호
+    ]
+
+
+def _two_linear_factorizations(p, q, r, s, S):
+    V, K = S[3:]
+    return [
+        [{V: p, K: s}, {V: r, K: q}],          # 상수 바꿔 쓰기
+        [{V: p, K: -q}, {V: r, K: -s}],        # 괄호 안 부호
+        [{V: p, K: q}, {V: r, K: -s}],         # 한쪽 부호
+        [{V: p, K: -q}, {V: r, K: s}],
+    ]
+
+
+def _sum_diff_1param(fn):
+    # (v + p)(v - p) 는 (1*v + p)(1*v - p) 와 같다
+    return lambda p, S: fn(1, p, S)
+
+
+PATTERNS = {
+    tpl.SQUARE: (_square_expansions, _square_factorizations, _SHAPE_1VAR),
+    tpl.SQUARE_2VAR: (_square_expansions, _square_factorizations, _SHAPE_2VAR),
+    tpl.SUM_DIFF: (_sum_diff_1param(_sum_diff_expansions), _sum_diff_1param(_sum_diff_factorizations), _SHAPE_1VAR),
+    tpl.SUM_DIFF_COEFF: (_sum_diff_expansions, _sum_diff_factorizations, _SHAPE_1VAR),
+    tpl.SUM_DIFF_2VAR: (_sum_diff_expansions, _sum_diff_factorizations, _SHAPE_2VAR),
+    tpl.TWO_LINEAR: (_two_linear_expansions, _two_linear_factorizations, _SHAPE_1VAR),
+}
+
+
+def _key(coeffs):
+    """값이 같은 식을 같은 것으로 보는 정규 키"""
+    return frozenset((m, c) for m, c in coeffs.items() if c != 0)
+
+
+def _shift(coeffs, monom, k):
+    shifted = dict(coeffs)
+    shifted[monom] = shifted.get(monom, 0) + k
+    return shifted
+
+
+def make_choices(template, names, args, expansion=True, seed=None, rng=None):
+    """정답 1 + 오답 3 의 LaTeX 보기 4개 (섞어서)
+
+    rng 를 주지 않으면 seed 로 만든 random.Random, seed 도 없으면 random 모듈을 쓴다.
+    """
+    if rng is None:
+        rng = random.Random(seed) if seed is not None else random
+    args = [tpl.to_number(a) for a in args]
+    expansions, factorizations, shape = PATTERNS[template]
+    answer = template.expanded(*args)
+    seen = {_key(answer)}
+
+    candidates = []
+    if expansion:
+        for coeffs in expansions(*args, shape):
+            coeffs = {m: c for m, c in coeffs.items() if c != 0}
+            key = _key(coeffs)
+            if coeffs and key not in seen:
+                seen.add(key)
+                candidates.append(tpl.latex_poly(coeffs, names))
+        correct = tpl.latex_poly(answer, names)
+    else:
+        for flat in factorizations(*args, shape):
+            factors = tpl.merge_factors([{m: c for m, c in f.items() if c != 0} for f in flat])
+            key = _key(tpl.expand_factors(factors))
+            if key not in seen:
+                seen.add(key)
+                candidates.append(tpl.latex_factors(factors, names))
+        correct = tpl.latex_factors(template.factors(*args), names)
+
+    if len(candidates) > N_CHOICES - 1:
+        candidates = rng.sample(candidates, N_CHOICES - 1)
+
+    # 실수 유형만으로 모자라면 상수항을 1씩 바꿔 채운다
+    k = 0
+    while len(candidates) < N_CHOICES - 1:
+        k += 1
+        for delta in (k, -k):
+            if len(candidates) == N_CHOICES - 1:
+                break
+            if expansion:
+                coeffs = _shift(answer, shape[2], delta)
+                key = _key(coeffs)
+                latex = tpl.latex_poly(coeffs, names)
+            else:
+                factors = template.factors(*args)
+                first = _shift(factors[0][0], shape[4], delta)
+                shifted = tpl.merge_factors([first] * factors[0][1] + [f for f, n in factors[1:] for _ in range(n)])
+                key = _key(tpl.expand_factors(shifted))
+                latex = tpl.latex_factors(shifted, names)
+            if key not in seen:
+                seen.add(key)
+                candidates.append(latex)
+
+    choices = [correct] + candidates
+    rng.shuffle(choices)
+    return choices
+
+
+# -------------------------------
+# 벤치마크: python -m quizgen.distractors
+# -------------------------------
+if __name__ == "__main__":
+    import time
+
+    from quizgen import basic_formulas as bf
+
+    cases = [
+        ("완전제곱식", tpl.SQUARE, ["x"], (2, 3)),
+        ("합차공식", tpl.SUM_DIFF, ["a"], (tpl.to_number(bf.Rational(1, 2)),)),
+        ("(x+a)(x+b)", tpl.TWO_LINEAR, ["x"], (1, 2, 1, 5)),
+        ("(ax+b)(cx+d)", tpl.TWO_LINEAR, ["x"], (2, 5, 3, 1)),
+    ]
+    for label, template, names, args in cases:
+        for expansion in (True, False):
+            problem = tpl.make_problem(template, names, args, expansion)
+            obj = problem["answer_obj"]
+            n = 20
+            start = time.perf_counter()
+            for _ in range(n):
+                bf.generate_choices(obj)
+            old = (time.perf_counter() - start) / n
+            n = 2000
+            start = time.perf_counter()
+            for i in range(n):
+                choices = make_choices(template, names, args, expansion, seed=i)
+            new = (time.perf_counter() - start) / n
+            kind = "전개" if expansion else "인수분해"
+            print(f"{label} {kind}: generate_choices {old * 1e3:.2f} ms → make_choices {new * 1e6:.1f} µs "
+                  f"({old / new:.0f}배)  {choices}")
@@ -1,17 +1,25 @@
 import random
-from sympy import symbols, expand, latex, Rational, factor, simplify
+from sympy import symbols, expand, Rational, Integer, Symbol, Number, factor, simplify
 from sympy.parsing.sympy_parser import (
-    parse_expr,
     standard_transformations,
     implicit_multiplication_application
 )
+from quizgen import guard
+from quizgen import polyparse
+from quizgen import templates as tpl
 
 # 변수 정의
 x, y, a, b = symbols('x y a b')
 variables = [x, a, b]
 
 transformations = (standard_transformations + (implicit_multiplication_application,))
-allowed = {"x": x, "y": y, "a": a, "b": b}
+# global_dict={} 로 파싱하므로 숫자/변수 생성에 필요한 이름도 넣어 둔다
+allowed = {
+    "x": x, "y": y, "a": a, "b": b,
+    "Integer": Integer,
+    "Symbol": Symbol,
+    "Number": Number
+}
 
 def get_coeff():
     if random.random() < 0.3:
@@ -25,14 +33,9 @@ def generate_factor_square_binomial():
     var = random.choice(variables)
     c1 = get_coeff()
     c2 = get_coeff()
-    expr = (c1*var + c2)**2
-    expanded = expand(expr)
-    return {
-        "latex_question": latex(expanded),  # 문제: 전개된 다항식
-        "answer_obj": expr,                 # 정답: 인수분해된 꼴
-        "latex_answer": latex(expr),
-        "expanded_obj": expanded            # 채점용
-    }
+    # (c1*var + c2)**2
+    # latex_question: 전개된 다항식, answer_obj: 인수분해된 꼴, expanded_obj: 채점용
+    return tpl.make_problem(tpl.SQUARE, [var.name], (c1, c2), expansion=False)
 
 # -------------------------------
 # 2. 합차공식 인수분해 문제
@@ -40,14 +43,8 @@ def generate_factor_square_binomial():
 def generate_factor_diff_of_squares():
     var = random.choice(variables)
     c1 = get_coeff()
-    expr = (var + c1)*(var - c1)
-    expanded = expand(expr)
-    return {
-        "latex_question": latex(expanded),  # 문제: 전개된 다항식
-        "answer_obj": expr,                 # 정답: 인수분해된 꼴
-        "latex_answer": latex(expr),
-        "expanded_obj": expanded
-    }
+    # (var + c1)*(var - c1)
+    return tpl.make_problem(tpl.SUM_DIFF, [var.name], (c1,), expansion=False)
 
 # -------------------------------
 # 채점 로직 (인수분해용, 강화된 버전)
@@ -55,11 +52,13 @@ def generate_factor_diff_of_squares():
 def check_factor_answer(user_input_str, expanded_expr):
     try:
         processed_input = user_input_str.replace('^', '**')
-        user_expr = parse_expr(processed_input,
-                               transformations=transformations,
-                               local_dict=allowed,
-                               global_dict={},
-                               evaluate=True)
+        # 전용 파서로 먼저 채점 (곱 꼴만 정답, 파서 밖의 입력만 sympy 로)
+        guard.check_length(processed_input)
+        result = polyparse.fast_check(processed_input, expanded_expr, form="factored")
+        if result is not None:
+            return result
+        user_expr = guard.parse(processed_input, allowed, transformations,
+                                global_dict={})   # 계산량 제한
 
         # 문제 외 변수 차단
         if user_expr.free_symbols - expanded_expr.free_symbols:
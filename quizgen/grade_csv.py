@@ -0,0 +1,270 @@
+import collections
+import csv
+import os
+import sys
+import time
+from functools import lru_cache
+
+from quizgen import basic_formulas as bf
+from quizgen import guard
+from quizgen import polyparse
+
+# -------------------------------
+# CSV 답안 일괄 채점 (명령줄)
+# -------------------------------
+# 종이/설문지로 받은 답안 CSV 를 앱과 같은 채점 함수(check_expansion_answer,
+# check_factor_answer) 로 채점한다.
+#   - 입력 CSV 는 한 줄씩 읽어서 작업 프로세스들에 chunk 단위로 나눠 준다.
+#   - 문항마다 제한 시간이 있고, 넘기면 그 작업 프로세스를 죽이고 새로 띄운다
+#     (sympy 가 멈춰도 전체 채점은 계속된다). 같은 chunk 의 나머지는 다시 나눠 준다.
+#     작업 프로세스가 죽어 버린 경우도 같게 처리한다 (그 문항은 parse-error).
+#   - 결과(correct / wrong / timeout / parse-error)는 나오는 대로 출력 CSV 에 이어 쓴다.
+#   - 출력 파일이 이미 있으면 채점한 id 는 건너뛰고 이어서 채점한다.
+#
+# 입력 열: id(없으면 줄 번호), kind(expansion | factorization), problem, answer
+#   problem: expansion 이면 전개할 식 "(2x+3)^2", factorization 이면 인수분해할 식 "x^2-9"
+#
+#   python -m quizgen.grade_csv answers.csv graded.csv --workers 8 --timeout 2
+
+CORRECT = "correct"
+WRONG = "wrong"
+TIMEOUT = "timeout"
+PARSE_ERROR = "parse-error"
+
+CHECKERS = {
+    "expansion": bf.check_expansion_answer,
+    "factorization": bf.check_factor_answer,
+}
+OUTPUT_FIELDS = ["id", "result"]
+
+
+# -------------------------------
+# 문항 하나 채점 (작업 프로세스)
+# -------------------------------
+@lru_cache(maxsize=4096)
+def reference(problem):
+    """문제 식 → 정답 다항식 (전용 파서 표현, 안 되면 sympy 식)"""
+    processed = bf.normalize_input(problem)
+    try:
+        return polyparse.parse_poly(processed).poly
+    except polyparse.Unsupported:
+        return bf.expand(bf.parse_expr(processed, transformations=bf.transformations,
+                                       local_dict=bf.allowed, global_dict={}, evaluate=True))
+
+
+def _parses(answer):
+    processed = bf.normalize_input(answer)
+    try:
+        polyparse.parse_poly(processed)
+        return True
+    except polyparse.ParseError:
+        return False
+    except polyparse.Unsupported:
+        pass
+    except Exception:
+        return False
+    try:
+        guard.parse(processed, bf.allowed, bf.transformations, global_dict={})
+        return True
+    except Exception:
+        return False
+
+
+def grade_one(kind, problem, answer):
+    checker = CHECKERS.get(kind)
+    if checker is None or not problem.strip() or not answer.strip():
+        return PARSE_ERROR
+    try:
+        expected = reference(problem)
+    except Exception:
+        return PARSE_ERROR
+    if checker(answer, expected):
+        return CORRECT
+    # 틀린 답만 다시 파싱해서 "식이 아님" 과 "오답" 을 나눈다
+    return WRONG if _parses(answer) else PARSE_ERROR
+
+
+def _worker_main(conn):
+    sys.stdout = open(os.devnull, "w")  # 채점 함수의 오류 출력은 버린다
+    while True:
+        chunk = conn.recv()
+        if chunk is None:
+            break
+        for key, kind, problem, answer in chunk:
+            try:
+                result = grade_one(kind, problem, answer)
+            except Exception:  # 어떤 답안이든 작업 프로세스는 살아 있어야 한다
+                result = PARSE_ERROR
+            conn.send((key, result))
+
+
+# -------------------------------
+# 작업 프로세스 관리 (문항별 제한 시간)
+# -------------------------------
+class _Worker:
+    def __init__(self, ctx):
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_worker_main, args=(child,), daemon=True)
+        self.proc.start()
+        child.close()
+        self.items = collections.deque()
+        self.deadline = None
+
+    def send(self, chunk, timeout):
+        self.items.extend(chunk)
+        self.conn.send(chunk)
+        self.deadline = time.monotonic() + timeout
+
+    def kill(self):
+        self.proc.kill()
+        self.proc.join()
+        self.conn.close()
+
+
+def grade_stream(rows, workers=None, timeout=2.0, chunk_size=32):
+    """rows: (id, kind, problem, answer) 반복자 → (id, result) 를 끝나는 순서대로"""
+    import multiprocessing
+    from multiprocessing.connection import wait
+
+    ctx = multiprocessing.get_context()
+    n_workers = workers or os.cpu_count() or 1
+    pool = [_Worker(ctx) for _ in range(n_workers)]
+    retry = collections.deque()
+    rows = iter(rows)
+    exhausted = False
+
+    def next_chunk():
+        nonlocal exhausted
+        chunk = []
+        while retry and len(chunk) < chunk_size:
+            chunk.append(retry.popleft())
+        while not exhausted and len(chunk) < chunk_size:
+            try:
+                chunk.append(next(rows))
+            except StopIteration:
+                exhausted = True
+        return chunk
+
+    def replace(w):
+        """w 를 죽이고 새로 띄운다. 맨 앞(걸린) 문항을 돌려주고 나머지는 다시 나눠 준다"""
+        stuck = w.items.popleft()
+        retry.extend(w.items)
+        w.kill()
+        pool[pool.index(w)] = _Worker(ctx)
+        return stuck
+
+    try:
+        while True:
+            for w in pool:
+                if not w.items:
+                    chunk = next_chunk()
+                    if chunk:
+                        w.send(chunk, timeout)
+            busy = [w for w in pool if w.items]
+            if not busy:
+                break
+
+            now = time.monotonic()
+            ready = wait([w.conn for w in busy], timeout=max(0.0, min(w.deadline for w in busy) - now))
+            for w in busy:
+                if w.conn in ready:
+                    try:
+                        while w.items and w.conn.poll():
+                            key, result = w.conn.recv()
+                            w.items.popleft()
+                            w.deadline = time.monotonic() + timeout
+                            yield key, result
+                    except (EOFError, OSError):
+                        # 작업 프로세스가 죽음 → 시간 초과처럼 교체 (같은 문항을 다시 보내지는 않는다)
+                        yield replace(w)[0], PARSE_ERROR
+                elif time.monotonic() >= w.deadline:
+                    # 맨 앞 문항이 제한 시간을 넘김 → 프로세스 교체, 나머지는 다시 나눠 준다
+                    yield replace(w)[0], TIMEOUT
+    finally:
+        for w in pool:
+            if w.proc.is_alive():
+                try:
+                    w.conn.send(None)
+                except OSError:
+                    pass
+            w.proc.join(timeout=1)
+            if w.proc.is_alive():
+                w.kill()
+
+
+# -------------------------------
+# CSV 읽기 / 쓰기 (이어서 채점)
+# -------------------------------
+def _done_ids(output_path):
+    """이미 채점한 id 집합. 중간에 끊겨 반쯤 쓰인 마지막 줄은 잘라 낸다"""
+    if not os.path.exists(output_path):
+        return set()
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end != len(data):
+            f.truncate(end)
+    with open(output_path, newline="", encoding="utf-8") as f:
+        return {row["id"] for row in csv.DictReader(f)}
+
+
+def read_rows(input_path, skip=(), default_kind=None):
+    with open(input_path, newline="", encoding="utf-8-sig") as f:
+        for line_no, row in enumerate(csv.DictReader(f), start=1):
+            key = row.get("id") or str(line_no)
+            if key in skip:
+                continue
+            kind = (row.get("kind") or default_kind or "").strip()
+            yield key, kind, row.get("problem") or "", row.get("answer") or ""
+
+
+def grade_csv(input_path, output_path, workers=None, timeout=2.0, chunk_size=32, default_kind=None,
+              flush_every=1.0):
+    """출력 CSV 에 id,result 를 이어 쓰고 이번 실행의 결과별 개수를 돌려준다"""
+    done = _done_ids(output_path)
+    new_file = not done and not (os.path.exists(output_path) and os.path.getsize(output_path))
+    counts = collections.Counter()
+    with open(output_path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(OUTPUT_FIELDS)
+        last_flush = time.monotonic()
+        rows = read_rows(input_path, done, default_kind)
+        for key, result in grade_stream(rows, workers, timeout, chunk_size):
+            writer.writerow([key, result])
+            counts[result] += 1
+            if time.monotonic() - last_flush >= flush_every:
+                f.flush()
+                last_flush = time.monotonic()
+    counts["skipped"] = len(done)
+    return counts
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="답안 CSV 일괄 채점")
+    parser.add_argument("input", help="입력 CSV (id, kind, problem, answer)")
+    parser.add_argument("output", help="출력 CSV (id, result). 있으면 이어서 채점")
+    parser.add_argument("--workers", type=int, default=None, help="기본: CPU 개수")
+    parser.add_argument("--timeout", type=float, default=2.0, help="문항당 제한 시간(초)")
+    parser.add_argument("--chunk-size", type=int, default=32)
+    parser.add_argument("--kind", choices=sorted(CHECKERS), help="kind 열이 없을 때 쓸 값")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    counts = grade_csv(args.input, args.output, args.workers, args.timeout, args.chunk_size, args.kind)
+    elapsed = time.perf_counter() - start
+    graded = sum(n for k, n in counts.items() if k != "skipped")
+    print(f"{graded}문항 채점 ({elapsed:.2f}초, {graded / elapsed if elapsed else 0:,.0f}문항/초), "
+          f"건너뜀 {counts['skipped']}")
+    for code in (CORRECT, WRONG, TIMEOUT, PARSE_ERROR):
+        print(f"  {code:<12} {counts[code]}")
+    return 0
+
+
+# -------------------------------
+# 실행: python -m quizgen.grade_csv 입력.csv 출력.csv
+# -------------------------------
+if __name__ == "__main__":
+    sys.exit(main())
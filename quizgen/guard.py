@@ -0,0 +1,176 @@
+import ast
+import builtins
+import types
+from math import comb
+
+from sympy import Max, Min
+from sympy.parsing.sympy_parser import eval_expr, stringify_expr
+
+from quizgen.limits import LIMITS, GuardRejected, count as _count, snapshot, stats  # guard.snapshot 등으로도 쓴다
+
+# -------------------------------
+# 학생 입력 계산량 제한 (sympy 에 넘기기 전)
+# -------------------------------
+# x^99999999, (x+1)^5000 같은 입력은 parse_expr / expand / equals 에서 CPU 와 메모리를
+# 오래 붙잡아서 같은 Streamlit 프로세스의 다른 학생들까지 느려진다.
+# sympy 로 파싱하기 전에 아래를 차례로 확인하고, 하나라도 넘으면 GuardRejected 를 던진다.
+#   length   : 입력 글자 수
+#   nodes    : sympy 변환(암묵적 곱셈 등)을 거친 파이썬 식의 AST 노드 수
+#   exponent : 거듭제곱 지수 (상수 정수만, 절댓값 제한)
+#   constant : 상수끼리 계산한 값의 비트 수 ((9**32)**32 처럼 지수는 작아도 값이 터지는 식)
+#   terms    : 전부 전개했을 때의 항 수 추정치 (곱은 항 수의 곱, n제곱은 중복조합)
+# 어느 제한이 몇 번 걸렸는지는 stats 에 쌓인다. 제한 값과 stats 는 빠른 채점(polyparse)과 같이 쓰도록
+# sympy 없는 quizgen.limits 에 있다.
+
+# 숫자/기호를 만드는 호출 (stringify_expr 가 넣는 것) 은 항 하나로 본다
+_ATOM_CALLS = {"Integer", "Float", "Rational", "Symbol"}
+
+
+_default_globals = None
+
+
+def _globals(global_dict):
+    """parse_expr(global_dict=None) 이 쓰는 것과 같은 기본 이름공간 (한 번만 만든다)"""
+    global _default_globals
+    if global_dict is not None:
+        return global_dict
+    if _default_globals is None:
+        namespace = {}
+        exec("from sympy import *", namespace)
+        for name, obj in vars(builtins).items():
+            if isinstance(obj, types.BuiltinFunctionType):
+                namespace[name] = obj
+        namespace["max"] = Max
+        namespace["min"] = Min
+        _default_globals = namespace
+    return dict(_default_globals)
+
+
+def _reject(limit, message):
+    _count(limit)
+    raise GuardRejected(limit, message)
+
+
+def check_length(s, limits=LIMITS):
+    if len(s) > limits["length"]:
+        _reject("length", f"입력이 너무 깁니다 ({len(s)}자)")
+
+
+# -------------------------------
+# AST 로 지수와 전개 항 수 추정
+# -------------------------------
+def _check_bits(bits, limits):
+    if bits > limits["constant"]:
+        _reject("constant", f"상수가 너무 큽니다 (약 {bits}비트)")
+
+
+def _constant(node, limits):
+    """상수 정수 식이면 그 값 (작은 범위에서만 계산), 아니면 None"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, int):
+        return node.value
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "Integer" \
+            and len(node.args) == 1:
+        return _constant(node.args[0], limits)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        value = _constant(node.operand, limits)
+        if value is None:
+            return None
+        return -value if isinstance(node.op, ast.USub) else value
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.Pow)):
+        left, right = _constant(node.left, limits), _constant(node.right, limits)
+        if left is None or right is None:
+            return None
+        if isinstance(node.op, ast.Pow):
+            if abs(right) > limits["exponent"] or right < 0:
+                _reject("exponent", f"지수가 너무 큽니다 ({right})")
+            # 계산하기 전에 결과 크기를 본다 (0, ±1 의 거듭제곱은 커지지 않는다)
+            if abs(left) > 1:
+                _check_bits(left.bit_length() * right, limits)
+            return left ** right
+        if isinstance(node.op, ast.Add):
+            return left + right
+        if isinstance(node.op, ast.Sub):
+            return left - right
+        _check_bits(left.bit_length() + right.bit_length(), limits)
+        return left * right
+    return None
+
+
+def _terms(node, limits):
+    """node 를 전부 전개했을 때 항 수의 (넉넉한) 추정치"""
+    if isinstance(node, (ast.Name, ast.Constant)):
+        return 1
+    if isinstance(node, ast.Call):
+        if isinstance(node.func, ast.Name) and node.func.id in _ATOM_CALLS:
+            return 1
+        return max([_terms(a, limits) for a in node.args] or [1])
+    if isinstance(node, ast.UnaryOp):
+        return _terms(node.operand, limits)
+    if isinstance(node, ast.BinOp):
+        if isinstance(node.op, ast.Pow):
+            exponent = _constant(node.right, limits)
+            if exponent is None:
+                _reject("exponent", "지수는 상수 정수만 쓸 수 있습니다")
+            if abs(exponent) > limits["exponent"]:
+                _reject("exponent", f"지수가 너무 큽니다 ({exponent})")
+            if _constant(node.left, limits) is not None:
+                _constant(node, limits)  # 상수의 거듭제곱은 항 하나지만 값의 크기는 확인한다
+            base = _terms(node.left, limits)
+            return comb(abs(exponent) + base - 1, base - 1) if exponent else 1
+        left, right = _terms(node.left, limits), _terms(node.right, limits)
+        if isinstance(node.op, (ast.Add, ast.Sub)):
+            return left + right
+        return left * right
+    return 1
+
+
+def check_input(processed, local_dict, transformations, global_dict=None, limits=LIMITS):
+    """parse_expr 에 넘기기 전에 모든 제한을 확인한다. 통과하면 변환된 코드 문자열을 돌려준다"""
+    _count("checked")
+    check_length(processed, limits)
+    try:
+        code = stringify_expr(processed, local_dict, _globals(global_dict), transformations)
+        tree = ast.parse(code.strip(), mode="eval")
+    except Exception as e:
+        _reject("syntax", f"식으로 읽을 수 없습니다: {e}")
+
+    n_nodes = sum(1 for _ in ast.walk(tree))
+    if n_nodes > limits["nodes"]:
+        _reject("nodes", f"식이 너무 복잡합니다 (노드 {n_nodes}개)")
+    n_terms = _terms(tree.body, limits)
+    if n_terms > limits["terms"]:
+        _reject("terms", f"전개하면 항이 너무 많습니다 (약 {n_terms}개)")
+    _count("passed")
+    return code
+
+
+def parse(processed, local_dict, transformations, global_dict=None, limits=LIMITS):
+    """제한을 확인한 뒤 parse_expr(..., evaluate=True) 와 같은 결과를 돌려준다
+
+    global_dict 는 parse_expr 와 같은 뜻 (None 이면 sympy 전체 이름공간).
+    check_input 이 이미 변환한 코드를 그대로 실행하므로 문자열을 두 번 토큰화하지 않는다.
+    """
+    global_dict = _globals(global_dict)
+    code = check_input(processed, local_dict, transformations, global_dict, limits)
+    return eval_expr(code, dict(local_dict), global_dict)
+
+
+# -------------------------------
+# 테스트 실행
+# -------------------------------
+if __name__ == "__main__":
+    import time
+
+    from quizgen import basic_formulas as bf
+
+    for s in ["4x**2+12x+9", "2(x+1)(x-1)", "x**99999999", "(x+1)**5000", "x**(2**3)", "x**x",
+              "(x+y+a+b+1)**30", "(x+1)**16*(x+2)**16*(y+1)**16", "x+" * 120 + "1", "((x)",
+              "x**(((((9**32)**32)**32)**32)**32)", "(((((9**32)**32)**32)**32)**32)", "2**32*x", "(-1)**31"]:
+        start = time.perf_counter()
+        try:
+            parse(s, bf.allowed, bf.transformations, global_dict={})
+            verdict = "통과"
+        except GuardRejected as e:
+            verdict = f"거부[{e.limit}] {e}"
+        print(f"{s[:40]:<42} {(time.perf_counter() - start) * 1e6:8.0f} µs  {verdict}")
+    print("통계:", snapshot())
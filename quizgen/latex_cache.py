@@ -0,0 +1,92 @@
+import threading
+from collections import OrderedDict
+
+from sympy import latex as sympy_latex
+
+# -------------------------------
+# sympy latex() 결과 캐시 (크기 제한 LRU)
+# -------------------------------
+# 문제 유형 전체에서 나오는 서로 다른 식은 많지 않은데, 같은 식을 latex() 로
+# 몇 번씩 다시 그리고 있었다. sympy 식은 구조가 같으면 해시/비교도 같으므로
+# 식 자체를 키로 써서 그린 문자열을 재사용한다.
+# Streamlit 은 세션마다 다른 스레드에서 스크립트를 돌리므로 잠금으로 보호한다.
+# (그리는 동안에는 잠그지 않는다. 같은 식을 동시에 그리면 한 번 더 그릴 뿐 결과는 같다)
+
+class LatexCache:
+    def __init__(self, maxsize=4096, render=sympy_latex):
+        self.maxsize = maxsize
+        self._render = render
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "uncacheable": 0}
+
+    def latex(self, expr):
+        try:
+            with self._lock:
+                text = self._data.get(expr)
+                if text is not None:
+                    self._data.move_to_end(expr)
+                    self.stats["hits"] += 1
+                    return text
+        except TypeError:  # 해시할 수 없는 객체 (Matrix 등) 는 그냥 그린다
+            with self._lock:
+                self.stats["uncacheable"] += 1
+            return self._render(expr)
+
+        text = self._render(expr)
+        with self._lock:
+            self.stats["misses"] += 1
+            self._data[expr] = text
+            self._data.move_to_end(expr)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.stats["evictions"] += 1
+        return text
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def info(self):
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return dict(self.stats, size=len(self._data), maxsize=self.maxsize,
+                        hit_rate=self.stats["hits"] / lookups if lookups else 0.0)
+
+
+# 프로세스 전체에서 같이 쓰는 캐시
+shared = LatexCache()
+
+
+def latex(expr):
+    """sympy.latex 대신 쓰는 캐시된 버전 (기본 출력 설정만)"""
+    return shared.latex(expr)
+
+
+# -------------------------------
+# 테스트 실행
+# -------------------------------
+if __name__ == "__main__":
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    from quizgen import basic_formulas as bf
+
+    exprs = [bf.generate_type1_expansion()["answer_obj"] for _ in range(200)]
+    start = time.perf_counter()
+    for e in exprs:
+        sympy_latex(e)
+    plain = (time.perf_counter() - start) / len(exprs)
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(latex, exprs * 5))
+    start = time.perf_counter()
+    for e in exprs:
+        latex(e)
+    cached = (time.perf_counter() - start) / len(exprs)
+    assert all(latex(e) == sympy_latex(e) for e in exprs)
+    print(f"latex() {plain * 1e6:.0f} µs → 캐시 {cached * 1e6:.1f} µs")
+    print("통계:", shared.info())
@@ -0,0 +1,62 @@
+import threading
+
+# -------------------------------
+# 학생 입력 계산량 제한 값과 통계 (sympy 없이 쓰는 공용 모듈)
+# -------------------------------
+# guard (sympy 로 넘기기 전 검사) 와 polyparse (sympy 없는 빠른 채점) 가 같은 제한 값과
+# 같은 stats 를 쓰도록 여기에 둔다. guard 는 sympy 를 불러오므로 polyparse / answer_input 은
+# guard 대신 이 모듈을 쓴다.
+#   length   : 입력 글자 수
+#   nodes    : sympy 변환(암묵적 곱셈 등)을 거친 파이썬 식의 AST 노드 수
+#   exponent : 거듭제곱 지수 (상수 정수만, 절댓값 제한)
+#   constant : 상수끼리 계산한 값의 비트 수 ((9**32)**32 처럼 지수는 작아도 값이 터지는 식)
+#   terms    : 전부 전개했을 때의 항 수 추정치 (곱은 항 수의 곱, n제곱은 중복조합)
+# stats 의 fast_exponent / fast_constant 는 빠른 채점이 지수나 상수 크기 때문에 sympy 쪽으로
+# 넘긴 횟수다 (넘긴 입력은 guard 가 다시 확인한다).
+
+LIMITS = {
+    "length": 200,
+    "nodes": 300,
+    "exponent": 32,
+    "constant": 512,
+    "terms": 2000,
+}
+
+stats = {"checked": 0, "passed": 0, "length": 0, "nodes": 0, "exponent": 0, "constant": 0, "terms": 0, "syntax": 0,
+         "fast_exponent": 0, "fast_constant": 0}
+_stats_lock = threading.Lock()
+
+
+class GuardRejected(ValueError):
+    """계산량 제한에 걸린 입력. limit 은 LIMITS 의 키 또는 "syntax" """
+
+    def __init__(self, limit, message):
+        super().__init__(message)
+        self.limit = limit
+
+
+def count(key):
+    with _stats_lock:
+        stats[key] += 1
+
+
+def too_many_bits(value, limits=LIMITS):
+    """정수/분수의 분자나 분모가 constant 제한보다 크면 True"""
+    return max(value.numerator.bit_length(), value.denominator.bit_length()) > limits["constant"]
+
+
+def snapshot():
+    with _stats_lock:
+        return dict(stats)
+
+
+# -------------------------------
+# 테스트 실행
+# -------------------------------
+if __name__ == "__main__":
+    from fractions import Fraction
+
+    for v in [9 ** 16, 9 ** 256, Fraction(1, 2 ** 600), Fraction(-3, 7)]:
+        print(f"{str(v)[:20]:>22} {too_many_bits(v)}")
+    count("fast_constant")
+    print("통계:", snapshot())
@@ -0,0 +1,479 @@
+from fractions import Fraction
+from functools import lru_cache
+
+from quizgen import limits
+
+# -------------------------------
+# 학생 답안 전용 다항식 파서 (sympy 없이 채점)
+# -------------------------------
+# 학생들이 실제로 쓰는 입력만 받는 재귀 하강 파서.
+#   expr   := term (('+' | '-') term)*
+#   term   := unary (('*' | '/' | 암묵적 곱셈) unary)*
+#   unary  := ('+' | '-') unary | power
+#   power  := atom ('**' unary)?
+#   atom   := 정수 | 변수 글자들 | '(' expr ')'
+# 결과는 {단항식: 계수} 희소 표현이고, 단항식은 (('x', 2), ('y', 1)) 처럼
+# 변수 이름순 (이름, 지수) 튜플이다. 상수항은 ().
+#
+# 식의 모양도 같이 기록한다: expanded 는 sympy 가 evaluate=True 로 만든 식이
+# expand() 결과와 구조까지 같은지(= 전개된 꼴인지) 를 흉내 낸다.
+#   2(x+1) → 2x+2 (숫자 × 다항식 하나는 sympy 가 바로 분배) → 전개된 꼴
+#   x(x+1), 3(x+1)(x+2), (x+1)^2 → 곱 꼴
+#
+# 이 문법 밖의 입력(소수, 함수, 모르는 글자, 변수로 나누기 등)은 Unsupported 를
+# 던지고, 호출한 쪽에서 원래 sympy 채점으로 넘긴다.
+
+VARIABLES = frozenset("xyzabc")
+MAX_EXPONENT = 16  # 학생 답안은 4차를 넘지 않는다. 그 이상은 sympy 로 (limits.LIMITS["exponent"] 이하여야 한다)
+MAX_PRODUCT_TERMS = 4096  # 다항식 곱 한 번에 곱하는 항 쌍의 수. 넘으면 sympy 쪽 (guard 가 거른다)
+# 계수 크기는 guard 와 같은 limits.LIMITS["constant"] 로 자른다
+
+
+class ParseError(ValueError):
+    """문법에 맞지 않는 입력 (sympy 로도 파싱되지 않는 입력)"""
+
+
+class Unsupported(ValueError):
+    """문법은 맞을 수 있지만 이 파서가 다루지 않는 입력 → sympy 로 채점"""
+
+
+# -------------------------------
+# 입력 정규화 (sympy 없이 쓰도록 여기에 둔다. basic_formulas.normalize_input 도 이것)
+# -------------------------------
+def normalize_input(s: str) -> str:
+    return (s.replace("−", "-")   # 유니코드 마이너스
+              .replace("–", "-")
+              .replace("×", "*")
+              .replace("·", "*")
+              .replace("^", "**")
+              .replace(" ", ""))
+
+
+# -------------------------------
+# 다항식 연산 ({단항식: 계수})
+# -------------------------------
+def _mono_mul(m1, m2):
+    if not m1:
+        return m2
+    if not m2:
+        return m1
+    exps = dict(m1)
+    for name, e in m2:
+        exps[name] = exps.get(name, 0) + e
+    return tuple(sorted(exps.items()))
+
+
+def poly_add(p, q, sign=1):
+    out = dict(p)
+    for m, c in q.items():
+        c = out.get(m, 0) + sign * c
+        if c:
+            out[m] = c
+        else:
+            out.pop(m, None)
+    return out
+
+
+def poly_mul(p, q):
+    if len(p) * len(q) > MAX_PRODUCT_TERMS:
+        raise Unsupported("계산량이 너무 큼")
+    out = {}
+    for m1, c1 in p.items():
+        for m2, c2 in q.items():
+            m = _mono_mul(m1, m2)
+            c = out.get(m, 0) + c1 * c2
+            if c:
+                out[m] = c
+            else:
+                out.pop(m, None)
+    return out
+
+
+def check_size(p):
+    """계수가 너무 커지면 Unsupported. 곱과 거듭제곱 뒤에 불러서 ((9^16)^16)^16… 이 더 자라지 않게 한다"""
+    for c in p.values():
+        if limits.too_many_bits(c):
+            limits.count("fast_constant")
+            raise Unsupported("상수가 너무 큼")
+    return p
+
+
+def poly_pow(p, n):
+    result = {(): 1}
+    for _ in range(n):
+        result = check_size(poly_mul(result, p))
+    return result
+
+
+def poly_constant(p):
+    """상수 다항식이면 그 값, 아니면 None"""
+    if not p:
+        return 0
+    if len(p) == 1 and () in p:
+        return p[()]
+    return None
+
+
+def poly_symbols(p):
+    return {name for m in p for name, _ in m}
+
+
+# -------------------------------
+# 식 노드: (다항식, 전개된 꼴인지, sympy 에서 Add 인지)
+# -------------------------------
+class Node:
+    __slots__ = ("poly", "expanded")
+
+    def __init__(self, poly, expanded=True):
+        self.poly = poly
+        self.expanded = expanded
+
+    @property
+    def is_sum(self):
+        # sympy 에서 Add 로 남는 식 = 항이 두 개 이상
+        return len(self.poly) >= 2
+
+
+def _product(factors):
+    poly = {(): 1}
+    for f in factors:
+        poly = check_size(poly_mul(poly, f.poly))
+    if not poly:
+        return Node(poly, True)  # 0 을 곱하면 sympy 도 그냥 0
+    if not all(f.expanded for f in factors):
+        return Node(poly, False)
+    sums = [f for f in factors if f.is_sum]
+    if not sums:
+        return Node(poly, True)
+    others = [f for f in factors if not f.is_sum]
+    # 숫자 하나 × 다항식 하나는 sympy 가 분배해서 전개된 꼴이 된다
+    if len(sums) == 1 and all(poly_constant(f.poly) is not None for f in others):
+        return Node(poly, True)
+    return Node(poly, False)
+
+
+# -------------------------------
+# 토큰화
+# -------------------------------
+def tokenize_from(s, start=0):
+    """s[start:] 의 (토큰, 끝 위치) 를 차례로 낸다
+
+    토큰 하나의 모양은 끝 위치 다음 글자 하나까지만 보고 정해지므로, 입력 앞부분이 같으면
+    끝 위치가 그 앞부분 안에 있는 토큰은 그대로 다시 쓸 수 있다 (answer_input 이 이용).
+    """
+    i, n = start, len(s)
+    while i < n:
+        ch = s[i]
+        if ch.isspace():
+            i += 1
+        elif "0" <= ch <= "9":  # str.isdigit 는 ², ٣ 같은 유니코드 숫자도 받는다
+            j = i
+            while j < n and "0" <= s[j] <= "9":
+                j += 1
+            digits = s[i:j]
+            if j < n and (s[j] == "." or s[j] == "_"):
+                raise Unsupported("소수/밑줄 숫자")
+            if len(digits) > 1 and digits[0] == "0":
+                raise Unsupported("0으로 시작하는 숫자")
+            if digits == "0" and j < n and s[j] in "xXbBoO":
+                raise Unsupported("0x/0b/0o 숫자")
+            yield ("num", int(digits)), j
+            i = j
+        elif ch.isascii() and ch.isalpha():
+            j = i
+            while j < n and s[j].isascii() and (s[j].isalnum() or s[j] == "_"):
+                j += 1
+            name = s[i:j]
+            if not all(c in VARIABLES for c in name):
+                raise Unsupported(f"모르는 이름: {name}")
+            # "xy" → x*y (sympy split_symbols 와 같게)
+            for k, c in enumerate(name):
+                if k:
+                    yield ("op", "*"), j
+                yield ("var", c), j
+            i = j
+        elif s.startswith("**", i):
+            yield ("op", "**"), i + 2
+            i += 2
+        elif ch in "+-*/()":
+            yield ("op", ch), i + 1
+            i += 1
+        else:
+            raise Unsupported(f"지원하지 않는 문자: {ch!r}")
+
+
+def tokenize(s):
+    return [tok for tok, _ in tokenize_from(s)]
+
+
+# -------------------------------
+# 재귀 하강 파서
+# -------------------------------
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self):
+        tok = self.peek()
+        self.pos += 1
+        return tok
+
+    def expect(self, op):
+        if self.take() != ("op", op):
+            raise ParseError(f"'{op}' 가 필요합니다")
+
+    def parse(self):
+        if not self.tokens:
+            raise ParseError("빈 입력")
+        node = self.expr()
+        if self.pos != len(self.tokens):
+            raise ParseError("남는 토큰이 있습니다")
+        return node
+
+    def expr(self):
+        terms = [self.term()]
+        while self.peek() in (("op", "+"), ("op", "-")):
+            sign = self.take()[1]
+            term = self.term()
+            if sign == "-":
+                term = _product([Node({(): -1}), term])
+            terms.append(term)
+        if len(terms) == 1:
+            return terms[0]
+        poly = {}
+        for t in terms:
+            poly = poly_add(poly, t.poly)
+        return Node(poly, all(t.expanded for t in terms))
+
+    def _starts_atom(self):
+        kind, value = self.peek()
+        return kind in ("num", "var") or (kind, value) == ("op", "(")
+
+    def term(self):
+        factors = [self.unary()]
+        while True:
+            tok = self.peek()
+            if tok == ("op", "*"):
+                self.take()
+                factors.append(self.unary())
+            elif tok == ("op", "/"):
+                self.take()
+                divisor = self.unary()
+                c = poly_constant(divisor.poly)
+                if c is None:
+                    raise Unsupported("변수로 나누기")
+                if c == 0:
+                    raise Unsupported("0으로 나누기")
+                factors.append(Node({(): Fraction(1) / c}))
+            elif self._starts_atom():
+                factors.append(self.unary())
+            else:
+                break
+        return factors[0] if len(factors) == 1 else _product(factors)
+
+    def unary(self):
+        tok = self.peek()
+        if tok == ("op", "-"):
+            self.take()
+            return _product([Node({(): -1}), self.unary()])
+        if tok == ("op", "+"):
+            self.take()
+            return self.unary()
+        return self.power()
+
+    def power(self):
+        base = self.atom()
+        if self.peek() != ("op", "**"):
+            return base
+        self.take()
+        exponent = self.unary()
+        n = poly_constant(exponent.poly)
+        if n is None or Fraction(n).denominator != 1:
+            raise Unsupported("정수가 아닌 지수")
+        n = int(n)
+        if abs(n) > MAX_EXPONENT:  # 음수 지수도 먼저 확인한다 (2^-10^15)
+            limits.count("fast_exponent")
+            raise Unsupported("지수가 너무 큼")
+        if n < 0:
+            c = poly_constant(base.poly)
+            if not c:
+                raise Unsupported("음수 지수")
+            return Node(check_size({(): Fraction(1) / Fraction(c) ** -n}))
+        if n == 0:
+            return Node({(): 1})
+        if n == 1:
+            return base
+        return Node(poly_pow(base.poly, n), base.expanded and not base.is_sum)
+
+    def atom(self):
+        kind, value = self.take()
+        if kind == "num":
+            return Node({(): value} if value else {})
+        if kind == "var":
+            return Node({((value, 1),): 1})
+        if (kind, value) == ("op", "("):
+            node = self.expr()
+            self.expect(")")
+            return node
+        raise ParseError("식이 필요한 자리입니다")
+
+
+def parse_poly(s):
+    """문자열 → Node(poly, expanded). ParseError / Unsupported 를 던질 수 있다"""
+    return _Parser(tokenize(s)).parse()
+
+
+def parse_tokens(tokens):
+    """이미 나눈 토큰 목록 → Node"""
+    return _Parser(tokens).parse()
+
+
+# -------------------------------
+# 입력 미리보기 (학생이 쓴 모양 그대로 LaTeX 로)
+# -------------------------------
+class _LatexParser(_Parser):
+    """같은 문법을 따라가면서 계산 대신 LaTeX 문자열을 만든다 (parse 가 성공한 토큰에만 쓴다)"""
+
+    def expr(self):
+        out = self.term()
+        while self.peek() in (("op", "+"), ("op", "-")):
+            sign = self.take()[1]
+            out += f" {sign} {self.term()}"
+        return out
+
+    def term(self):
+        out = self.unary()
+        while True:
+            tok = self.peek()
+            if tok == ("op", "/"):
+                self.take()
+                out = r"\frac{%s}{%s}" % (out, self.unary())
+                continue
+            if tok == ("op", "*"):
+                self.take()
+            elif not self._starts_atom():
+                break
+            rhs = self.unary()
+            # 숫자끼리 붙으면 2 3 이 23 으로 보이므로 점을 찍는다
+            out += r" \cdot " if out[-1].isdigit() and rhs[0].isdigit() else " "
+            out += rhs
+        return out
+
+    def unary(self):
+        tok = self.peek()
+        if tok == ("op", "-"):
+            self.take()
+            return "-" + self.unary()
+        if tok == ("op", "+"):
+            self.take()
+            return self.unary()
+        return self.power()
+
+    def power(self):
+        base = self.atom()
+        if self.peek() != ("op", "**"):
+            return base
+        self.take()
+        return "%s^{%s}" % (base, self.unary())
+
+    def atom(self):
+        kind, value = self.take()
+        if kind in ("num", "var"):
+            return str(value)
+        node = self.expr()
+        self.expect(")")
+        return r"\left(%s\right)" % node
+
+
+def input_latex(tokens):
+    """토큰 목록 → 입력한 모양 그대로의 LaTeX ((x+3)^2 를 전개하지 않고 그린다)"""
+    return _LatexParser(tokens).parse()
+
+
+# -------------------------------
+# 정답 쪽 표현 만들기
+# -------------------------------
+def poly_from_coeffs(coeffs, names):
+    """templates 의 {차수 튜플: 계수} 를 정규 희소 표현으로"""
+    out = {}
+    for monom, c in coeffs.items():
+        if c:
+            out[tuple((n, e) for n, e in sorted(zip(names, monom)) if e)] = c
+    return out
+
+
+@lru_cache(maxsize=1024)
+def poly_from_sympy(expr):
+    """sympy 다항식 → 정규 희소 표현 (같은 정답은 한 번만 변환)"""
+    from sympy import Poly
+
+    syms = sorted(expr.free_symbols, key=lambda s: s.name)
+    if not syms:
+        return {(): Fraction(int(expr.p), int(expr.q))} if expr != 0 else {}
+    out = {}
+    for monom, c in Poly(expr, *syms).terms():
+        c = Fraction(int(c.p), int(c.q))
+        out[tuple((s.name, e) for s, e in zip(syms, monom) if e)] = c
+    return out
+
+
+def poly_to_sympy(poly):
+    from sympy import Add, Mul, Rational, Symbol
+
+    return Add(*[Rational(c.numerator, c.denominator) * Mul(*[Symbol(n)**e for n, e in m])
+                 for m, c in poly.items()])
+
+
+def as_poly(answer):
+    if isinstance(answer, dict):
+        return answer
+    return poly_from_sympy(answer)
+
+
+# -------------------------------
+# 빠른 채점
+# -------------------------------
+def check_node(node, answer, form=None):
+    """파싱된 학생 답 Node 가 정답인지
+
+    form: None 이면 값만 비교, "expanded" 면 전개된 꼴이어야 정답,
+          "factored" 면 전개되지 않은 (곱) 꼴이어야 정답
+    """
+    answer_poly = as_poly(answer)
+    # 문제에 없는 변수를 쓰면 오답
+    if poly_symbols(node.poly) - poly_symbols(answer_poly):
+        return False
+    if form == "expanded" and not node.expanded:
+        return False
+    if form == "factored" and node.expanded:
+        return False
+    return node.poly == answer_poly
+
+
+def fast_check(processed_input, answer, form=None):
+    """True/False, 또는 sympy 로 넘겨야 하면 None (form 은 check_node 와 같다)"""
+    try:
+        node = parse_poly(processed_input)
+    except ParseError:
+        return False
+    except Unsupported:
+        return None
+    return check_node(node, answer, form)
+
+
+# -------------------------------
+# 테스트 실행
+# -------------------------------
+if __name__ == "__main__":
+    answer = {(("x", 2),): 1, (("x", 1),): 6, (): 9}  # x^2 + 6x + 9
+    for s in ["x**2+6x+9", "(x+3)**2", "(x+3)(x+3)", "x*x+6*x+9", "2(x**2+3x)+9-x**2",
+              "x**2+6x+9.0", "sin(x)", "(x+3", "x**2+6y+9", "(x+3)²", "x**2+6x+٩",
+              "2^-10^15", "((((((((((((9)^16)^16)^16)^16)^16)^16)^16)^16)^16)^16)^16)^16)"]:
+        t = normalize_input(s)
+        print(f"{s[:20]:>20}", fast_check(t, answer), fast_check(t, answer, "expanded"),
+              fast_check(t, answer, "factored"))
+    print("통계:", limits.snapshot())
@@ -0,0 +1,182 @@
+import itertools
+import random
+from fractions import Fraction
+from functools import lru_cache
+
+from quizgen import bank as qbank
+
+# -------------------------------
+# 세션에 보관하는 작은 문제 기록
+# -------------------------------
+# 세션마다 문제 딕셔너리(LaTeX 문자열, 보기 목록, sympy 객체)를 들고 있는 대신
+# (유형 번호, 문제 은행 인덱스, 보기 순서 번호) 정수 세 개만 보관한다.
+# 인덱스는 bank.index_to_params 로 계수를 그대로 되살릴 수 있는 혼합 기수 번호이다.
+# 화면에 그릴 LaTeX 는 RecordRenderer 가 프로세스 전체에서 같이 쓰는 LRU 캐시를 거쳐
+# 문제 은행에서 꺼내고 (은행 파일이 없으면 템플릿으로 만든다), sympy 객체는 채점에
+# 필요할 때만 만든다.
+
+TYPE_IDS = {name: i for i, name in enumerate(qbank.PROBLEM_TYPES)}
+PERMUTATIONS = list(itertools.permutations(range(4)))  # 보기 4개의 순서 24가지
+
+
+class ProblemRecord:
+    __slots__ = ("type_id", "index", "perm")
+
+    def __init__(self, type_id, index, perm):
+        self.type_id = type_id
+        self.index = index
+        self.perm = perm
+
+    @property
+    def problem_type(self):
+        return qbank.PROBLEM_TYPES[self.type_id]
+
+    def __eq__(self, other):
+        return isinstance(other, ProblemRecord) and \
+            (self.type_id, self.index, self.perm) == (other.type_id, other.index, other.perm)
+
+    def __hash__(self):
+        return hash((self.type_id, self.index, self.perm))
+
+    def __repr__(self):
+        return f"ProblemRecord({self.problem_type!r}, index={self.index}, perm={self.perm})"
+
+    def __reduce__(self):
+        return ProblemRecord, (self.type_id, self.index, self.perm)
+
+
+def sample_record(problem_type, rng=random):
+    """generate_* 와 같은 분포로 문제 하나를 뽑는다 (LaTeX 없음, 수 µs)"""
+    params = qbank.sample_params(problem_type)
+    return ProblemRecord(TYPE_IDS[problem_type], qbank.params_to_index(problem_type, params),
+                         rng.randrange(len(PERMUTATIONS)))
+
+
+# -------------------------------
+# 기록 → 문제 (공용 캐시)
+# -------------------------------
+# 유형 → 템플릿 이름, 매개변수 → 템플릿 인자 (generate_* 와 같은 공식)
+_TEMPLATE_NAMES = {"type1": "SQUARE", "type2": "SUM_DIFF", "type3": "TWO_LINEAR", "type4": "TWO_LINEAR"}
+
+
+def _template_args(problem_type, params):
+    family = problem_type.partition("_")[0]
+    if family in ("type1", "type2"):
+        names = [qbank.VARIABLE_NAMES[params[0]]]
+        coeffs = [qbank.COEFFS[i] for i in params[1:]]
+        return names, [int(c) if c.denominator == 1 else Fraction(c) for c in coeffs]
+    if family == "type3":
+        return ["x"], [1, params[0] + 1, 1, params[1] + 1]
+    return ["x"], [p + 1 for p in params]
+
+
+def _template_problem(problem_type, index):
+    from quizgen import templates as tpl
+
+    names, args = _template_args(problem_type, qbank.index_to_params(problem_type, index))
+    template = getattr(tpl, _TEMPLATE_NAMES[problem_type.partition("_")[0]])
+    expansion = problem_type.endswith("_expansion")
+    return template, names, args, tpl.make_problem(template, names, args, expansion)
+
+
+class RecordRenderer:
+    """ProblemRecord 를 화면용 문제 딕셔너리로. 프로세스에 하나 두고 모든 세션이 같이 쓴다"""
+
+    def __init__(self, problem_bank=None, maxsize=4096):
+        self.problem_bank = problem_bank
+        # (유형 번호, 인덱스) → (문제, 정답, 정렬된 보기 4개). lru_cache 는 스레드 안전하다
+        self._strings = lru_cache(maxsize=maxsize)(self._load)
+        # (유형 번호, 인덱스) → 직접 입력 채점용 정답 다항식
+        self._answer_polys = lru_cache(maxsize=maxsize)(self._load_answer_poly)
+
+    def _load(self, type_id, index):
+        problem_type = qbank.PROBLEM_TYPES[type_id]
+        if self.problem_bank is not None:
+            question, answer, *choices = self.problem_bank.strings(problem_type, index)
+            return question, answer, tuple(choices)
+
+        from quizgen import distractors
+
+        template, names, args, problem = _template_problem(problem_type, index)
+        choices = distractors.make_choices(template, names, args, problem_type.endswith("_expansion"),
+                                           seed=index)
+        return problem["latex_question"], problem["latex_answer"], tuple(sorted(choices))
+
+    def render(self, record):
+        """{"latex_question", "latex_answer", "choices"} (예전 current_problem 과 같은 모양)"""
+        question, answer, choices = self._strings(record.type_id, record.index)
+        return {
+            "latex_question": question,
+            "latex_answer": answer,
+            "choices": [choices[i] for i in PERMUTATIONS[record.perm]],
+        }
+
+    def _load_answer_poly(self, type_id, index):
+        from quizgen import polyparse
+
+        _, names, _, problem = _template_problem(qbank.PROBLEM_TYPES[type_id], index)
+        return polyparse.poly_from_coeffs(problem["coeffs"], names)
+
+    def answer_poly(self, record):
+        """polyparse 의 {단항식: 계수} 정답 (인수분해 문제도 값은 전개식과 같다, sympy 없음)"""
+        return self._answer_polys(record.type_id, record.index)
+
+    def sympy_problem(self, record):
+        """채점용 sympy 객체(answer_obj, expanded_obj)까지 있는 문제 (필요할 때만)"""
+        return _template_problem(record.problem_type, record.index)[3]
+
+    def cache_info(self):
+        return self._strings.cache_info()
+
+
+# -------------------------------
+# 메모리 측정: python -m quizgen.record
+# -------------------------------
+def _measure(make, n):
+    import gc
+    import tracemalloc
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    sessions = [make() for _ in range(n)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return size / n, sessions
+
+
+if __name__ == "__main__":
+    from quizgen import basic_formulas as bf
+
+    N = 500
+    problem_bank = qbank.load_bank()
+    renderer = RecordRenderer(problem_bank)
+
+    def legacy_session():
+        # 예전 app: generate_* 딕셔너리 + 채점/표시 때 만들어진 sympy 객체
+        problem = bf.generate_type1_expansion()
+        problem["answer_obj"]
+        return {"current_problem": problem}
+
+    def bank_session():
+        return {"current_problem": problem_bank.sample("type1_expansion")}
+
+    def record_session():
+        return {"current_problem": sample_record("type1_expansion")}
+
+    random.seed(0)
+    results = [("generate_* 딕셔너리 + sympy", legacy_session)]
+    if problem_bank is not None:
+        results.append(("문제 은행 딕셔너리", bank_session))
+    results.append(("ProblemRecord", record_session))
+    for label, make in results:
+        per_session, sessions = _measure(make, N)
+        print(f"{label:<28} 세션당 {per_session:8.0f} B  ({N}세션 {per_session * N / 1024:8.1f} KiB)")
+
+    # 화면에 그릴 때 만드는 딕셔너리는 rerun 한 번 동안만 살아 있다
+    record = sample_record("type1_expansion")
+    print(record, renderer.render(record))
+    print("캐시:", renderer.cache_info())
+    no_bank = RecordRenderer(None)
+    assert no_bank.render(record)["latex_question"] == renderer.render(record)["latex_question"]
@@ -0,0 +1,136 @@
+from functools import lru_cache
+
+from quizgen import bank as qbank
+from quizgen.record import PERMUTATIONS, TYPE_IDS, ProblemRecord
+
+# -------------------------------
+# 겹치지 않는 문제 뽑기 (매개변수 공간의 시드 순열)
+# -------------------------------
+# 유형마다 매개변수 조합은 bank.space_size 개(type3 는 25개)뿐이라, 매번 무작위로 뽑으면
+# 금방 같은 문제가 다시 나온다. 대신 세션마다 정한 시드로 [0, n) 의 순열 π 를 만들고
+# k 번째 문제로 π(k) 를 낸다. 순열을 목록으로 만들지 않고 Feistel 네트워크로 바로 계산하므로
+#   - 메모리: 유형마다 정수 커서 하나 (세션 상태에 k 만 저장)
+#   - 한 번 뽑기: 라운드 함수 4번 × cycle walking 평균 4번 이하
+# n 개를 다 내면 (k // n 이 바뀌면) 다른 키로 새 순열을 시작한다.
+# 뽑는 분포는 조합마다 균등하다 (generate_* 의 get_coeff 처럼 정수 계수를 더 자주 뽑지는 않는다).
+
+ROUNDS = 4
+_M64 = (1 << 64) - 1
+
+
+def _mix(x):
+    """splitmix64 마무리 함수 (64비트 정수 → 64비트 정수, 잘 섞임)"""
+    x = (x + 0x9E3779B97F4A7C15) & _M64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _M64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _M64
+    return x ^ (x >> 31)
+
+
+class FeistelPermutation:
+    """[0, n) 위의 전단사 함수. 같은 (n, key) 면 언제나 같은 순열"""
+
+    __slots__ = ("n", "half_bits", "mask", "keys")
+
+    def __init__(self, n, key, rounds=ROUNDS):
+        if n < 1:
+            raise ValueError(n)
+        # 2 * half_bits 비트 공간 (n 이상인 가장 작은 4의 거듭제곱, n 의 4배 미만)
+        self.n = n
+        self.half_bits = max(1, ((n - 1).bit_length() + 1) // 2)
+        self.mask = (1 << self.half_bits) - 1
+        self.keys = tuple(_mix((key & _M64) ^ _mix(r)) for r in range(rounds))
+
+    def _encrypt(self, x):
+        left, right = x >> self.half_bits, x & self.mask
+        for k in self.keys:
+            left, right = right, left ^ (_mix(right ^ k) & self.mask)
+        return (left << self.half_bits) | right
+
+    def __call__(self, i):
+        if not 0 <= i < self.n:
+            raise IndexError(i)
+        # cycle walking: 범위 밖으로 나가면 다시 돌린다 (큰 공간의 순열이므로 [0, n) 안에서도 전단사)
+        x = self._encrypt(i)
+        while x >= self.n:
+            x = self._encrypt(x)
+        return x
+
+
+@lru_cache(maxsize=1024)  # 순열 객체는 키 4개짜리라 작다 (세션들이 같이 쓴다)
+def _epoch_permutation(problem_type, seed, epoch):
+    key = _mix(_mix(seed & _M64) ^ (TYPE_IDS[problem_type] << 32) ^ epoch)
+    return FeistelPermutation(qbank.space_size(problem_type), key)
+
+
+@lru_cache(maxsize=1024)
+def _rotation(problem_type, seed, epoch):
+    """epoch 번째 순열을 몇 칸 돌려 쓰는지 (0 또는 1)
+
+    순열이 바뀌는 자리에서 바로 앞 문제가 다시 나오지 않도록, 새 순열의 첫 문제가 앞 바퀴의
+    실제 마지막 문제(앞 바퀴도 돌려 썼을 수 있다)와 같으면 한 칸 돌린다. 첫 바퀴부터 차례로 따진다.
+    """
+    n = qbank.space_size(problem_type)
+    rotation = 0
+    if n > 1:
+        for e in range(1, epoch + 1):
+            last = _epoch_permutation(problem_type, seed, e - 1)((n - 1 + rotation) % n)
+            rotation = int(_epoch_permutation(problem_type, seed, e)(0) == last)
+    return rotation
+
+
+def draw(problem_type, seed, cursor):
+    """세션 시드의 cursor 번째 문제 인덱스. 같은 순열 안에서는 겹치지 않는다"""
+    n = qbank.space_size(problem_type)
+    epoch, position = divmod(cursor, n)
+    perm = _epoch_permutation(problem_type, seed, epoch)
+    if epoch:
+        position = (position + _rotation(problem_type, seed, epoch)) % n
+    return perm(position)
+
+
+def record_at(problem_type, seed, cursor):
+    """cursor 번째 ProblemRecord (보기 순서도 시드와 커서로 정한다)"""
+    index = draw(problem_type, seed, cursor)
+    perm = _mix(_mix(seed & _M64) ^ _mix(cursor) ^ TYPE_IDS[problem_type]) % len(PERMUTATIONS)
+    return ProblemRecord(TYPE_IDS[problem_type], index, perm)
+
+
+# -------------------------------
+# 테스트 실행
+# -------------------------------
+if __name__ == "__main__":
+    import time
+
+    for problem_type in qbank.PROBLEM_TYPES:
+        n = qbank.space_size(problem_type)
+        for seed in (0, 1, 12345, 2**63 + 7):
+            # 한 바퀴가 [0, n) 의 순열인지, 두 바퀴째는 다른 순서인지
+            first = [draw(problem_type, seed, k) for k in range(n)]
+            second = [draw(problem_type, seed, k) for k in range(n, 2 * n)]
+            assert sorted(first) == list(range(n)), (problem_type, seed)
+            assert sorted(second) == list(range(n)), (problem_type, seed)
+            assert first[-1] != second[0] or n == 1
+            assert n < 4 or first != second
+        print(f"{problem_type:<22} n={n:<4} 앞 8개 {[draw(problem_type, 0, k) for k in range(8)]}")
+
+    # 여러 바퀴 이어서 뽑아도 바퀴가 바뀌는 자리에서 같은 문제가 연달아 나오지 않는다
+    # (앞 바퀴를 돌려 쓴 경우 포함, 예: type3 시드 2775 의 3번째 바퀴)
+    n = qbank.space_size("type3_expansion")
+    for seed in range(3000):
+        drawn = [draw("type3_expansion", seed, k) for k in range(6 * n)]
+        assert all(a != b for a, b in zip(drawn, drawn[1:])), seed
+        assert all(sorted(drawn[e * n:(e + 1) * n]) == list(range(n)) for e in range(6)), seed
+
+    # 커서 하나로 이어서 뽑기: 같은 (시드, 커서) → 같은 문제
+    seed = 2024
+    session = [record_at("type3_expansion", seed, k) for k in range(10)]
+    resumed = [record_at("type3_expansion", seed, k) for k in range(5, 10)]
+    assert session[5:] == resumed
+    assert len({r.index for r in session}) == 10
+    assert [record_at("type3_expansion", seed + 1, k).index for k in range(10)] != [r.index for r in session]
+
+    start = time.perf_counter()
+    N = 100_000
+    for k in range(N):
+        record_at("type4_expansion", seed, k)
+    print(f"record_at: {(time.perf_counter() - start) / N * 1e6:.1f} µs/문제")
@@ -1,10 +1,12 @@
 import random
-from sympy import symbols, expand, latex, Rational, simplify
+from sympy import symbols, expand, Rational, simplify
 from sympy.parsing.sympy_parser import (
-    parse_expr,
     standard_transformations,
     implicit_multiplication_application
 )
+from quizgen import guard
+from quizgen import polyparse
+from quizgen import templates as tpl
 
 # 사용할 변수 후보
 x, y, a, b = symbols('x y a b')
@@ -28,29 +30,25 @@ def generate_square_binomial():
     c1 = get_coeff()
     c2 = get_coeff() * random.choice([1, -1])  # ± 부호 랜덤
     
-    if isinstance(var, tuple):  # 변수가 2개인 경우 (예: x, y)
-        base = c1*var[0] + c2*var[1]
-    else:  # 변수가 1개인 경우
-        base = c1*var + c2
-    
-    expr = base**2
-    
-    return {
-        "latex_question": latex(expr),             # 문제 표시용
-        "answer_obj": expand(expr),                # 채점용 객체
-        "latex_answer": latex(expand(expr))        # 정답 표시용
-    }
+    if isinstance(var, tuple):  # 변수가 2개인 경우 (예: x, y): (c1*x + c2*y)**2
+        return tpl.make_problem(tpl.SQUARE_2VAR, [v.name for v in var], (c1, c2))
+    # 변수가 1개인 경우: (c1*var + c2)**2
+    # latex_question: 문제 표시용, answer_obj: 채점용 객체, latex_answer: 정답 표시용
+    return tpl.make_problem(tpl.SQUARE, [var.name], (c1, c2))
 
 def check_answer(user_input_str, answer_obj):
     """학생 답안 채점"""
     try:
         # ^ → ** 변환
         processed_input = user_input_str.replace('^', '**')
+        # 전용 파서로 먼저 채점 (파서가 다루지 않는 입력만 아래 sympy 로)
+        guard.check_length(processed_input)
+        result = polyparse.fast_check(processed_input, answer_obj)
+        if result is not None:
+            return result
         # 문자열을 sympy 수식으로 파싱 (허용 변수만 사용)
-        user_expr = parse_expr(processed_input,
-                               transformations=transformations,
-                               local_dict=allowed,
-                               evaluate=True)
+        # (계산량이 큰 입력은 guard 에서 바로 거부)
+        user_expr = guard.parse(processed_input, allowed, transformations)
         
         # 1. 문제에 없는 변수를 쓰면 오답 처리
         if user_expr.free_symbols - answer_obj.free_symbols:
@@ -1,10 +1,12 @@
 import random
-from sympy import symbols, expand, latex, Rational
+from sympy import symbols, expand, Rational, Integer, Symbol, Number
 from sympy.parsing.sympy_parser import (
-    parse_expr,
     standard_transformations,
     implicit_multiplication_application
 )
+from quizgen import guard
+from quizgen import polyparse
+from quizgen import templates as tpl
 
 # 사용할 변수 후보
 x, y, a, b = symbols('x y a b')
@@ -14,7 +16,13 @@ variables = [x, a, b, (x, y)]  # 1개 또는 2개 변수
 transformations = (standard_transformations + (implicit_multiplication_application,))
 
 # 허용 변수 딕셔너리 (학생 답안 검증용)
-allowed = {"x": x, "y": y, "a": a, "b": b}
+# global_dict={} 로 파싱하므로 숫자/변수 생성에 필요한 이름도 넣어 둔다
+allowed = {
+    "x": x, "y": y, "a": a, "b": b,
+    "Integer": Integer,
+    "Symbol": Symbol,
+    "Number": Number
+}
 
 def get_coeff():
     """계수: 정수 또는 분수(Rational)"""
@@ -30,18 +38,9 @@ def generate_square_binomial():
     c1 = get_coeff()
     c2 = get_coeff() * random.choice([1, -1])  # ± 부호 랜덤
     
-    if isinstance(var, tuple):  # 변수가 2개인 경우
-        base = c1*var[0] + c2*var[1]
-    else:
-        base = c1*var + c2
-    
-    expr = base**2
-    
-    return {
-        "latex_question": latex(expr),
-        "answer_obj": expand(expr),
-        "latex_answer": latex(expand(expr))
-    }
+    if isinstance(var, tuple):  # 변수가 2개인 경우: (c1*x + c2*y)**2
+        return tpl.make_problem(tpl.SQUARE_2VAR, [v.name for v in var], (c1, c2))
+    return tpl.make_problem(tpl.SQUARE, [var.name], (c1, c2))
 
 # -------------------------------
 # 2번 공식: 합차공식 (a+b)(a-b)
@@ -51,20 +50,10 @@ def generate_diff_of_squares():
     c1 = get_coeff()
     c2 = get_coeff()
     
-    if isinstance(var, tuple):
-        base1 = c1*var[0]
-        base2 = c2*var[1]
-    else:
-        base1 = c1*var
-        base2 = c2
-    
-    expr = (base1 + base2) * (base1 - base2)
-    
-    return {
-        "latex_question": latex((base1 + base2) * (base1 - base2)),
-        "answer_obj": expand(expr),
-        "latex_answer": latex(expand(expr))
-    }
+    if isinstance(var, tuple):  # (c1*x + c2*y) * (c1*x - c2*y)
+        return tpl.make_problem(tpl.SUM_DIFF_2VAR, [v.name for v in var], (c1, c2))
+    # (c1*var + c2) * (c1*var - c2)
+    return tpl.make_problem(tpl.SUM_DIFF_COEFF, [var.name], (c1, c2))
 
 # -------------------------------
 # 채점 로직 (개선된 버전)
@@ -72,11 +61,13 @@ def generate_diff_of_squares():
 def check_answer(user_input_str, answer_obj):
     try:
         processed_input = user_input_str.replace('^', '**')
-        user_expr = parse_expr(processed_input,
-                               transformations=transformations,
-                               local_dict=allowed,
-                               global_dict={},   # 안전성 강화
-                               evaluate=True)
+        # 전용 파서로 먼저 채점 (전개된 꼴만 정답, 파서 밖의 입력만 sympy 로)
+        guard.check_length(processed_input)
+        result = polyparse.fast_check(processed_input, answer_obj, form="expanded")
+        if result is not None:
+            return result
+        user_expr = guard.parse(processed_input, allowed, transformations,
+                                global_dict={})   # 안전성 강화 + 계산량 제한
         
         # 1. 문제 외 변수 차단
         if user_expr.free_symbols - answer_obj.free_symbols:
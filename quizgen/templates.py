@@ -0,0 +1,260 @@
+from fractions import Fraction
+
+from sympy import Add, Mul, Poly, Rational, Symbol, expand, sympify
+from sympy.printing.str import StrPrinter
+
+# -------------------------------
+# 문제 템플릿 컴파일러
+# -------------------------------
+# "(p*v + q)**2" 같은 공식을 import 할 때 한 번만 sympy로 전개해서
+# 각 항의 계수를 매개변수(p, q, ...)의 파이썬 함수로 만들어 둔다.
+# 문제를 만들 때는 Fraction/int 계산과 문자열 조립만 하고,
+# LaTeX 는 sympy latex() 와 글자 하나까지 같게 만든다.
+#
+# 변수 이름은 알파벳 순서로 넘겨야 한다 (sympy가 항을 그 순서로 정렬하기 때문)
+
+class _FractionPrinter(StrPrinter):
+    def _print_Rational(self, expr):
+        return f"Fraction({expr.p}, {expr.q})"
+
+    def _print_Integer(self, expr):
+        return str(expr.p)
+
+
+def _compile_poly(expr, variables, params):
+    """expr 를 variables 의 다항식으로 보고, 항별 계수를 params 의 함수로 컴파일"""
+    printer = _FractionPrinter()
+    terms = Poly(expand(expr), *variables).terms()
+    items = ", ".join(f"({monom!r}, {printer.doprint(coeff)})" for monom, coeff in terms)
+    source = f"lambda {', '.join(str(p) for p in params)}: ({items},)"
+    return eval(source, {"Fraction": Fraction})
+
+
+def to_number(value):
+    """int, sympy Rational, Fraction 을 int(정수일 때) 또는 Fraction 으로"""
+    if isinstance(value, (int, Fraction)):
+        return value
+    if value.q == 1:
+        return int(value.p)
+    return Fraction(int(value.p), int(value.q))
+
+
+# -------------------------------
+# LaTeX 출력 (sympy latex() 와 같은 모양)
+# -------------------------------
+def _latex_number(c):
+    if c.denominator == 1:
+        return str(c.numerator)
+    return r"\frac{%d}{%d}" % (c.numerator, c.denominator)
+
+
+def _latex_monomial(monom, names):
+    parts = []
+    for name, e in zip(names, monom):
+        if e == 1:
+            parts.append(name)
+        elif e > 1:
+            parts.append("%s^{%d}" % (name, e))
+    return " ".join(parts)
+
+
+def _latex_term(c, monom, names):
+    """양수 계수 c 인 항 하나"""
+    m = _latex_monomial(monom, names)
+    if not m:
+        return _latex_number(c)
+    if c.denominator == 1:
+        return m if c.numerator == 1 else f"{c.numerator} {m}"
+    numer = m if c.numerator == 1 else f"{c.numerator} {m}"
+    return r"\frac{%s}{%d}" % (numer, c.denominator)
+
+
+def ordered_terms(coeffs):
+    """0 이 아닌 (차수 튜플, 계수) 를 sympy 항 순서(lex 내림차순)로"""
+    return sorted(((m, c) for m, c in coeffs.items() if c != 0), reverse=True)
+
+
+def latex_poly(coeffs, names):
+    """{차수 튜플: 계수} 다항식을 sympy latex(expand(...)) 와 같은 문자열로"""
+    terms = ordered_terms(coeffs)
+    if not terms:
+        return "0"
+    if len(terms) == 1 and not any(terms[0][0]) and terms[0][1] < 0:
+        c = terms[0][1]
+        return str(c.numerator) if c.denominator == 1 else "- " + _latex_number(-c)
+    if len(terms) == 2 and not any(terms[1][0]) and terms[1][1] > 0 and terms[0][1] < 0 \
+            and sum(1 for e in terms[0][0] if e) == 1:
+        # sympy 는 "양수 상수 + (음수)*(거듭제곱 하나)" 두 항이면 상수를 앞에 쓴다 (예: 16 - x^{2})
+        terms.reverse()
+    out = []
+    for i, (m, c) in enumerate(terms):
+        if c < 0:
+            out.append("- " if i == 0 else " - ")
+            c = -c
+        elif i > 0:
+            out.append(" + ")
+        out.append(_latex_term(c, m, names))
+    return "".join(out)
+
+
+def latex_factors(factors, names):
+    """[(인수 계수, 지수)] 를 sympy latex(Mul/Pow) 와 같은 문자열로"""
+    parts = []
+    for coeffs, power in factors:
+        inner = latex_poly(coeffs, names)
+        if power == 1:
+            parts.append(r"\left(%s\right)" % inner)
+        else:
+            parts.append(r"\left(%s\right)^{%d}" % (inner, power))
+    return " ".join(parts)
+
+
+def _factor_sort_key(coeffs):
+    # sympy default_sort_key 로 Add 를 비교하는 것과 같다: 항 개수 → 항별 계수 순
+    terms = ordered_terms(coeffs)
+    return len(terms), tuple((m, c) for m, c in terms)
+
+
+def merge_factors(flat):
+    """인수 계수 목록을 sympy Mul 처럼 정렬하고 같은 인수는 지수로 합친다"""
+    flat = sorted(flat, key=_factor_sort_key)
+    merged = []
+    for coeffs in flat:
+        if merged and merged[-1][0] == coeffs:
+            merged[-1][1] += 1
+        else:
+            merged.append([coeffs, 1])
+    return [(coeffs, power) for coeffs, power in merged]
+
+
+def expand_factors(factors):
+    """[(인수 계수, 지수)] 를 곱해서 {차수 튜플: 계수} 로"""
+    result = None
+    for coeffs, power in factors:
+        for _ in range(power):
+            if result is None:
+                result = dict(coeffs)
+                continue
+            product = {}
+            for m1, c1 in result.items():
+                for m2, c2 in coeffs.items():
+                    m = tuple(e1 + e2 for e1, e2 in zip(m1, m2))
+                    product[m] = product.get(m, 0) + c1 * c2
+            result = {m: c for m, c in product.items() if c != 0}
+    return result or {}
+
+
+# -------------------------------
+# 컴파일된 템플릿
+# -------------------------------
+class Template:
+    def __init__(self, source, params, variables=("v",)):
+        """source: 매개변수(params)와 자리표시 변수(variables)로 쓴 곱 꼴 공식"""
+        self.source = source
+        self.params = tuple(params)
+        self.variables = tuple(variables)
+        local = {n: Symbol(n) for n in self.params + self.variables}
+        expr = sympify(source, locals=local)
+        param_syms = [local[n] for n in self.params]
+        var_syms = [local[n] for n in self.variables]
+
+        self._expanded = _compile_poly(expr, var_syms, param_syms)
+        if expr.is_Pow:
+            bases = [(expr.base, int(expr.exp))]
+        else:
+            bases = [(f, 1) for f in Mul.make_args(expr)]
+        self._factors = [(_compile_poly(f, var_syms, param_syms), power) for f, power in bases]
+
+    def expanded(self, *args):
+        """전개식의 {차수 튜플: int 또는 Fraction}"""
+        args = [to_number(a) for a in args]
+        return {monom: c for monom, c in self._expanded(*args) if c != 0}
+
+    def factors(self, *args):
+        """sympy 가 Mul 을 정렬/합치는 것과 같은 순서의 [(인수 계수, 지수)]"""
+        args = [to_number(a) for a in args]
+        flat = []
+        for fn, power in self._factors:
+            coeffs = {m: c for m, c in fn(*args) if c != 0}
+            flat.extend([coeffs] * power)
+        return merge_factors(flat)
+
+    def latex_expanded(self, names, *args):
+        return latex_poly(self.expanded(*args), names)
+
+    def latex_factored(self, names, *args):
+        return latex_factors(self.factors(*args), names)
+
+
+# -------------------------------
+# sympy 객체는 필요할 때만 만든다
+# -------------------------------
+def sympy_poly(coeffs, names):
+    syms = [Symbol(n) for n in names]
+    terms = []
+    for monom, c in coeffs.items():
+        term = Rational(c.numerator, c.denominator)
+        for s, e in zip(syms, monom):
+            term *= s**e
+        terms.append(term)
+    return Add(*terms)
+
+
+def sympy_factors(factors, names):
+    return Mul(*[sympy_poly(coeffs, names)**power for coeffs, power in factors])
+
+
+class LazyProblem(dict):
+    """answer_obj / expanded_obj 같은 sympy 객체는 처음 꺼낼 때 만드는 문제 딕셔너리"""
+
+    def __init__(self, data, lazy):
+        super().__init__(data)
+        self._lazy = lazy
+
+    def __missing__(self, key):
+        if key not in self._lazy:
+            raise KeyError(key)
+        value = self[key] = self._lazy.pop(key)()
+        return value
+
+    def get(self, key, default=None):
+        if key in self or key in self._lazy:
+            return self[key]
+        return default
+
+    def __reduce__(self):
+        # 세션 저장/복사 시에는 모든 값을 만들어 일반 dict 로
+        return dict, (dict(self, **{k: self[k] for k in list(self._lazy)}),)
+
+
+# -------------------------------
+# 교과 공식 템플릿
+# -------------------------------
+SQUARE = Template("(p*v + q)**2", "pq")                            # (ax+b)^2
+SUM_DIFF = Template("(v + p)*(v - p)", "p")                        # (x+a)(x-a)
+SUM_DIFF_COEFF = Template("(p*v + q)*(p*v - q)", "pq")             # (ax+b)(ax-b)
+TWO_LINEAR = Template("(p*v + q)*(r*v + s)", "pqrs")               # (ax+b)(cx+d)
+SQUARE_2VAR = Template("(p*v + q*w)**2", "pq", ("v", "w"))         # (ax+by)^2
+SUM_DIFF_2VAR = Template("(p*v + q*w)*(p*v - q*w)", "pq", ("v", "w"))
+
+
+def make_problem(template, names, args, expansion=True):
+    """expansion=True 이면 곱 꼴 → 전개식 문제, False 면 전개식 → 곱 꼴 문제"""
+    expanded = template.expanded(*args)
+    factors = template.factors(*args)
+    latex_expanded = latex_poly(expanded, names)
+    latex_factored = latex_factors(factors, names)
+    if expansion:
+        return LazyProblem({
+            "latex_question": latex_factored,
+            "latex_answer": latex_expanded,
+            "coeffs": expanded,
+        }, {"answer_obj": lambda: sympy_poly(expanded, names)})
+    return LazyProblem({
+        "latex_question": latex_expanded,
+        "latex_answer": latex_factored,
+        "coeffs": expanded,
+    }, {
+        "answer_obj": lambda: sympy_factors(factors, names),
+        "expanded_obj": lambda: sympy_poly(expanded, names),
+    })
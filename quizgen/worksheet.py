@@ -0,0 +1,179 @@
+import html
+import os
+import sys
+import time
+
+from quizgen import bank as qbank
+from quizgen import batch
+
+# -------------------------------
+# 인쇄용 학습지 만들기 (명령줄)
+# -------------------------------
+# 앱과 같은 공식(generate_batch → 템플릿)으로 반별 학습지와 정답지를 만든다.
+#   생성 → LaTeX 그리기 (프로세스 풀) → .tex 또는 .html 파일에 바로 이어 쓰기
+# (반, 유형) 하나가 작업 하나이고, 결과는 순서대로 받아 파일에 쓰자마자 버리므로
+# 반 수가 늘어도 메모리 사용량은 거의 그대로다. 같은 seed 면 같은 학습지가 나온다.
+#
+#   python -m quizgen.worksheet --classes 50 --per-type 200 --format tex --out worksheets
+
+TYPE_LABELS = {
+    "type1": "완전제곱식",
+    "type2": "합차공식",
+    "type3": "(x+a)(x+b)",
+    "type4": "(ax+b)(cx+d)",
+}
+KIND_LABELS = {"expansion": "다음 식을 전개하시오.", "factorization": "다음 식을 인수분해하시오."}
+
+
+def section_title(problem_type):
+    family, _, kind = problem_type.partition("_")
+    return f"{TYPE_LABELS[family]} — {KIND_LABELS[kind]}"
+
+
+# -------------------------------
+# 파일 형식
+# -------------------------------
+class TexWriter:
+    suffix = ".tex"
+
+    def __init__(self, f):
+        self.f = f
+
+    def header(self, title):
+        self.f.write("\\documentclass[11pt]{article}\n\\usepackage{kotex}\n\\usepackage{amsmath}\n"
+                     "\\usepackage[margin=2cm]{geometry}\n\\usepackage{multicol}\n"
+                     "\\begin{document}\n\\section*{%s}\n" % title)
+
+    def section(self, title):
+        self.f.write("\\subsection*{%s}\n\\begin{multicols}{2}\n\\begin{enumerate}\n" % title)
+
+    def items(self, latex_list):
+        self.f.writelines("  \\item $\\displaystyle %s$\n" % s for s in latex_list)
+
+    def end_section(self):
+        self.f.write("\\end{enumerate}\n\\end{multicols}\n")
+
+    def footer(self):
+        self.f.write("\\end{document}\n")
+
+
+class HtmlWriter:
+    suffix = ".html"
+
+    def __init__(self, f):
+        self.f = f
+
+    def header(self, title):
+        self.f.write('<!DOCTYPE html>\n<html lang="ko">\n<head>\n<meta charset="utf-8">\n'
+                     f"<title>{html.escape(title)}</title>\n"
+                     '<script async src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-chtml.js"></script>\n'
+                     "<style>ol { columns: 2; } li { margin: 0.6em 0; }</style>\n"
+                     f"</head>\n<body>\n<h1>{html.escape(title)}</h1>\n")
+
+    def section(self, title):
+        self.f.write(f"<h2>{html.escape(title)}</h2>\n<ol>\n")
+
+    def items(self, latex_list):
+        self.f.writelines(f"  <li>\\({html.escape(s)}\\)</li>\n" for s in latex_list)
+
+    def end_section(self):
+        self.f.write("</ol>\n")
+
+    def footer(self):
+        self.f.write("</body>\n</html>\n")
+
+
+WRITERS = {"tex": TexWriter, "html": HtmlWriter}
+
+
+# -------------------------------
+# 파이프라인
+# -------------------------------
+def iter_jobs(n_classes, problem_types, per_type, seed):
+    """(반 번호, 유형 번호, 유형, 문제 수, seed) 를 반 → 유형 순서로"""
+    for class_no in range(1, n_classes + 1):
+        for type_no, problem_type in enumerate(problem_types):
+            yield class_no, type_no, problem_type, per_type, seed
+
+
+def render_job(job):
+    """작업 프로세스: (반, 유형) 하나의 문제/정답 LaTeX 목록"""
+    class_no, type_no, problem_type, per_type, seed = job
+    problems = batch.generate_batch(problem_type, per_type, seed=[seed, class_no, type_no])
+    questions, answers = [], []
+    for question, answer in problems.iter_latex():
+        questions.append(question)
+        answers.append(answer)
+    return class_no, problem_type, questions, answers
+
+
+def _open_class(out_dir, writer_cls, class_no, title):
+    files = []
+    for part, label in (("worksheet", ""), ("answers", " 정답")):
+        path = os.path.join(out_dir, f"class{class_no:02d}_{part}{writer_cls.suffix}")
+        writer = writer_cls(open(path, "w", encoding="utf-8"))
+        writer.header(f"{title} — {class_no}반{label}")
+        files.append(writer)
+    return files
+
+
+def _close_class(writers):
+    for writer in writers:
+        writer.footer()
+        writer.f.close()
+
+
+def export(out_dir, n_classes=1, per_type=20, problem_types=None, fmt="tex", seed=0,
+           workers=None, title="곱셈·인수분해 공식 연습"):
+    """반마다 classNN_worksheet / classNN_answers 파일을 만들고 문제 수를 돌려준다"""
+    from multiprocessing import Pool
+
+    problem_types = list(problem_types or qbank.PROBLEM_TYPES)
+    writer_cls = WRITERS[fmt]
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = iter_jobs(n_classes, problem_types, per_type, seed)
+
+    total = 0
+    current_class, writers = None, None
+    with Pool(workers) as pool:
+        # imap 은 작업 순서대로 결과를 돌려주므로 받은 순서대로 이어 쓰면 된다
+        for class_no, problem_type, questions, answers in pool.imap(render_job, jobs, chunksize=4):
+            if class_no != current_class:
+                if writers:
+                    _close_class(writers)
+                current_class = class_no
+                writers = _open_class(out_dir, writer_cls, class_no, title)
+            for writer, latex_list in zip(writers, (questions, answers)):
+                writer.section(section_title(problem_type))
+                writer.items(latex_list)
+                writer.end_section()
+            total += len(questions)
+    if writers:
+        _close_class(writers)
+    return total
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="인쇄용 학습지와 정답지 만들기")
+    parser.add_argument("--out", default="worksheets", help="출력 폴더")
+    parser.add_argument("--classes", type=int, default=1, help="반 수 (반마다 다른 문제)")
+    parser.add_argument("--per-type", type=int, default=20, help="유형별 문제 수")
+    parser.add_argument("--types", nargs="+", choices=qbank.PROBLEM_TYPES, help="기본: 모든 유형")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="tex")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="기본: CPU 개수")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    total = export(args.out, args.classes, args.per_type, args.types, args.format, args.seed, args.workers)
+    print(f"{args.classes}개 반, {total}문제 → {args.out} ({time.perf_counter() - start:.2f}초)")
+    return 0
+
+
+# -------------------------------
+# 실행: python -m quizgen.worksheet
+# -------------------------------
+if __name__ == "__main__":
+    sys.exit(main())
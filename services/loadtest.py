@@ -0,0 +1,458 @@
+import collections
+import contextlib
+import functools
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+# -------------------------------
+# 동시 접속 부하 테스트 (오프라인)
+# -------------------------------
+# Streamlit AppTest 로 app.py 를 학생 N 명이 동시에 쓰는 것처럼 돌린다.
+#   로그인 → 공식 선택 → 정답 고르기 (가끔 세 번 틀리고 '공부 완료') → 10문제를 맞히면 다시 도전
+# 구글 시트는 가짜 스프레드시트(FakeSpreadsheet, 호출마다 sheet_latency 초 지연)로 바꾸고,
+# app.py 는 임시 폴더에 복사해서 돌리므로 로그 스풀도 그 폴더에 생긴다 (실제 시트로 나가지 않음).
+# --backend sqlite 면 임시 폴더의 SQLite 저장소(services.storage)로 돌린다.
+#
+# 버튼 클릭 한 번(그 안의 st.rerun 포함)을 rerun 하나로 보고 지연 p50/p95/p99 와 처리량,
+# 그리고 그 시간 중 make_problem(다음 문제 꺼내기), append_log(로그 스풀에 넣기),
+# users 시트 읽기(로그인 색인 조회)에 쓴 시간을 보여 준다.
+#
+#   python -m services.loadtest --students 30 --actions 40 --sheet-latency-ms 150
+#
+# AppTest 는 한 번에 하나만 도는 것을 전제로 Runtime 싱글턴 / st.secrets / 설정값 /
+# 컴파일한 스크립트를 rerun 마다 새로 만들고 되돌리므로, 부하 테스트 동안에는 모든 학생이
+# 같이 쓰는 것 하나로 고정해 둔다 (실제 서버처럼 st.cache_resource 도 학생들이 같이 쓴다).
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(PROJECT_DIR, "app.py")
+OPTIONS = ["완전제곱식", "합차공식", "(x+a)(x+b)", "(ax+b)(cx+d)"]
+PERCENTILES = (50, 95, 99)
+
+# 세션 상태에 넣어 두는 학생 번호 (계측 함수가 어느 학생의 rerun 인지 구분할 때 사용)
+STUDENT_KEY = "_loadtest_student"
+
+# 계측 이름 → [(모듈, 클래스(모듈 함수면 None), 메서드)] (저장소는 구현마다)
+SPANS = {
+    "make_problem": [("quizgen.sampler", None, "record_at")],
+    "append_log": [("services.storage", "SheetsStorage", "append_log"),
+                   ("services.storage", "SQLiteStorage", "append_log")],
+    "read_users": [("services.storage", "SheetsStorage", "find_user"),
+                   ("services.storage", "SQLiteStorage", "find_user")],
+}
+
+
+def student_name(i):
+    return f"학생{i:03d}"
+
+
+def student_password(i):
+    return str(1000 + i)
+
+
+# -------------------------------
+# 가짜 구글 시트
+# -------------------------------
+class FakeWorksheet:
+    def __init__(self, spreadsheet, name):
+        self.spreadsheet = spreadsheet
+        self.name = name
+
+    def get_all_values(self, **kwargs):
+        self.spreadsheet._call("reads")
+        with self.spreadsheet._lock:
+            return [list(r) for r in self.spreadsheet.rows[self.name]]
+
+    def get_values(self, range_name, **kwargs):
+        # "A12:D61" 꼴만 (행 범위만 본다)
+        self.spreadsheet._call("reads")
+        first, last = (int("".join(c for c in part if c.isdigit())) for part in range_name.split(":"))
+        with self.spreadsheet._lock:
+            return [list(r) for r in self.spreadsheet.rows[self.name][first - 1:last]]
+
+    def append_rows(self, values, **kwargs):
+        self.spreadsheet._call("appends")
+        with self.spreadsheet._lock:
+            self.spreadsheet.rows[self.name].extend(list(r) for r in values)
+
+
+class FakeSpreadsheet:
+    """users / logs 시트만 있는 메모리 스프레드시트. 호출마다 latency 초 기다린다"""
+
+    def __init__(self, n_students, latency=0.0):
+        self.latency = latency
+        self.rows = {
+            "users": [["name", "password"]] + [[student_name(i), student_password(i)] for i in range(n_students)],
+            "logs": [["timestamp", "name", "type", "result"]],
+        }
+        self._lock = threading.Lock()
+        self.stats = {"reads": 0, "appends": 0}
+
+    def _call(self, key):
+        with self._lock:
+            self.stats[key] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def worksheet(self, name):
+        if name not in self.rows:
+            raise KeyError(name)
+        return FakeWorksheet(self, name)
+
+
+def fake_secrets(backend, workdir):
+    # 세션 진행 기록도 임시 폴더에 (프로젝트의 .data 를 건드리지 않는다)
+    session_store = {"path": os.path.join(workdir, "sessions.sqlite3")}
+    if backend == "sqlite":
+        return {"storage": {"backend": "sqlite", "path": os.path.join(workdir, "loadtest.sqlite3")},
+                "session_store": session_store}
+    return {
+        "session_store": session_store,
+        "connections": {
+            "gsheets": {
+                "spreadsheet": "fake://loadtest",
+                "project_id": "loadtest",
+                "private_key": "",
+                "client_email": "loadtest@example.com",
+                "token_uri": "",
+            }
+        }
+    }
+
+
+# -------------------------------
+# 계측 (rerun 별로 함수 시간 모으기)
+# -------------------------------
+def _current_student():
+    """지금 스레드가 어느 학생의 스크립트를 돌리는 중인지 (백그라운드 스레드면 None)"""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return None
+    try:
+        return ctx.session_state[STUDENT_KEY]
+    except KeyError:
+        return None
+
+
+class SpanRecorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._open = collections.defaultdict(collections.Counter)  # 학생 → 이름 → 초 (아직 안 가져간 것)
+        self.calls = collections.defaultdict(list)                  # 이름 → 호출별 초
+        self.background = collections.Counter()                     # rerun 밖(작업 스레드)에서 쓴 초
+
+    def wrap(self, name, fn):
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.add(name, time.perf_counter() - start)
+        return timed
+
+    def add(self, name, seconds):
+        student = _current_student()
+        with self._lock:
+            self.calls[name].append(seconds)
+            if student is None:
+                self.background[name] += seconds
+            else:
+                self._open[student][name] += seconds
+
+    def take(self, student):
+        """이 학생의 rerun 동안 쌓인 시간을 꺼낸다"""
+        with self._lock:
+            return dict(self._open.pop(student, {}))
+
+
+@contextlib.contextmanager
+def patched_environment(fake, spreadsheet, recorder):
+    """가짜 secrets 와 시트 연결, 계측, 여러 AppTest 가 동시에 돌 수 있는 공용 Runtime 을 설치한다"""
+    import importlib
+    from unittest import mock
+
+    import streamlit as st
+    from streamlit.components.v2.component_manager import BidiComponentManager
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.dataframe_source_manager import DataframeSourceManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.runtime.secrets import Secrets
+    from streamlit.testing.v1 import app_test, local_script_runner
+    from streamlit.testing.v1.util import patch_config_options
+
+    # AppTest._run 이 rerun 마다 만들고 지우는 것과 같은 가짜 Runtime (모두 같이 씀)
+    runtime = mock.MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.dataframe_source_mgr = DataframeSourceManager()
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    components = BidiComponentManager()
+    components.discover_and_register_components(start_file_watching=False)
+    runtime.bidi_component_registry = components
+
+    # 실제 서버처럼 컴파일한 스크립트도 같이 쓴다 (AppTest 는 rerun 마다 다시 컴파일한다)
+    script_cache = ScriptCache()
+    secrets = Secrets()
+    secrets._secrets = fake
+
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(mock.patch.object(Runtime, "instance", classmethod(lambda cls: runtime)))
+        stack.enter_context(mock.patch.object(Runtime, "exists", classmethod(lambda cls: True)))
+        for module in (app_test, local_script_runner):
+            stack.enter_context(mock.patch.object(module, "ScriptCache", lambda: script_cache))
+        stack.enter_context(mock.patch.object(st, "secrets", secrets))
+        stack.enter_context(patch_config_options({"global.appTest": True}))
+
+        sheets = importlib.import_module("services.sheets")
+        stack.enter_context(mock.patch.object(sheets, "_gspread_connect",
+                                              lambda info, url, scopes: (None, spreadsheet)))
+        for name, targets in SPANS.items():
+            for module, cls_name, method in targets:
+                owner = importlib.import_module(module)  # cls_name 이 None 이면 모듈 함수
+                if cls_name is not None:
+                    owner = getattr(owner, cls_name)
+                stack.enter_context(mock.patch.object(owner, method, recorder.wrap(name, getattr(owner, method))))
+        yield
+
+
+# -------------------------------
+# 학생 한 명의 시나리오
+# -------------------------------
+def _button(at, label_prefix):
+    for button in at.button:
+        if button.label.startswith(label_prefix):
+            return button
+    raise LookupError(f"버튼 없음: {label_prefix}")
+
+
+class Student:
+    def __init__(self, i, app_path, recorder, renderer, rng, wrong_rate=0.1, think=0.0, timeout=30.0):
+        from streamlit.testing.v1 import AppTest
+
+        self.i = i
+        self.at = AppTest.from_file(app_path, default_timeout=timeout)
+        self.at.session_state[STUDENT_KEY] = i
+        self.recorder = recorder
+        self.renderer = renderer
+        self.rng = rng
+        self.wrong_rate = wrong_rate
+        self.think = think
+        self.samples = []  # (동작, 초, {계측 이름: 초})
+        self.errors = []
+        self._wrong_left = 0
+
+    def _step(self, action, fn):
+        if self.think:
+            time.sleep(self.rng.uniform(0, self.think))
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            self.errors.append(f"{action}: {e!r}")
+        elapsed = time.perf_counter() - start
+        self.samples.append((action, elapsed, self.recorder.take(self.i)))
+        for exc in self.at.exception:
+            self.errors.append(f"{action}: {exc.message}")
+
+    def _answer_index(self, correct):
+        problem = self.renderer.render(self.at.session_state["current_problem"])
+        answer = problem["choices"].index(problem["latex_answer"])
+        if correct:
+            return answer
+        return self.rng.choice([k for k in range(4) if k != answer])
+
+    def login(self):
+        at = self.at
+        self._step("open", at.run)
+        at.text_input[0].input(student_name(self.i))
+        at.text_input[1].input(student_password(self.i))
+        self._step("login", lambda: _button(at, "로그인").click().run())
+        if not at.session_state["logged_in"]:
+            raise RuntimeError(f"{student_name(self.i)} 로그인 실패")
+        self._step("select", lambda: at.selectbox[0].select(self.rng.choice(OPTIONS)).run())
+
+    def act(self):
+        """지금 화면에 맞는 동작 하나"""
+        at = self.at
+        state = at.session_state
+        if state["correct_count"] >= 10:
+            self._step("restart", lambda: _button(at, "다시 처음부터").click().run())
+        elif state["show_answer"]:
+            self._step("study_done", lambda: _button(at, "공부 완료").click().run())
+        else:
+            if not self._wrong_left and self.rng.random() < self.wrong_rate:
+                self._wrong_left = 3  # 세 번 틀리고 해설 보기
+            correct = not self._wrong_left
+            self._wrong_left = max(0, self._wrong_left - 1)
+            index = self._answer_index(correct)
+            self._step("correct" if correct else "wrong",
+                       lambda: at.button(key=f"btn_{index}").click().run())
+
+    def run(self, actions, start_delay=0.0):
+        time.sleep(start_delay)
+        try:
+            self.login()
+            for _ in range(actions):
+                self.act()
+        except Exception as e:
+            self.errors.append(f"중단: {e!r}")
+
+
+# -------------------------------
+# 실행과 요약
+# -------------------------------
+def _percentile(sorted_values, p):
+    k = (len(sorted_values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def _latency(seconds):
+    values = sorted(seconds)
+    if not values:
+        return {"n": 0}
+    result = {"n": len(values)}
+    for p in PERCENTILES:
+        result[f"p{p}_ms"] = round(_percentile(values, p) * 1000, 2)
+    result["max_ms"] = round(values[-1] * 1000, 2)
+    result["mean_ms"] = round(sum(values) / len(values) * 1000, 2)
+    return result
+
+
+def summarize(students, wall, recorder, spreadsheet):
+    samples = [s for student in students for s in student.samples]
+    total = sum(elapsed for _, elapsed, _ in samples)
+    by_action = collections.defaultdict(list)
+    for action, elapsed, _ in samples:
+        by_action[action].append(elapsed)
+
+    spans = {}
+    for name in SPANS:
+        in_rerun = [spent.get(name, 0.0) for _, _, spent in samples]
+        calls = recorder.calls.get(name, [])
+        spans[name] = {
+            "calls": len(calls),
+            "call": _latency(calls),
+            "per_rerun_ms": round(sum(in_rerun) / len(samples) * 1000, 3) if samples else 0.0,
+            "share": round(sum(in_rerun) / total, 4) if total else 0.0,
+            "background_ms": round(recorder.background[name] * 1000, 2),
+        }
+
+    errors = [e for student in students for e in student.errors]
+    return {
+        "students": len(students),
+        "reruns": len(samples),
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(samples) / wall, 2) if wall else None,
+        "rerun": _latency([elapsed for _, elapsed, _ in samples]),
+        "actions": {action: _latency(values) for action, values in sorted(by_action.items())},
+        "spans": spans,
+        "sheets": dict(spreadsheet.stats, log_rows=len(spreadsheet.rows["logs"]) - 1),
+        "errors": len(errors),
+        "error_samples": errors[:10],
+    }
+
+
+def run(students=20, actions=30, wrong_rate=0.1, think=0.2, ramp=2.0, sheet_latency=0.15, seed=0,
+        timeout=30.0, backend="gsheets", app_path=APP_PATH):
+    """학생 students 명이 동시에 actions 번씩 조작했을 때의 요약 딕셔너리"""
+    from quizgen import bank as qbank
+    from quizgen import record as qrecord
+    from services import storage
+
+    spreadsheet = FakeSpreadsheet(students, latency=sheet_latency)
+    recorder = SpanRecorder()
+    renderer = qrecord.RecordRenderer(qbank.load_bank())  # 정답 위치 찾기용 (app 과 같은 내용)
+    master = random.Random(seed)
+
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    try:
+        # 스풀(.spool/)이 app.py 옆에 생기므로 복사본을 돌린다 (모듈은 sys.path 의 원본을 씀)
+        app_copy = os.path.join(workdir, "app.py")
+        shutil.copyfile(app_path, app_copy)
+        fake = fake_secrets(backend, workdir)
+        if backend == "sqlite":
+            local = storage.from_secrets(fake)
+            local.add_users(row for row in spreadsheet.rows["users"][1:])
+            local.close()
+        with patched_environment(fake, spreadsheet, recorder):
+            group = [Student(i, app_copy, recorder, renderer, random.Random(master.random()),
+                             wrong_rate, think, timeout) for i in range(students)]
+            threads = [threading.Thread(target=s.run, args=(actions, ramp * i / max(1, students)),
+                                        name=f"student-{i}", daemon=True)
+                       for i, s in enumerate(group)]
+            start = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            wall = time.perf_counter() - start
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return summarize(group, wall, recorder, spreadsheet)
+
+
+def _print_report(result):
+    print(f"학생 {result['students']}명, rerun {result['reruns']}회, {result['wall_s']:.1f}초 "
+          f"→ {result['throughput_rps']:.1f} rerun/초, 오류 {result['errors']}건")
+    header = f"  {'':<14}{'n':>6}" + "".join(f"{f'p{p}':>10}" for p in PERCENTILES) + f"{'max':>10}"
+    print(header + "   (ms)")
+    rows = [("전체", result["rerun"])] + list(result["actions"].items())
+    for label, stat in rows:
+        if not stat["n"]:
+            continue
+        print(f"  {label:<14}{stat['n']:>6}" + "".join(f"{stat[f'p{p}_ms']:>10.1f}" for p in PERCENTILES)
+              + f"{stat['max_ms']:>10.1f}")
+    print("rerun 안에서 쓴 시간")
+    for name, span in result["spans"].items():
+        call = span["call"]
+        p95 = f"{call['p95_ms']:.2f}" if call["n"] else "-"
+        print(f"  {name:<14} 호출 {span['calls']:>6}  rerun당 {span['per_rerun_ms']:8.3f} ms  "
+              f"비율 {span['share'] * 100:5.1f}%  호출 p95 {p95} ms")
+    print("가짜 시트:", result["sheets"])
+    for error in result["error_samples"]:
+        print("  오류:", error)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="app.py 동시 접속 부하 테스트 (오프라인)")
+    parser.add_argument("--students", type=int, default=20, help="동시에 접속하는 학생 수")
+    parser.add_argument("--actions", type=int, default=30, help="학생마다 로그인 뒤 조작 횟수")
+    parser.add_argument("--wrong-rate", type=float, default=0.1, help="세 번 연속 틀리기 시작할 확률")
+    parser.add_argument("--think-ms", type=float, default=200.0, help="조작 사이 대기 (0~값 무작위)")
+    parser.add_argument("--ramp-s", type=float, default=2.0, help="학생들이 접속을 시작하는 데 걸리는 시간")
+    parser.add_argument("--sheet-latency-ms", type=float, default=150.0, help="가짜 시트 호출 지연")
+    parser.add_argument("--backend", choices=["gsheets", "sqlite"], default="gsheets", help="저장소")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30.0, help="rerun 하나의 제한 시간(초)")
+    parser.add_argument("--output", help="요약을 JSON 으로 저장")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, PROJECT_DIR)
+    result = run(args.students, args.actions, args.wrong_rate, args.think_ms / 1000, args.ramp_s,
+                 args.sheet_latency_ms / 1000, args.seed, args.timeout, args.backend)
+    _print_report(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    return 1 if result["errors"] else 0
+
+
+# -------------------------------
+# 실행: python -m services.loadtest --students 30
+# -------------------------------
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from services import metrics
+
+# -------------------------------
+# 로그 기록기 (로컬 스풀 + 백그라운드 일괄 전송)
+# -------------------------------
+# 버튼 클릭에서는 SQLite 스풀에 한 줄 넣고 바로 돌아온다.
+# 백그라운드 스레드가 batch_size 개가 모이거나 flush_interval 초가 지나면
+# worksheet.append_rows 로 한 번에 보내고, 실패하면 지수 백오프로 다시 시도한다.
+# 프로세스가 죽어도 스풀에 남은 줄은 다음 실행 때 이어서 보낸다.
+#
+# 여러 워커 프로세스가 같은 스풀 파일을 써도 한 줄을 두 번 보내지 않도록, 보낼 묶음은
+# BEGIN IMMEDIATE 트랜잭션 안에서 claim 칸에 표시(선점)한 뒤 보내고, 보낸 뒤 지운다.
+# 실패하면 표시를 풀고, 보내다 죽은 프로세스의 표시는 claim_timeout 초가 지나면 다시 가져간다.
+# 전달은 최소 한 번이다: 시트가 묶음을 반영한 뒤 응답이 늦거나 끊겨서 실패로 보이면 (또는 보낸 직후
+# 스풀에서 지우기 전에 프로세스가 죽으면) 그 묶음은 다시 보내져서 시트에 두 번 남는다.
+# 시트에는 묶음 번호 칸이 없어서 보내기 전에 이미 들어갔는지 확인할 방법이 없다.
+
+class SpooledLogWriter:
+    def __init__(self, worksheet_factory, spool_path, batch_size=50, flush_interval=5.0,
+                 base_backoff=1.0, max_backoff=60.0, on_flush=None, claim_timeout=300.0):
+        """worksheet_factory: append_rows 를 가진 워크시트를 돌려주는 함수 (실패 시 다시 호출됨)
+
+        on_flush(rows, response): 한 묶음이 전송된 뒤 전송 스레드에서 호출 (통계 갱신 등).
+        여기서 난 오류는 stats["hook_errors"] 에만 세고 전송에는 영향을 주지 않는다.
+        """
+        self.worksheet_factory = worksheet_factory
+        self.on_flush = on_flush
+        self.spool_path = spool_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.claim_timeout = claim_timeout
+
+        self._worksheet = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # 이 프로세스 안에서 전송은 한 번에 하나
+        self._token = f"{os.getpid()}:{id(self):x}:{random.getrandbits(32):08x}"
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._failures_in_row = 0
+        self.stats = {"enqueued": 0, "flushed": 0, "batches": 0, "errors": 0, "hook_errors": 0}
+
+        spool_dir = os.path.dirname(os.path.abspath(spool_path))
+        os.makedirs(spool_dir, exist_ok=True)
+        self._db = sqlite3.connect(spool_path, check_same_thread=False, isolation_level=None)
+        # WAL + synchronous=NORMAL: 커밋마다 fsync 하지 않아 삽입이 수십 µs 수준
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS spool (id INTEGER PRIMARY KEY AUTOINCREMENT, row TEXT NOT NULL, "
+                         "claim TEXT, claimed_at REAL)")
+        columns = {r[1] for r in self._db.execute("PRAGMA table_info(spool)")}
+        for column, kind in (("claim", "TEXT"), ("claimed_at", "REAL")):
+            if column not in columns:  # 예전 스풀 파일
+                try:
+                    self._db.execute(f"ALTER TABLE spool ADD COLUMN {column} {kind}")
+                except sqlite3.OperationalError:
+                    pass  # 다른 프로세스가 먼저 추가함
+        self._pending = self._db.execute("SELECT COUNT(*) FROM spool").fetchone()[0]
+
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    # -------------------------------
+    # 앱 쪽 (요청 스레드)
+    # -------------------------------
+    def enqueue(self, row):
+        """로그 한 줄을 스풀에 넣는다. 네트워크 호출 없음"""
+        data = json.dumps(list(row), ensure_ascii=False)
+        with self._lock:
+            self._db.execute("INSERT INTO spool (row) VALUES (?)", (data,))
+            self.stats["enqueued"] += 1
+            self._pending += 1
+            full = self._pending >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def pending(self):
+        return self._pending
+
+    # -------------------------------
+    # 백그라운드 전송
+    # -------------------------------
+    def _claim(self):
+        """보낼 묶음을 선점한다 (다른 프로세스 / 스레드는 같은 줄을 가져가지 못한다)"""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                batch = self._db.execute(
+                    "SELECT id, row FROM spool WHERE claim IS NULL OR claimed_at < ? ORDER BY id LIMIT ?",
+                    (now - self.claim_timeout, self.batch_size),
+                ).fetchall()
+                self._db.executemany("UPDATE spool SET claim = ?, claimed_at = ? WHERE id = ?",
+                                     [(self._token, now, row_id) for row_id, _ in batch])
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return batch
+
+    def _finish(self, batch, sent):
+        """보낸 묶음은 지우고, 못 보낸 묶음은 선점을 푼다 (그사이 다른 프로세스가 가져간 줄은 건드리지 않음)"""
+        with self._lock:
+            if sent:
+                self._db.executemany("DELETE FROM spool WHERE id = ? AND claim = ?",
+                                     [(row_id, self._token) for row_id, _ in batch])
+            else:
+                self._db.executemany("UPDATE spool SET claim = NULL, claimed_at = NULL WHERE id = ? AND claim = ?",
+                                     [(row_id, self._token) for row_id, _ in batch])
+            self._pending = self._db.execute("SELECT COUNT(*) FROM spool").fetchone()[0]
+
+    def flush(self):
+        """스풀에 쌓인 줄을 batch_size 단위로 모두 보낸다. 보낸 줄 수를 돌려준다"""
+        sent = 0
+        with self._flush_lock:
+            while True:
+                batch = self._claim()
+                if not batch:
+                    return sent
+
+                rows = [json.loads(row) for _, row in batch]
+                try:
+                    if self._worksheet is None:
+                        self._worksheet = self.worksheet_factory()
+                    with metrics.span("log_flush"):
+                        response = self._worksheet.append_rows(rows)
+                except Exception:
+                    # 연결이 끊겼을 수 있으니 다음 시도 때 워크시트를 새로 연다
+                    self._worksheet = None
+                    self._finish(batch, sent=False)
+                    raise
+
+                self._finish(batch, sent=True)
+                with self._lock:
+                    self.stats["flushed"] += len(batch)
+                    self.stats["batches"] += 1
+                sent += len(batch)
+                if self.on_flush is not None:
+                    try:
+                        self.on_flush(rows, response)
+                    except Exception:
+                        self.stats["hook_errors"] += 1
+
+    def _next_wait(self):
+        if self._failures_in_row == 0:
+            return self.flush_interval
+        backoff = min(self.max_backoff, self.base_backoff * 2 ** (self._failures_in_row - 1))
+        return backoff * random.uniform(0.5, 1.0)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self._next_wait())
+            self._wakeup.clear()
+            try:
+                self.flush()
+                self._failures_in_row = 0
+            except Exception:
+                self._failures_in_row += 1
+                self.stats["errors"] += 1
+
+    def close(self, timeout=10.0):
+        """남은 줄을 보내 보고 스레드를 멈춘다 (보내지 못한 줄은 스풀에 남는다)"""
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+        if not self._thread.is_alive():  # 아직 보내는 중이면 그 묶음은 스풀에 남겨 둔다 (다음 실행 때)
+            try:
+                self.flush()
+            except Exception:
+                self.stats["errors"] += 1
+        with self._lock:
+            self._db.close()
+
+
+class MemoryWorksheet:
+    """로컬 테스트용 가짜 워크시트 (gspread.Worksheet.append_rows 와 같은 모양)"""
+
+    def __init__(self, fail_times=0):
+        self.rows = []
+        self.calls = 0
+        self.fail_times = fail_times
+
+    def append_rows(self, values, value_input_option="RAW"):
+        self.calls += 1
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise ConnectionError("가짜 워크시트 전송 실패")
+        self.rows.extend(values)
+
+
+# -------------------------------
+# 테스트 실행
+# -------------------------------
+if __name__ == "__main__":
+    import tempfile
+
+    sheet = MemoryWorksheet(fail_times=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = SpooledLogWriter(lambda: sheet, os.path.join(tmp, "spool.sqlite3"),
+                                  batch_size=10, flush_interval=0.2, base_backoff=0.1)
+        start = time.perf_counter()
+        for i in range(25):
+            writer.enqueue(["2024-01-01 00:00:00", f"학생{i}", "완전제곱식", "정답"])
+        per_row = (time.perf_counter() - start) / 25
+        time.sleep(1.0)
+        writer.close()
+        print(f"enqueue 평균: {per_row * 1e6:.0f} µs")
+        print("전송된 줄:", len(sheet.rows), "호출:", sheet.calls, "통계:", writer.stats)
@@ -0,0 +1,136 @@
+import math
+import re
+import threading
+import time
+
+# -------------------------------
+# 로그인용 사용자 색인
+# -------------------------------
+# users 시트를 ttl 초마다 한 번만 읽고, 이름/비밀번호를 미리 정규화해서
+# {(이름, 비밀번호): 시트에 적힌 이름} 딕셔너리로 만들어 둔다.
+# 여러 학생이 동시에 로그인해도 새로 읽기는 한 번만 일어난다 (single-flight).
+
+def normalize_login_data(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)): return ""
+    value = str(value).strip()
+    try:
+        num_val = float(value)
+        if num_val.is_integer(): value = str(int(num_val))
+    except: pass
+    if value.startswith("'"): value = value[1:]
+    value = re.sub(r"[\s\u200b\u200c\u200d\ufeff]+", "", value)
+    return value
+
+
+def build_index(values):
+    """get_all_values 결과(첫 줄이 머리글)로 색인을 만든다. 같은 키는 먼저 나온 줄이 우선"""
+    if not values:
+        return {}
+    header = values[0]
+    name_col = header.index("name")
+    pw_col = header.index("password")
+    index = {}
+    for row in values[1:]:
+        name = row[name_col] if name_col < len(row) else ""
+        pw = row[pw_col] if pw_col < len(row) else ""
+        index.setdefault((normalize_login_data(name), normalize_login_data(pw)), name)
+    return index
+
+
+class LoginIndex:
+    def __init__(self, loader, ttl=60.0, refresh_on_miss_after=10.0):
+        """loader: users 시트의 get_all_values 결과를 돌려주는 함수
+
+        색인이 refresh_on_miss_after 초보다 오래됐는데 일치하는 사용자가 없으면
+        명단이 방금 바뀌었을 수 있으므로 한 번 더 읽어 본다.
+        """
+        self.loader = loader
+        self.ttl = ttl
+        self.refresh_on_miss_after = refresh_on_miss_after
+
+        self._index = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._flight = None  # 진행 중인 새로 읽기 (threading.Event)
+        self._flight_error = None
+        self.stats = {"loads": 0, "coalesced": 0, "hits": 0, "misses": 0, "load_errors": 0}
+
+    def invalidate(self):
+        """명단을 고친 뒤 호출하면 다음 로그인 때 새로 읽는다"""
+        with self._lock:
+            self._loaded_at = -math.inf
+
+    def _age(self):
+        return time.monotonic() - self._loaded_at
+
+    def refresh(self):
+        """시트를 다시 읽는다. 이미 누가 읽고 있으면 그 결과를 기다린다"""
+        with self._lock:
+            flight = self._flight
+            leader = flight is None
+            if leader:
+                flight = self._flight = threading.Event()
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            flight.wait()
+            if self._index is None:
+                raise self._flight_error
+            return self._index
+
+        try:
+            index = build_index(self.loader())
+            with self._lock:
+                self._index = index
+                self._loaded_at = time.monotonic()
+                self._flight_error = None
+                self.stats["loads"] += 1
+            return index
+        except Exception as e:
+            with self._lock:
+                self._flight_error = e
+                self.stats["load_errors"] += 1
+            if self._index is None:
+                raise
+            return self._index  # 읽기에 실패하면 이전 색인을 그대로 사용
+        finally:
+            with self._lock:
+                self._flight = None
+            flight.set()
+
+    def _current(self):
+        if self._index is None or self._age() > self.ttl:
+            return self.refresh()
+        return self._index
+
+    def lookup(self, name, password):
+        """일치하는 사용자의 시트 이름, 없으면 None"""
+        key = (normalize_login_data(name), normalize_login_data(password))
+        matched = self._current().get(key)
+        if matched is None and self._age() > self.refresh_on_miss_after:
+            matched = self.refresh().get(key)
+        with self._lock:
+            self.stats["hits" if matched is not None else "misses"] += 1
+        return matched
+
+
+# -------------------------------
+# 테스트 실행
+# -------------------------------
+if __name__ == "__main__":
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        time.sleep(0.2)
+        return [["name", "password"], ["홍길동", "0123"], [" 김철수 ", 4567.0]]
+
+    login_index = LoginIndex(slow_loader, ttl=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(login_index.lookup("홍길동", "123")))
+               for _ in range(30)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    print("동시 로그인 30명 → 시트 읽기", len(calls), "번, 결과:", set(results))
+    print("김철수:", login_index.lookup("김철수", "4567"), "통계:", login_index.stats)
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+
+# -------------------------------
+# 힌트 영상 매니페스트 + 정적 파일 제공
+# -------------------------------
+# 예전에는 오답 뒤 rerun 마다 os.path.exists(media/공식.mp4) 를 확인하고 st.video(경로) 를
+# 불렀다. st.video 에 파일 경로를 넘기면 Streamlit 이 파일 전체를 읽어 해시를 내고
+# 미디어 관리자(프로세스 메모리)에 올리므로, 틀린 학생마다 같은 바이트를 다시 읽는다.
+#
+# 대신 프로세스가 뜰 때 한 번 매니페스트(경로, 크기, 수정 시각, sha256)를 만들고,
+# 영상을 ./static/media/<해시>.mp4 로 내보낸다 (하드 링크, 안 되면 복사).
+# server.enableStaticServing 이 켜져 있으면 st.video 에 /app/static/media/<해시>.mp4 주소만
+# 넘기고, 파일은 Streamlit 의 정적 파일 경로가 직접 보낸다 (Range 요청 / ETag 지원, 프로세스
+# 메모리에 올리지 않음). 주소에 내용 해시가 들어 있어 영상을 바꾸면 주소도 바뀐다.
+# 정적 제공이 꺼져 있으면 예전처럼 파일 경로를 돌려준다 (찾는 것은 매니페스트로만).
+#
+# 크기와 수정 시각이 지난 매니페스트와 같으면 해시를 다시 계산하지 않는다.
+#
+#   python -m services.media                     # 매니페스트 만들고 출력
+#   python -m services.media --check             # 영상이 매니페스트와 다르면 종료 코드 1
+
+MEDIA_DIR = "media"
+VIDEO_EXT = ".mp4"
+STATIC_MEDIA_DIR = os.path.join("static", "media")
+STATIC_URL = "/app/static/media/"
+DEFAULT_MANIFEST_PATH = os.path.join(".data", "media_manifest.json")
+HASH_CHUNK_SIZE = 1 << 20
+
+_STATIC_NAME = re.compile(r"[0-9a-f]{16}\.mp4")
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _publish(source, target):
+    """target 이 이미 같은 크기로 있으면 그대로, 아니면 하드 링크 (다른 파일시스템이면 복사)"""
+    try:
+        if os.path.getsize(target) == os.path.getsize(source):
+            return
+        os.remove(target)
+    except FileNotFoundError:
+        pass
+    tmp_path = target + ".tmp"
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, target)
+
+
+def _load_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def scan(base_dir, names, previous=None):
+    """{이름: {path, size, mtime_ns, sha256, static_name}} (영상이 없는 이름은 빠진다)
+
+    previous 의 항목과 크기/수정 시각이 같으면 그 해시를 그대로 쓴다.
+    """
+    previous = previous or {}
+    entries = {}
+    for name in names:
+        path = os.path.join(base_dir, MEDIA_DIR, name + VIDEO_EXT)
+        try:
+            info = os.stat(path)
+        except FileNotFoundError:
+            continue
+        old = previous.get(name, {})
+        if old.get("size") == info.st_size and old.get("mtime_ns") == info.st_mtime_ns and old.get("sha256"):
+            digest = old["sha256"]
+        else:
+            digest = file_sha256(path)
+        entries[name] = {
+            "path": os.path.relpath(path, base_dir),
+            "size": info.st_size,
+            "mtime_ns": info.st_mtime_ns,
+            "sha256": digest,
+            "static_name": digest[:16] + VIDEO_EXT,
+        }
+    return entries
+
+
+def video_names(base_dir):
+    """media/ 안의 모든 영상 이름"""
+    try:
+        filenames = os.listdir(os.path.join(base_dir, MEDIA_DIR))
+    except FileNotFoundError:
+        return []
+    return sorted(f[:-len(VIDEO_EXT)] for f in filenames if f.endswith(VIDEO_EXT))
+
+
+def build_manifest(base_dir, names, manifest_path=None, publish=True):
+    """scan 한 결과를 매니페스트 파일에 쓰고, publish 면 ./static/media 로 내보낸다"""
+    manifest_path = os.path.join(base_dir, manifest_path or DEFAULT_MANIFEST_PATH)
+    previous = _load_manifest(manifest_path)
+    entries = scan(base_dir, names, previous)
+    static_dir = os.path.join(base_dir, STATIC_MEDIA_DIR)
+
+    if publish and entries:
+        os.makedirs(static_dir, exist_ok=True)
+        for entry in entries.values():
+            _publish(os.path.join(base_dir, entry["path"]), os.path.join(static_dir, entry["static_name"]))
+        # 매니페스트에 없는 예전 영상은 지운다 (이 모듈이 만든 이름만)
+        keep = {entry["static_name"] for entry in entries.values()}
+        for filename in os.listdir(static_dir):
+            if _STATIC_NAME.fullmatch(filename) and filename not in keep:
+                os.remove(os.path.join(static_dir, filename))
+
+    if entries != previous:
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        tmp_path = manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, manifest_path)
+    return entries
+
+
+class MediaLibrary:
+    """프로세스에 하나. video(이름) 은 rerun 마다 파일 시스템을 건드리지 않는다"""
+
+    def __init__(self, base_dir, names, static_serving=False, manifest_path=None):
+        self.base_dir = base_dir
+        self.static_serving = static_serving
+        self.entries = build_manifest(base_dir, names, manifest_path, publish=static_serving)
+
+    def video(self, name):
+        """st.video 에 넘길 값: 정적 주소 (정적 제공이 꺼져 있으면 파일 경로), 영상이 없으면 None"""
+        entry = self.entries.get(name)
+        if entry is None:
+            return None
+        if self.static_serving:
+            return STATIC_URL + entry["static_name"]
+        return os.path.join(self.base_dir, entry["path"])
+
+
+# -------------------------------
+# 실행: python -m services.media
+# -------------------------------
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="힌트 영상 매니페스트 만들기 / 확인")
+    parser.add_argument("names", nargs="*", help="영상 이름 (기본: media/*.mp4 전부)")
+    parser.add_argument("--base-dir", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    parser.add_argument("--check", action="store_true", help="만들지 않고 매니페스트와 비교만")
+    args = parser.parse_args(argv)
+
+    names = args.names or video_names(args.base_dir)
+    if args.check:
+        recorded = _load_manifest(os.path.join(args.base_dir, DEFAULT_MANIFEST_PATH))
+        current = scan(args.base_dir, names)  # 해시를 모두 새로 계산
+        stale = [name for name in set(recorded) | set(current)
+                 if recorded.get(name, {}).get("sha256") != current.get(name, {}).get("sha256")]
+        for name in sorted(stale):
+            print(f"다름: {name}")
+        return 1 if stale else 0
+
+    entries = build_manifest(args.base_dir, names)
+    for name, entry in entries.items():
+        print(f"{name:<16} {entry['size']:>12,} B  {entry['sha256'][:16]}  → {STATIC_URL}{entry['static_name']}")
+    if not entries:
+        print("영상이 없습니다:", os.path.join(args.base_dir, MEDIA_DIR))
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
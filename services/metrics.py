@@ -0,0 +1,317 @@
+import bisect
+import contextlib
+import functools
+import importlib
+import os
+import threading
+import time
+
+# -------------------------------
+# 구간 시간 측정 (히스토그램 + Prometheus 텍스트)
+# -------------------------------
+# 코드에서는 with metrics.span("이름"): 으로 감싸고, quizgen 의 generate_* / check_* 같은
+# 함수는 enable() 때 모듈 속성을 감싼 함수로 바꿔 끼운다 (instrument).
+# 구간마다 고정 버킷 히스토그램에 쌓고, render() 가 Prometheus 텍스트 형식으로 내보낸다.
+#   - textfile: 주기적으로 파일에 쓴다 (node_exporter textfile collector 용)
+#   - port: 127.0.0.1:port/metrics 로 HTTP 제공
+#
+# 꺼져 있으면 span() 은 미리 만든 nullcontext 를 돌려줄 뿐이고 (with 문 포함 ~0.2 µs),
+# 함수 감싸기는 아예 하지 않으므로 quizgen 함수에는 비용이 없다.
+# 켜는 방법: secrets.toml 의 [metrics] enabled = true 또는 환경 변수 MATHAPP_METRICS=1
+
+METRIC_NAME = "mathapp_span_seconds"
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+           2.5, 5.0, 10.0)
+
+# enable() 때 감쌀 함수: 모듈 → 이름 앞부분
+INSTRUMENTED = {
+    "quizgen.basic_formulas": ("generate_", "check_"),
+    "quizgen.square_binomial": ("generate_", "check_"),
+    "quizgen.sumdiff": ("generate_", "check_"),
+    "quizgen.factorization": ("generate_", "check_"),
+    "quizgen.cubic": ("generate_", "check_"),
+}
+
+_NULL_SPAN = contextlib.nullcontext()
+_local = threading.local()
+enabled = False
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += seconds
+            self.count += 1
+
+    def quantile(self, q):
+        """버킷 안에서 선형 보간한 추정치 (Prometheus histogram_quantile 과 같은 방식)"""
+        with self._lock:
+            counts, count = list(self.counts), self.count
+        if not count:
+            return None
+        rank = q * count
+        seen = 0
+        for i, n in enumerate(counts):
+            if seen + n >= rank and n:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def observe(name, seconds):
+    h = _histograms.get(name)
+    if h is None:
+        with _histograms_lock:
+            h = _histograms.setdefault(name, Histogram())
+    h.observe(seconds)
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def span(name):
+    """with span("이름"): 블록 시간을 잰다 (꺼져 있으면 아무것도 안 함)"""
+    if not enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def timed(name, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            observe(name, time.perf_counter() - start)
+    wrapper.__wrapped_by_metrics__ = True
+    return wrapper
+
+
+# -------------------------------
+# rerun 전체 시간 (스크립트 맨 위에서 시작, st.stop / st.rerun 직전과 맨 끝에서 끝)
+# -------------------------------
+def begin_rerun():
+    if enabled:
+        _local.rerun_start = time.perf_counter()
+
+
+def end_rerun():
+    start = getattr(_local, "rerun_start", None)
+    if start is not None:
+        _local.rerun_start = None
+        observe("rerun", time.perf_counter() - start)
+
+
+# -------------------------------
+# 켜기 / 함수 감싸기
+# -------------------------------
+def instrument(module_name, prefixes):
+    """모듈의 prefixes 로 시작하는 함수를 시간 재는 함수로 바꾼다. 감싼 개수를 돌려준다
+
+    from 모듈 import 함수 로 이미 가져간 참조는 바뀌지 않는다 (모듈.함수 로 부르는 곳만 잡힘).
+    """
+    module = importlib.import_module(module_name)
+    short = module_name.rpartition(".")[2]
+    n = 0
+    for attr, fn in list(vars(module).items()):
+        if attr.startswith(prefixes) and callable(fn) and not getattr(fn, "__wrapped_by_metrics__", False):
+            setattr(module, attr, timed(f"{short}.{attr}", fn))
+            n += 1
+    return n
+
+
+def _instrument_all():
+    for module_name, prefixes in INSTRUMENTED.items():
+        try:
+            instrument(module_name, prefixes)
+        except ImportError:
+            pass
+
+
+def enable(instrument_quizgen=True):
+    """측정을 켠다. quizgen 함수 감싸기는 sympy import 가 끼므로 백그라운드 스레드에서 한다"""
+    global enabled
+    enabled = True
+    if instrument_quizgen:
+        threading.Thread(target=_instrument_all, name="metrics-instrument", daemon=True).start()
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    with _histograms_lock:
+        _histograms.clear()
+
+
+def config_from(secrets):
+    """[metrics] 표 (없으면 빈 딕셔너리). MATHAPP_METRICS=1 이면 enabled 를 켠다"""
+    try:
+        config = dict(secrets["metrics"]) if "metrics" in secrets else {}
+    except FileNotFoundError:
+        config = {}
+    if os.environ.get("MATHAPP_METRICS") == "1":
+        config["enabled"] = True
+    return config
+
+
+# -------------------------------
+# 내보내기
+# -------------------------------
+def render():
+    """Prometheus 텍스트 형식"""
+    lines = [f"# HELP {METRIC_NAME} Time spent in instrumented code spans.",
+             f"# TYPE {METRIC_NAME} histogram"]
+    with _histograms_lock:
+        items = sorted(_histograms.items())
+    for name, h in items:
+        with h._lock:
+            counts, total, count = list(h.counts), h.sum, h.count
+        label = name.replace("\\", "\\\\").replace('"', '\\"')
+        cumulative = 0
+        for bound, n in zip(h.buckets, counts):
+            cumulative += n
+            lines.append(f'{METRIC_NAME}_bucket{{span="{label}",le="{float(bound)!r}"}} {cumulative}')
+        lines.append(f'{METRIC_NAME}_bucket{{span="{label}",le="+Inf"}} {count}')
+        lines.append(f'{METRIC_NAME}_sum{{span="{label}"}} {total:.9f}')
+        lines.append(f'{METRIC_NAME}_count{{span="{label}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+def snapshot():
+    """관리자 패널용 [{span, count, mean_ms, p50_ms, p95_ms, total_s}]"""
+    with _histograms_lock:
+        items = sorted(_histograms.items())
+    rows = []
+    for name, h in items:
+        if not h.count:
+            continue
+        rows.append({
+            "span": name,
+            "count": h.count,
+            "mean_ms": round(h.sum / h.count * 1000, 3),
+            "p50_ms": round(h.quantile(0.5) * 1000, 3),
+            "p95_ms": round(h.quantile(0.95) * 1000, 3),
+            "total_s": round(h.sum, 3),
+        })
+    return rows
+
+
+def write_textfile(path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(render())
+    os.replace(tmp_path, path)
+
+
+class Exporter:
+    """textfile 을 interval 초마다 쓰고, port 가 있으면 /metrics 를 HTTP 로 제공한다"""
+
+    def __init__(self, textfile=None, port=None, interval=15.0, host="127.0.0.1"):
+        self.textfile = textfile
+        self.interval = interval
+        self.server = None
+        self._stopping = threading.Event()
+        if port is not None:
+            from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] != "/metrics":
+                        self.send_error(404)
+                        return
+                    body = render().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            self.server = ThreadingHTTPServer((host, int(port)), Handler)
+            self.server.daemon_threads = True
+            threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True).start()
+        if textfile:
+            threading.Thread(target=self._run, name="metrics-textfile", daemon=True).start()
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            try:
+                write_textfile(self.textfile)
+            except OSError:
+                pass
+
+    def close(self):
+        self._stopping.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        if self.textfile:
+            write_textfile(self.textfile)
+
+
+# -------------------------------
+# 테스트 실행
+# -------------------------------
+if __name__ == "__main__":
+    import urllib.request
+
+    def overhead(n=200_000):
+        start = time.perf_counter()
+        for _ in range(n):
+            with span("overhead"):
+                pass
+        return (time.perf_counter() - start) / n
+
+    off = overhead()
+    enable(instrument_quizgen=False)
+    on = overhead()
+    print(f"span() 비용: 꺼짐 {off * 1e9:.0f} ns, 켜짐 {on * 1e9:.0f} ns")
+
+    instrument("quizgen.basic_formulas", ("generate_", "check_"))
+    from quizgen import basic_formulas as bf
+
+    for _ in range(200):
+        problem = bf.generate_type1_expansion()
+        bf.check_expansion_answer(str(problem["answer_obj"]), problem["answer_obj"])
+    exporter = Exporter(port=0)  # 0: 아무 빈 포트
+    url = f"http://127.0.0.1:{exporter.server.server_address[1]}/metrics"
+    text = urllib.request.urlopen(url).read().decode()
+    exporter.close()
+    print("\n".join(line for line in text.splitlines() if "_count" in line))
+    for row in snapshot():
+        print(row)
@@ -0,0 +1,105 @@
+import collections
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# -------------------------------
+# 다음 문제 미리 그리기
+# -------------------------------
+# 문제 뽑기는 세션 시드 + 유형별 커서로 정해지므로 (quizgen.sampler, 수 µs) 스크립트 스레드에서
+# 바로 한다. 다음 몇 문제의 ProblemRecord 도 스크립트 스레드가 커서만 앞서 읽어서 만들고
+# (커서는 옮기지 않는다), 공용 스레드 풀은 그 레코드를 미리 그려서 (RecordRenderer 의 공용 캐시에
+# 문제/보기 LaTeX 와 채점용 정답을 채워서) 다음 rerun 이 캐시에서 바로 꺼내게 한다.
+# 꺼낼 때 미리 그려 둔 것이 없었던 횟수(empty)로 큐 크기를 정한다.
+
+class ProblemPrefetcher:
+    """프로세스 전체에서 하나 (스레드 풀 + 통계)"""
+
+    def __init__(self, warm, depth=3, max_workers=2):
+        """warm: ProblemRecord -> None. 작업 스레드에서 호출되므로 st.* 를 쓰면 안 된다"""
+        self.warm = warm
+        self.depth = depth
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self.stats = {"pops": 0, "ready": 0, "empty": 0, "refills": 0, "errors": 0}
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def new_queue(self):
+        return ProblemQueue(self)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ProblemQueue:
+    """세션 하나의 대기열 (st.session_state 에 보관). 레코드 → 미리 그리기 작업"""
+
+    def __init__(self, prefetcher):
+        self.prefetcher = prefetcher
+        self._pending = collections.OrderedDict()
+        self.empty = 0
+
+    def fill(self, records):
+        """다음에 나올 레코드들(순서대로)을 미리 그리도록 맡긴다. 목록에 없는 작업은 취소한다"""
+        stale = [record for record in self._pending if record not in records]
+        if stale:  # 공식/문제 종류가 바뀌었다
+            for record in stale:
+                self._pending.pop(record).cancel()
+            self.prefetcher._count("refills")
+        for record in records[:self.prefetcher.depth]:
+            if record not in self._pending:
+                self._pending[record] = self.prefetcher._pool.submit(self.prefetcher.warm, record)
+
+    def pop(self, record, upcoming=()):
+        """record 를 화면에 내기 직전에 부른다. 미리 그려 뒀으면 True
+
+        준비가 안 됐으면 (empty) 스크립트 스레드가 평소처럼 그린다. upcoming 은 그다음 레코드들.
+        """
+        self.prefetcher._count("pops")
+        future = self._pending.pop(record, None)
+        ready = future is not None and future.done() and not future.cancelled()
+        if ready and future.exception() is not None:
+            self.prefetcher._count("errors")
+            ready = False
+        if ready:
+            self.prefetcher._count("ready")
+        else:
+            if future is not None:
+                future.cancel()
+            self.empty += 1
+            self.prefetcher._count("empty")
+        self.fill(list(upcoming))
+        return ready
+
+
+# -------------------------------
+# 테스트 실행
+# -------------------------------
+if __name__ == "__main__":
+    import time
+
+    from quizgen import sampler as qsampler
+
+    def slow_warm(record):
+        time.sleep(0.01)
+
+    def records(problem_type, start):
+        return [qsampler.record_at(problem_type, 12345, cursor) for cursor in range(start, start + 3)]
+
+    prefetcher = ProblemPrefetcher(slow_warm, depth=3)
+    queue = prefetcher.new_queue()
+    print("첫 문제:", queue.pop(qsampler.record_at("type1_expansion", 12345, 0), records("type1_expansion", 1)))
+    time.sleep(0.05)  # 학생이 문제를 보는 시간
+    for cursor in range(1, 6):
+        record = qsampler.record_at("type1_expansion", 12345, cursor)
+        print(record, "미리 그림" if queue.pop(record, records("type1_expansion", cursor + 1)) else "없음")
+        time.sleep(0.03)
+    print("공식 변경:", queue.pop(qsampler.record_at("type2_expansion", 12345, 0), records("type2_expansion", 1)))
+    print("통계:", prefetcher.snapshot())
+    prefetcher.shutdown()
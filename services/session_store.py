@@ -0,0 +1,504 @@
+import atexit
+import json
+import os
+import secrets
+import socket
+import socketserver
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+from services import metrics
+
+# -------------------------------
+# 여러 프로세스가 같이 쓰는 세션 진행 상태 저장소
+# -------------------------------
+# st.session_state 는 프로세스 메모리에 있어서, 워커를 여러 개 띄우고 로드 밸런서 뒤에 두면
+# 다시 연결된 학생이 다른 워커로 가는 순간 진행 상태(맞힌 수, 현재 문제 등)가 사라진다.
+# 그래서 세션마다 작은 진행 기록(JSON)을 공유 저장소에 둔다. 키는 주소의 ?sid= 값이다.
+# 이 키는 로그인을 대신하지 않는다. 주소는 복사되거나 방문 기록에 남으므로, 다시 연결되면
+# 이름/비밀번호로 다시 로그인해야 하고 기록의 이름이 같을 때만 진행 상태를 이어받는다 (app.py).
+#
+#   - 쓰기 (write-behind): save() 는 메모리의 대기 목록에 넣고 바로 돌아온다. 같은 키를 여러 번
+#     저장하면 마지막 것만 남고, 마지막으로 쓴 것과 같으면 아예 넣지 않는다. 백그라운드 스레드가
+#     flush_interval 초마다 (또는 batch_size 개가 모이면) 한 트랜잭션 / 한 파이프라인으로 쓴다.
+#   - 읽기 (read-through): load() 는 새 세션에서 로그인할 때 한 번만 부른다.
+#     아직 쓰지 않은 대기 기록이 있으면 그것을, 없으면 저장소에서 읽는다. 그다음 rerun 들은
+#     st.session_state 를 그대로 쓰므로 저장소까지 가지 않는다.
+#
+# 워커가 죽으면 최대 flush_interval 초 동안의 변경을 잃을 수 있다 (정상 종료 때는 atexit 로 쓴다).
+#
+#   [session_store]
+#   backend = "sqlite"                     # "sqlite", "redis" 또는 "off"
+#   path = ".data/sessions.sqlite3"        # sqlite: 같은 서버의 워커들이 같이 쓰는 파일
+#   url = "redis://:비밀번호@host:6379/0"   # redis: Redis 프로토콜(RESP) 을 말하는 서버
+#   flush_interval = 0.5
+#   ttl_hours = 12                         # 이 시간 동안 바뀌지 않은 세션은 지운다
+#
+# redis 백엔드는 redis 패키지 없이 RESP 명령 몇 개(GET / SET EX / DEL)만 직접 보낸다.
+# Redis 가 없는 곳에서는 python -m services.session_store serve 로 같은 프로토콜의
+# 메모리 대역 서버를 띄워 여러 서버의 워커가 같이 쓸 수 있다.
+
+BACKENDS = ("sqlite", "redis", "off")
+DEFAULT_PATH = os.path.join(".data", "sessions.sqlite3")
+DEFAULT_URL = "redis://localhost:6379/0"
+DEFAULT_TTL_HOURS = 12
+KEY_PREFIX = "mathapp:session:"
+PURGE_INTERVAL = 3600.0
+
+
+def new_session_id():
+    """주소에 넣는 세션 키 (추측할 수 없는 128비트)"""
+    return secrets.token_urlsafe(16)
+
+
+def _dumps(record):
+    return json.dumps(record, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+# -------------------------------
+# 로컬 SQLite (한 서버의 여러 워커)
+# -------------------------------
+class SQLiteBackend:
+    def __init__(self, path, ttl, timeout=5.0):
+        self.path = path
+        self.ttl = ttl
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=timeout)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS sessions "
+                         "(key TEXT PRIMARY KEY, data TEXT NOT NULL, updated REAL NOT NULL)")
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT data FROM sessions WHERE key = ? AND updated >= ?",
+                                   (key, time.time() - self.ttl)).fetchone()
+        return row[0] if row else None
+
+    def write(self, puts, deletes):
+        """puts: {키: JSON 문자열}, deletes: [키]. 한 트랜잭션"""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany(
+                    "INSERT INTO sessions (key, data, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET data = excluded.data, updated = excluded.updated",
+                    [(key, data, now) for key, data in puts.items()])
+                self._db.executemany("DELETE FROM sessions WHERE key = ?", [(key,) for key in deletes])
+                if now - self._last_purge > PURGE_INTERVAL:
+                    self._db.execute("DELETE FROM sessions WHERE updated < ?", (now - self.ttl,))
+                    self._last_purge = now
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# -------------------------------
+# Redis 프로토콜 (RESP2) 서버 (여러 서버의 워커)
+# -------------------------------
+class RespError(Exception):
+    """서버가 돌려준 -ERR 응답"""
+
+
+class RespClient:
+    """명령을 파이프라인으로 보내고 응답을 읽는 최소 클라이언트 (연결이 끊기면 한 번 다시 연결)"""
+
+    def __init__(self, url=DEFAULT_URL, timeout=2.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._sock = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), self.timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._sock.makefile("rb")
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            self._roundtrip(setup)
+
+    def _disconnect(self):
+        if self._sock is not None:
+            self._file.close()
+            self._sock.close()
+        self._sock = self._file = None
+
+    @staticmethod
+    def _encode(command):
+        parts = [f"*{len(command)}\r\n".encode()]
+        for arg in command:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    def _read_reply(self):
+        line = self._file.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("RESP 연결이 끊김")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            return RespError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            n = int(body)
+            if n < 0:
+                return None
+            data = self._file.read(n + 2)
+            return data[:-2].decode("utf-8")
+        if kind == b"*":
+            n = int(body)
+            return None if n < 0 else [self._read_reply() for _ in range(n)]
+        raise ConnectionError(f"알 수 없는 RESP 응답: {line!r}")
+
+    def _roundtrip(self, commands):
+        self._sock.sendall(b"".join(self._encode(c) for c in commands))
+        replies = [self._read_reply() for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    def execute(self, *commands):
+        """명령 튜플들을 한 번에 보내고 응답 목록을 돌려준다"""
+        with self._lock:
+            for attempt in (0, 1):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._roundtrip(commands)
+                except OSError:
+                    self._disconnect()
+                    if attempt:
+                        raise
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
+
+class RedisBackend:
+    def __init__(self, url, ttl, prefix=KEY_PREFIX):
+        self.client = RespClient(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.execute(("GET", self.prefix + key))[0]
+
+    def write(self, puts, deletes):
+        ttl = max(1, int(self.ttl))
+        commands = [("SET", self.prefix + key, data, "EX", ttl) for key, data in puts.items()]
+        if deletes:
+            commands.append(("DEL", *(self.prefix + key for key in deletes)))
+        if commands:
+            self.client.execute(*commands)
+
+    def close(self):
+        self.client.close()
+
+
+# -------------------------------
+# 쓰기 지연 + 읽기 통과 저장소 (프로세스에 하나)
+# -------------------------------
+_DELETED = object()
+
+
+class SessionStore:
+    def __init__(self, backend, flush_interval=0.5, batch_size=200, remember=4096):
+        """backend: get(키) / write(puts, deletes) / close() 를 가진 객체"""
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.remember = remember
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._dirty = {}                # 키 → JSON (또는 _DELETED), 아직 안 쓴 것
+        self._inflight = {}             # 지금 쓰는 중인 묶음 (쓰는 동안 load 가 옛 값을 읽지 않게)
+        self._written = OrderedDict()   # 키 → 마지막으로 쓰거나 읽은 JSON (같은 내용이면 다시 안 씀)
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self.stats = {"loads": 0, "load_pending": 0, "load_misses": 0, "saves": 0, "unchanged": 0,
+                      "writes": 0, "batches": 0, "errors": 0}
+        self._thread = threading.Thread(target=self._run, name="session-store", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _remember(self, key, data):
+        self._written[key] = data
+        self._written.move_to_end(key)
+        if len(self._written) > self.remember:
+            self._written.popitem(last=False)
+
+    # -------------------------------
+    # 앱 쪽 (요청 스레드)
+    # -------------------------------
+    def load(self, key):
+        """진행 기록 딕셔너리 또는 None (새 세션에서 한 번)"""
+        with self._lock:
+            self.stats["loads"] += 1
+            data = self._dirty.get(key, self._inflight.get(key))
+            if data is not None:
+                self.stats["load_pending"] += 1
+                return None if data is _DELETED else json.loads(data)
+            self.stats["load_misses"] += 1
+        with metrics.span("session_load"):
+            data = self.backend.get(key)
+        if data is None:
+            return None
+        with self._lock:
+            self._remember(key, data)
+        return json.loads(data)
+
+    def save(self, key, record):
+        """진행 기록을 대기 목록에 넣는다 (저장소 호출 없음). 바뀐 것이 없으면 아무것도 안 한다"""
+        data = _dumps(record)
+        with self._lock:
+            self.stats["saves"] += 1
+            pending = self._dirty.get(key, self._inflight.get(key))
+            if data == (pending if pending is not None else self._written.get(key)):
+                self.stats["unchanged"] += 1
+                return False
+            self._dirty[key] = data
+            full = len(self._dirty) >= self.batch_size
+        if full:
+            self._wakeup.set()
+        return True
+
+    def delete(self, key):
+        with self._lock:
+            self._dirty[key] = _DELETED
+            self._written.pop(key, None)
+
+    def pending(self):
+        return len(self._dirty)
+
+    # -------------------------------
+    # 백그라운드 쓰기
+    # -------------------------------
+    def flush(self):
+        """대기 목록을 한 번에 쓴다. 쓴 키 수를 돌려준다 (실패하면 대기 목록으로 되돌리고 예외)"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return 0
+                batch, self._dirty = self._dirty, {}
+                self._inflight = batch
+            puts = {key: data for key, data in batch.items() if data is not _DELETED}
+            deletes = [key for key, data in batch.items() if data is _DELETED]
+            try:
+                with metrics.span("session_flush"):
+                    self.backend.write(puts, deletes)
+            except Exception:
+                with self._lock:
+                    # 쓰는 동안 새로 저장된 것이 더 새롭다
+                    self._dirty = {**batch, **self._dirty}
+                    self._inflight = {}
+                raise
+            with self._lock:
+                self._inflight = {}
+                for key, data in puts.items():
+                    self._remember(key, data)
+                self.stats["writes"] += len(batch)
+                self.stats["batches"] += 1
+            return len(batch)
+
+    def _run(self):
+        failures = 0
+        while not self._stopping.is_set():
+            self._wakeup.wait(min(30.0, self.flush_interval * 2 ** failures))
+            self._wakeup.clear()
+            try:
+                self.flush()
+                failures = 0
+            except Exception:
+                failures = min(failures + 1, 6)
+                self.stats["errors"] += 1
+
+    def close(self, timeout=5.0):
+        """남은 기록을 쓰고 스레드를 멈춘다 (여러 번 불러도 된다)"""
+        if self._stopping.is_set():
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+        try:
+            self.flush()
+        except Exception:
+            self.stats["errors"] += 1
+        self.backend.close()
+
+
+# -------------------------------
+# secrets.toml 로 고르기
+# -------------------------------
+def config_from(secrets):
+    """[session_store] 표 (없으면 빈 딕셔너리 → sqlite)"""
+    try:
+        return dict(secrets["session_store"]) if "session_store" in secrets else {}
+    except FileNotFoundError:
+        return {}
+
+
+def from_config(config, base_dir="."):
+    """설정에 맞는 SessionStore, backend = "off" 면 None. 상대 경로는 base_dir 기준"""
+    backend = config.get("backend", "sqlite")
+    if backend not in BACKENDS:
+        raise ValueError(f"알 수 없는 세션 저장소: {backend} (가능: {', '.join(BACKENDS)})")
+    if backend == "off":
+        return None
+    ttl = float(config.get("ttl_hours", DEFAULT_TTL_HOURS)) * 3600
+    if backend == "redis":
+        store_backend = RedisBackend(config.get("url", DEFAULT_URL), ttl)
+    else:
+        store_backend = SQLiteBackend(os.path.join(base_dir, config.get("path", DEFAULT_PATH)), ttl)
+    return SessionStore(store_backend, flush_interval=float(config.get("flush_interval", 0.5)))
+
+
+# -------------------------------
+# Redis 프로토콜 대역 서버 (메모리, 로컬 테스트 / Redis 가 없는 배포용)
+# -------------------------------
+class MemoryRespServer(socketserver.ThreadingTCPServer):
+    """GET / SET [EX] / DEL / PING / SELECT / AUTH 만 아는 RESP 서버. 프로세스가 끝나면 내용도 사라진다"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address=("127.0.0.1", 6379), password=None):
+        self.data = {}  # 키 → (값, 만료 시각 또는 None)
+        self.password = password
+        self.data_lock = threading.Lock()
+        super().__init__(address, _RespHandler)
+
+    def command(self, args, session):
+        name = args[0].upper()
+        if self.password and not session.get("auth") and name != b"AUTH":
+            return b"-NOAUTH Authentication required.\r\n"
+        if name == b"PING":
+            return b"+PONG\r\n"
+        if name == b"AUTH":
+            session["auth"] = args[-1].decode() == self.password
+            return b"+OK\r\n" if session["auth"] else b"-ERR invalid password\r\n"
+        if name == b"SELECT":
+            return b"+OK\r\n"
+        with self.data_lock:
+            if name == b"GET":
+                value, expires = self.data.get(args[1], (None, None))
+                if value is None or expires is not None and expires < time.time():
+                    return b"$-1\r\n"
+                return b"$%d\r\n%s\r\n" % (len(value), value)
+            if name == b"SET":
+                expires = None
+                if len(args) >= 5 and args[3].upper() == b"EX":
+                    expires = time.time() + int(args[4])
+                self.data[args[1]] = (args[2], expires)
+                return b"+OK\r\n"
+            if name == b"DEL":
+                return b":%d\r\n" % sum(self.data.pop(key, None) is not None for key in args[1:])
+        return b"-ERR unknown command '%s'\r\n" % name
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        session = {}
+        while True:
+            line = self.rfile.readline()
+            if not line.startswith(b"*"):
+                return
+            args = []
+            for _ in range(int(line[1:])):
+                n = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(n + 2)[:-2])
+            self.wfile.write(self.server.command(args, session))
+
+
+# -------------------------------
+# 명령줄: 대역 서버 / 측정
+# -------------------------------
+def _bench(make_backend, sessions=200, reruns=20):
+    """워커 둘(같은 저장소를 쓰는 SessionStore 둘) 로 rerun 마다 save, 다른 워커에서 load"""
+    first = SessionStore(make_backend(), flush_interval=0.05)
+    second = SessionStore(make_backend(), flush_interval=0.05)
+    keys = [new_session_id() for _ in range(sessions)]
+    start = time.perf_counter()
+    for step in range(reruns):
+        for i, key in enumerate(keys):
+            # 문제를 풀 때만 바뀌고 나머지 rerun 은 같은 기록 (입력 미리보기, 보기 바꾸기 등)
+            first.save(key, {"user_name": f"학생{i:03d}", "correct_count": step // 4, "cursor": step // 4})
+    save_us = (time.perf_counter() - start) / (sessions * reruns) * 1e6
+    first.flush()
+    moved = sum(second.load(key) == {"user_name": f"학생{i:03d}", "correct_count": (reruns - 1) // 4,
+                                     "cursor": (reruns - 1) // 4} for i, key in enumerate(keys))
+    stats = dict(first.stats)
+    first.close()
+    second.close()
+    return save_us, moved, stats
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="세션 진행 상태 저장소")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="Redis 프로토콜 대역 서버 (메모리)")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=6379)
+    serve.add_argument("--password")
+    bench = commands.add_parser("bench", help="sqlite / redis(대역 서버) 로 저장 지연과 워커 간 이어받기 측정")
+    bench.add_argument("--sessions", type=int, default=200)
+    bench.add_argument("--reruns", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        with MemoryRespServer((args.host, args.port), args.password) as server:
+            print(f"RESP 대역 서버: redis://{args.host}:{args.port}/0")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+        return 0
+
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp, MemoryRespServer(("127.0.0.1", 0)) as server:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = "redis://127.0.0.1:%d/0" % server.server_address[1]
+        ttl = DEFAULT_TTL_HOURS * 3600
+        for label, make_backend in [("sqlite", lambda: SQLiteBackend(os.path.join(tmp, "s.sqlite3"), ttl)),
+                                    ("redis", lambda: RedisBackend(url, ttl))]:
+            save_us, moved, stats = _bench(make_backend, args.sessions, args.reruns)
+            print(f"{label:<7} save {save_us:5.1f} µs/rerun  다른 워커에서 이어받음 {moved}/{args.sessions}  "
+                  f"쓴 기록 {stats['writes']} / save {stats['saves']} (같아서 건너뜀 {stats['unchanged']}, "
+                  f"묶음 {stats['batches']})")
+        server.shutdown()
+    return 0
+
+
+# -------------------------------
+# 실행: python -m services.session_store bench
+# -------------------------------
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+import datetime
+import threading
+
+from services import metrics
+
+# -------------------------------
+# 공용 구글 시트 클라이언트
+# -------------------------------
+# 인증 → authorize → open_by_url → worksheet 조회를 프로세스에서 한 번만 하고
+# 이후 호출은 캐시된 핸들을 그대로 쓴다.
+# 토큰은 만료 5분 전에 미리 갱신하고, 호출이 실패하면 한 번 다시 연결해서 재시도한다.
+# 단 append_rows 같은 쓰기는 여기서 바로 다시 보내지 않고 예외를 낸다 (연결/워크시트 조회처럼
+# 요청을 보내기 전 단계의 실패만 다시 시도한다). 서버가 이미 반영한 뒤 시간 초과가 났다면 그 묶음은
+# 호출한 쪽(로그 스풀)이 나중에 다시 보내므로 시트에 두 번 들어갈 수 있다 (최소 한 번 전달).
+
+SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+TOKEN_REFRESH_MARGIN = datetime.timedelta(minutes=5)
+
+
+class SheetsClient:
+    def __init__(self, service_account_info, spreadsheet_url, scopes=SCOPES, connect=None):
+        """connect: (info, url, scopes) -> (credentials, spreadsheet). 테스트에서 가짜 연결을 넣을 때 사용"""
+        self.service_account_info = dict(service_account_info)
+        self.spreadsheet_url = spreadsheet_url
+        self.scopes = scopes
+        self._connect = connect or _gspread_connect
+
+        self._lock = threading.RLock()
+        self._credentials = None
+        self._spreadsheet = None
+        self._worksheets = {}
+        self.stats = {"handshakes": 0, "handshakes_avoided": 0, "worksheet_lookups": 0,
+                      "token_refreshes": 0, "reconnects": 0}
+
+    @classmethod
+    def from_secrets(cls, s, **kwargs):
+        """st.secrets["connections"]["gsheets"] 에서 만든다 (service_account 하위 표가 있으면 그것을 사용)"""
+        info = s["service_account"] if "service_account" in s else s
+        return cls({
+            "project_id": info["project_id"],
+            "private_key": info["private_key"],
+            "client_email": info["client_email"],
+            "token_uri": info["token_uri"],
+        }, s["spreadsheet"], **kwargs)
+
+    # -------------------------------
+    # 연결 관리
+    # -------------------------------
+    def _spreadsheet_handle(self):
+        with self._lock:
+            if self._spreadsheet is None:
+                self._credentials, self._spreadsheet = self._connect(
+                    self.service_account_info, self.spreadsheet_url, self.scopes)
+                self.stats["handshakes"] += 1
+            else:
+                self.stats["handshakes_avoided"] += 1
+                self._refresh_token_if_needed()
+            return self._spreadsheet
+
+    def _refresh_token_if_needed(self):
+        creds = self._credentials
+        expiry = getattr(creds, "expiry", None)
+        if expiry is None:
+            return
+        if expiry - datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None) > TOKEN_REFRESH_MARGIN:
+            return
+        from google.auth.transport.requests import Request
+
+        with metrics.span("sheets.auth"):
+            creds.refresh(Request())
+        self.stats["token_refreshes"] += 1
+
+    def reset(self):
+        """캐시된 연결을 모두 버린다 (다음 호출에서 다시 연결)"""
+        with self._lock:
+            self._credentials = None
+            self._spreadsheet = None
+            self._worksheets.clear()
+
+    def raw_worksheet(self, name):
+        sh = self._spreadsheet_handle()
+        with self._lock:
+            ws = self._worksheets.get(name)
+            if ws is None:
+                with metrics.span("sheets.open"):
+                    ws = sh.worksheet(name)
+                self._worksheets[name] = ws
+                self.stats["worksheet_lookups"] += 1
+            return ws
+
+    def call(self, name, method, *args, idempotent=True, **kwargs):
+        """워크시트 메서드를 호출하고, 실패하면 다시 연결해서 한 번 더 시도한다
+
+        idempotent=False (쓰기) 면 메서드 호출 자체가 실패했을 때는 연결만 버리고 예외를 그대로 낸다.
+        """
+        for attempt in (0, 1):
+            try:
+                ws = self.raw_worksheet(name)
+            except Exception:
+                if attempt:
+                    raise
+                self.reset()
+                self.stats["reconnects"] += 1
+                continue
+            try:
+                return getattr(ws, method)(*args, **kwargs)
+            except Exception:
+                self.reset()
+                self.stats["reconnects"] += 1
+                if attempt or not idempotent:
+                    raise
+
+    def worksheet(self, name):
+        return WorksheetHandle(self, name)
+
+
+class WorksheetHandle:
+    """SheetsClient 를 거쳐 호출하는 워크시트 대리 객체 (만드는 비용 없음)"""
+
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    def append_rows(self, values, **kwargs):
+        with metrics.span("sheets.append"):
+            return self.client.call(self.name, "append_rows", values, idempotent=False, **kwargs)
+
+    def get_all_values(self, **kwargs):
+        with metrics.span(f"sheets.read.{self.name}"):
+            return self.client.call(self.name, "get_all_values", **kwargs)
+
+    def get_values(self, range_name, **kwargs):
+        with metrics.span(f"sheets.read.{self.name}"):
+            return self.client.call(self.name, "get_values", range_name, **kwargs)
+
+
+def _gspread_connect(info, url, scopes):
+    import gspread
+    from google.oauth2.service_account import Credentials
+
+    with metrics.span("sheets.auth"):
+        credentials = Credentials.from_service_account_info(info, scopes=scopes)
+        gc = gspread.authorize(credentials)
+    with metrics.span("sheets.open"):
+        return credentials, gc.open_by_url(url)
+
+
+# -------------------------------
+# 테스트 실행
+# -------------------------------
+if __name__ == "__main__":
+    class FakeSpreadsheet:
+        def __init__(self):
+            self.sheets = {"logs": [], "users": [["name", "password"], ["홍길동", "1234"]]}
+
+        def worksheet(self, name):
+            rows = self.sheets[name]
+
+            class FakeWorksheet:
+                def append_rows(self, values):
+                    rows.extend(values)
+                    if values[0][1] == "시간초과":
+                        raise TimeoutError("서버는 반영했지만 응답이 늦음")
+
+                def get_all_values(self):
+                    return [list(r) for r in rows]
+
+            return FakeWorksheet()
+
+    fake = FakeSpreadsheet()
+    client = SheetsClient({}, "fake://sheet", connect=lambda info, url, scopes: (None, fake))
+    logs = client.worksheet("logs")
+    for i in range(30):
+        logs.append_rows([["2024-01-01 00:00:00", f"학생{i}", "완전제곱식", "정답"]])
+    try:
+        logs.append_rows([["2024-01-01 00:00:00", "시간초과", "완전제곱식", "정답"]])
+    except TimeoutError:
+        pass
+    assert sum(row[1] == "시간초과" for row in fake.sheets["logs"]) == 1  # SheetsClient 는 쓰기를 다시 보내지 않는다
+    print(client.worksheet("users").get_all_values())
+    print("로그 줄 수:", len(fake.sheets["logs"]), "통계:", client.stats)
@@ -0,0 +1,156 @@
+import importlib
+import os
+import sys
+import threading
+import time
+
+# -------------------------------
+# 첫 실행(콜드 스타트) 관리
+# -------------------------------
+# 로그인 화면에 필요한 모듈만 먼저 불러오고, sympy/gspread 같은 무거운 모듈은
+# Warmup 스레드가 뒤에서 미리 불러온다. 실제로 쓰는 곳에서는 평소처럼 import 하면 되고,
+# 워밍업이 아직 진행 중이면 파이썬 import 잠금 때문에 그 모듈이 끝날 때까지 기다린다.
+#
+# python -m services.startup 으로 로그인 화면까지의 import 시간을 -X importtime 으로 재서
+# 요약하고, 예산(--budget-ms)을 넘거나 무거운 모듈이 딸려 오면 종료 코드 1 로 끝난다.
+
+# 로그인 화면을 그리기 전에 app.py 가 불러오는 모듈 (streamlit 은 이미 떠 있다고 본다)
+STARTUP_MODULES = [
+    "quizgen.answer_input",
+    "quizgen.bank",
+    "quizgen.record",
+    "quizgen.sampler",
+    "services.media",
+    "services.metrics",
+    "services.prefetch",
+    "services.session_store",
+    "services.storage",
+    "services.startup",
+]
+
+# 로그인 전에 불러오면 안 되는 모듈 (워밍업 스레드 몫)
+HEAVY_MODULES = ["sympy", "gspread", "google.oauth2", "pandas", "numpy"]
+
+WARMUP_MODULES = [
+    "gspread",
+    "google.oauth2.service_account",
+    "google.auth.transport.requests",
+    "quizgen.basic_formulas",
+]
+
+DEFAULT_BUDGET_MS = 100.0
+
+
+class Warmup:
+    """무거운 모듈을 백그라운드 스레드에서 미리 import"""
+
+    def __init__(self, modules=WARMUP_MODULES):
+        self.modules = list(modules)
+        self.timings = {}  # 모듈 이름 → 걸린 초
+        self.errors = {}
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        for name in self.modules:
+            start = time.perf_counter()
+            try:
+                importlib.import_module(name)
+            except Exception as e:  # 없는 모듈은 실제로 쓰는 쪽에서 다시 오류가 난다
+                self.errors[name] = repr(e)
+            self.timings[name] = time.perf_counter() - start
+        self._done.set()
+
+    def ready(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+
+# -------------------------------
+# import 시간 측정 (-X importtime)
+# -------------------------------
+_MARKER = "--startup-profile--"
+
+
+def parse_importtime(text):
+    """-X importtime 출력 → [(모듈, self µs, cumulative µs, 깊이)]"""
+    rows = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # 머리줄 "self [us] | cumulative | imported package"
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        rows.append((name.strip(), int(fields[0]), int(fields[1]), depth))
+    return rows
+
+
+def profile_imports(modules, preload=("streamlit",)):
+    """새 파이썬 프로세스에서 preload 다음에 modules 를 import 하며 측정한다"""
+    import subprocess
+
+    code = "".join(f"import {m}\n" for m in preload)
+    code += f"import sys\nprint({_MARKER!r}, file=sys.stderr, flush=True)\n"
+    code += "".join(f"import {m}\n" for m in modules)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=root, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return parse_importtime(proc.stderr.split(_MARKER, 1)[1])
+
+
+def summarize(rows, top=10):
+    """전체 시간, 패키지별 self 시간 상위 top 개, 불러온 모듈 이름 집합"""
+    total = sum(cumulative for _, _, cumulative, depth in rows if depth == 0)
+    by_package = {}
+    for name, self_us, _, _ in rows:
+        package = name.split(".")[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+    ranked = sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {"total_us": total, "packages": ranked, "modules": {name for name, *_ in rows}}
+
+
+def heavy_loaded(modules, heavy=HEAVY_MODULES):
+    return sorted(h for h in heavy if any(m == h or m.startswith(h + ".") for m in modules))
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="로그인 화면까지의 import 시간 측정")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--modules", nargs="+", default=STARTUP_MODULES,
+                        help="측정할 모듈 (기본: 로그인 화면 모듈)")
+    parser.add_argument("--repeat", type=int, default=3, help="가장 빠른 회차로 판정")
+    args = parser.parse_args(argv)
+
+    runs = [summarize(profile_imports(args.modules), args.top) for _ in range(args.repeat)]
+    best = min(runs, key=lambda r: r["total_us"])
+    print(f"콜드 스타트 import: {best['total_us'] / 1000:.1f} ms (예산 {args.budget_ms:.0f} ms, "
+          f"{args.repeat}회 중 최소)")
+    for package, self_us in best["packages"]:
+        print(f"  {package:<28} {self_us / 1000:8.1f} ms")
+
+    failed = False
+    if best["total_us"] / 1000 > args.budget_ms:
+        print("실패: 예산 초과")
+        failed = True
+    heavy = heavy_loaded(best["modules"])
+    if args.modules == STARTUP_MODULES and heavy:
+        print(f"실패: 로그인 전에 무거운 모듈을 불러옴: {', '.join(heavy)}")
+        failed = True
+    return 1 if failed else 0
+
+
+# -------------------------------
+# 실행: python -m services.startup [--budget-ms 100]
+# -------------------------------
+if __name__ == "__main__":
+    sys.exit(main())
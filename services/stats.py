@@ -0,0 +1,226 @@
+import os
+import re
+import sqlite3
+import threading
+
+# -------------------------------
+# 학생별 풀이 통계 (증분 집계)
+# -------------------------------
+# logs 는 늘어나기만 하므로, 보고서를 볼 때마다 전체를 읽어 세지 않고
+# (학생 이름, 공식) 마다 요약 한 줄을 SQLite 에 유지한다.
+#   attempts : 제출한 답 수 (로그 줄 수)
+#   correct  : 정답 수
+#   wrong1/2/3 : 1차/2차/3차 오답 수
+#   last_activity : 마지막 기록 시각
+#
+# 어디까지 반영했는지는 원본 로그의 커서(position)로 기억한다.
+#   - 로그를 쓸 때: 커서 바로 다음 줄이면 그 자리에서 반영하고 커서를 옮긴다 (apply)
+#   - 이어지지 않으면(다른 프로세스가 쓴 줄, 통계를 만들기 전의 줄): catch_up 이
+#     커서부터 chunk_size 줄씩 읽어서 반영한다. 한 chunk 는 한 트랜잭션이라
+#     중간에 멈춰도 두 번 세거나 빠뜨리는 줄이 없다.
+# 학생 한 명 / 전체 요약은 요약 테이블만 읽으므로 로그 크기와 상관없다.
+
+COUNTERS = ["attempts", "correct", "wrong1", "wrong2", "wrong3"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS student_stats (
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    wrong1 INTEGER NOT NULL DEFAULT 0,
+    wrong2 INTEGER NOT NULL DEFAULT 0,
+    wrong3 INTEGER NOT NULL DEFAULT 0,
+    last_activity TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (name, type)
+);
+CREATE TABLE IF NOT EXISTS stats_cursor (
+    source TEXT PRIMARY KEY,
+    position INTEGER NOT NULL
+);
+"""
+
+_UPSERT = f"""
+INSERT INTO student_stats (name, type, {", ".join(COUNTERS)}, last_activity)
+VALUES (?, ?, {", ".join("?" for _ in COUNTERS)}, ?)
+ON CONFLICT (name, type) DO UPDATE SET
+    {", ".join(f"{c} = {c} + excluded.{c}" for c in COUNTERS)},
+    last_activity = max(last_activity, excluded.last_activity)
+"""
+
+_WRONG = re.compile(r"오답\((\d)차\)")
+
+
+def classify(result):
+    """로그의 result 칸 → 더할 카운터 이름 (정답 / 1~3차 오답), 모르는 값이면 None"""
+    if result == "정답":
+        return "correct"
+    m = _WRONG.fullmatch(result)
+    if m and m.group(1) in "123":
+        return f"wrong{m.group(1)}"
+    return None
+
+
+def aggregate(rows):
+    """[timestamp, name, type, result] 줄들 → {(이름, 공식): [attempts, correct, wrong1, wrong2, wrong3, 마지막 시각]}"""
+    totals = {}
+    for row in rows:
+        if len(row) < 4:
+            continue
+        timestamp, name, problem_type, result = row[:4]
+        entry = totals.get((name, problem_type))
+        if entry is None:
+            entry = totals[(name, problem_type)] = [0, 0, 0, 0, 0, ""]
+        entry[0] += 1
+        column = classify(result)
+        if column is not None:
+            entry[COUNTERS.index(column)] += 1
+        if timestamp > entry[5]:
+            entry[5] = timestamp
+    return totals
+
+
+class LogStats:
+    """요약 테이블 + 커서. db/lock 을 넘기면 그 연결(같은 트랜잭션)을 같이 쓴다"""
+
+    def __init__(self, path=None, db=None, lock=None, source="logs"):
+        if db is None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+        self._db = db
+        self._lock = lock or threading.Lock()
+        self.source = source
+        self._db.executescript(_SCHEMA)
+        self.stats = {"applied": 0, "inline": 0, "chunks": 0, "gaps": 0}
+
+    # -------------------------------
+    # 반영 (호출하는 쪽이 잠금을 잡고 트랜잭션 안에서)
+    # -------------------------------
+    def _position(self):
+        row = self._db.execute("SELECT position FROM stats_cursor WHERE source = ?", (self.source,)).fetchone()
+        return row[0] if row else 0
+
+    def _apply_at(self, rows, start, end):
+        """커서가 start 일 때만 rows 를 더하고 커서를 end 로 옮긴다"""
+        if self._position() != start:
+            self.stats["gaps"] += 1
+            return False
+        self._db.executemany(_UPSERT, [(name, problem_type, *entry)
+                                       for (name, problem_type), entry in aggregate(rows).items()])
+        self._db.execute("INSERT INTO stats_cursor (source, position) VALUES (?, ?) "
+                         "ON CONFLICT (source) DO UPDATE SET position = excluded.position", (self.source, end))
+        self.stats["applied"] += len(rows)
+        return True
+
+    def apply(self, rows, start, end=None):
+        """원본 로그의 [start, end) 줄이 rows 일 때 반영. 커서와 이어지지 않으면 False (catch_up 몫)"""
+        end = start + len(rows) if end is None else end
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                applied = self._apply_at(rows, start, end)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            if applied:
+                self.stats["inline"] += 1
+            return applied
+
+    def position(self):
+        with self._lock:
+            return self._position()
+
+    def catch_up(self, read, chunk_size=1000, max_chunks=None):
+        """read(position, n) → (줄 목록, 다음 position). 커서부터 끝까지(또는 max_chunks 번) 반영한다"""
+        applied = chunks = 0
+        while max_chunks is None or chunks < max_chunks:
+            start = self.position()
+            rows, end = read(start, chunk_size)
+            if not rows:
+                break
+            with self._lock:
+                self._db.execute("BEGIN IMMEDIATE")
+                try:
+                    ok = self._apply_at(rows, start, end)
+                    self._db.execute("COMMIT")
+                except Exception:
+                    self._db.execute("ROLLBACK")
+                    raise
+                self.stats["chunks"] += 1
+            if ok:
+                applied += len(rows)
+            chunks += 1
+        return applied
+
+    def reset(self):
+        """요약을 지우고 커서를 처음으로 (다음 catch_up 이 전체를 다시 센다)"""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.execute("DELETE FROM student_stats")
+            self._db.execute("DELETE FROM stats_cursor WHERE source = ?", (self.source,))
+            self._db.execute("COMMIT")
+
+    # -------------------------------
+    # 조회 (요약 테이블만 읽음)
+    # -------------------------------
+    def _rows(self, where="", params=()):
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT name, type, {', '.join(COUNTERS)}, last_activity FROM student_stats{where} "
+                "ORDER BY name, type", params).fetchall()
+        return [dict(zip(["name", "type", *COUNTERS, "last_activity"], r)) for r in rows]
+
+    def student(self, name):
+        """{공식: 요약 딕셔너리}"""
+        return {r["type"]: r for r in self._rows(" WHERE name = ?", (name,))}
+
+    def summary(self):
+        """모든 (학생, 공식) 요약 (교사용 화면)"""
+        return self._rows()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# -------------------------------
+# 테스트 실행
+# -------------------------------
+if __name__ == "__main__":
+    import random
+    import tempfile
+    import time
+
+    random.seed(0)
+    names = [f"학생{i:03d}" for i in range(300)]
+    types = ["완전제곱식", "합차공식", "(x+a)(x+b)", "(ax+b)(cx+d)"]
+    results = ["정답"] * 6 + ["오답(1차)", "오답(1차)", "오답(2차)", "오답(3차)"]
+    log = [[f"2024-03-{1 + i // 20000:02d} 09:00:00", random.choice(names), random.choice(types),
+            random.choice(results)] for i in range(200_000)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stats = LogStats(os.path.join(tmp, "stats.sqlite3"))
+        start = time.perf_counter()
+        n = stats.catch_up(lambda pos, size: (log[pos:pos + size], pos + len(log[pos:pos + size])), chunk_size=5000)
+        print(f"따라잡기 {n}줄: {time.perf_counter() - start:.2f}초, 커서 {stats.position()}")
+
+        # 이어지는 줄은 바로 반영, 건너뛴 줄은 catch_up 으로
+        log.append(["2024-03-11 10:00:00", "학생000", "합차공식", "정답"])
+        assert stats.apply(log[-1:], len(log) - 1)
+        log.extend([["2024-03-11 10:00:01", "학생000", "합차공식", "오답(1차)"]] * 2)
+        assert not stats.apply(log[-1:], len(log) - 1)
+        stats.catch_up(lambda pos, size: (log[pos:pos + size], pos + len(log[pos:pos + size])))
+
+        expected = aggregate(log)
+        for row in stats.summary():
+            assert expected[(row["name"], row["type"])] == [row[c] for c in COUNTERS] + [row["last_activity"]]
+        start = time.perf_counter()
+        for name in names:
+            stats.student(name)
+        print(f"학생 한 명 조회: {(time.perf_counter() - start) / len(names) * 1e6:.0f} µs, "
+              f"요약 {len(stats.summary())}줄, 통계 {stats.stats}")
+        print(stats.student("학생000")["합차공식"])
+        stats.close()
@@ -0,0 +1,343 @@
+import csv
+import os
+import re
+import sqlite3
+import sys
+import threading
+
+from services.log_writer import SpooledLogWriter
+from services.login_index import LoginIndex, normalize_login_data
+from services.sheets import SheetsClient
+from services.stats import LogStats
+
+# -------------------------------
+# 사용자 / 풀이 기록 저장소
+# -------------------------------
+# app.py 는 저장소 객체 하나만 쓴다. 어느 구현을 쓸지는 secrets.toml 의 [storage] 로 정한다.
+#
+#   [storage]
+#   backend = "sqlite"                 # "gsheets" 또는 "sqlite"
+#   path = ".data/mathapp.sqlite3"     # sqlite 일 때 파일 위치 (app.py 기준 상대 경로)
+#
+# [storage] 가 없으면 [connections.gsheets] 가 있을 때 gsheets, 없으면 sqlite 를 쓴다
+# (secrets.toml 없이도 네트워크 없이 실행된다).
+#
+# 두 구현 모두 같은 메서드를 가진다.
+#   find_user(name, password) → 시트/DB 에 적힌 이름 또는 None
+#   users()                   → [["name", "password"], ...] (get_all_values 와 같은 모양)
+#   append_log(row)           → [timestamp, name, type, result] 한 줄 기록 (네트워크 대기 없음)
+#   logs(name, problem_type, since) → 조건에 맞는 기록 줄 목록
+#   student_stats(name)       → {공식: 누적 요약} (services.stats, 로그 크기와 상관없이 바로)
+#   stats_summary()           → 모든 (학생, 공식) 요약
+#   close()
+
+BACKENDS = ("gsheets", "sqlite")
+LOG_FIELDS = ["timestamp", "name", "type", "result"]
+DEFAULT_SQLITE_PATH = os.path.join(".data", "mathapp.sqlite3")
+DEFAULT_SPOOL_PATH = os.path.join(".spool", "logs.sqlite3")
+DEFAULT_STATS_PATH = os.path.join(".data", "stats.sqlite3")
+STATS_CHUNK_SIZE = 1000
+
+
+def _filter_logs(rows, name=None, problem_type=None, since=None):
+    return [row for row in rows
+            if (name is None or row[1] == name)
+            and (problem_type is None or row[2] == problem_type)
+            and (since is None or row[0] >= since)]
+
+
+# -------------------------------
+# 구글 시트 (기존 동작)
+# -------------------------------
+class SheetsStorage:
+    """users / logs 워크시트. 로그인은 캐시된 색인, 기록은 로컬 스풀을 거쳐 일괄 전송"""
+
+    def __init__(self, client, spool_path, stats_path, login_ttl=60.0):
+        self.client = client
+        self.login_index = LoginIndex(lambda: client.worksheet("users").get_all_values(), ttl=login_ttl)
+        # 통계는 로컬 SQLite 에 두고, 시트에 실제로 올라간 줄을 기준으로 센다
+        # (스풀에 있는 동안은 아직 안 셈 → 최대 flush_interval 초 늦게 반영)
+        self.log_stats = LogStats(stats_path)
+        self.log_writer = SpooledLogWriter(lambda: client.worksheet("logs"), spool_path,
+                                           on_flush=self._on_flush)
+        threading.Thread(target=self._catch_up, name="stats-catch-up", daemon=True).start()
+
+    def find_user(self, name, password):
+        return self.login_index.lookup(name, password)
+
+    def users(self):
+        return self.client.worksheet("users").get_all_values()
+
+    def append_log(self, row):
+        self.log_writer.enqueue(row)
+
+    def logs(self, name=None, problem_type=None, since=None):
+        """시트 전체를 읽어서 거른다 (보고서용, 느림). 아직 스풀에 있는 줄은 빠진다"""
+        return _filter_logs(self.client.worksheet("logs").get_all_values()[1:], name, problem_type, since)
+
+    def _read_logs(self, position, n):
+        # position 은 머리글을 뺀 데이터 줄 번호 (0부터) → 시트의 position + 2 번째 줄부터
+        rows = self.client.worksheet("logs").get_values(f"A{position + 2}:D{position + n + 1}")
+        return rows, position + len(rows)
+
+    def _catch_up(self):
+        try:
+            self.log_stats.catch_up(self._read_logs, STATS_CHUNK_SIZE)
+        except Exception:
+            pass  # 다음 전송 때 다시 따라잡는다
+
+    def _on_flush(self, rows, response):
+        # append_rows 응답의 updatedRange (logs!A101:D150) 로 올라간 위치를 알면 바로 반영
+        start = _appended_position(response)
+        if start is None or not self.log_stats.apply(rows, start):
+            self._catch_up()
+
+    def student_stats(self, name):
+        return self.log_stats.student(name)
+
+    def stats_summary(self):
+        return self.log_stats.summary()
+
+    def close(self):
+        self.log_writer.close()
+        self.log_stats.close()
+
+
+def _appended_position(response):
+    try:
+        updated = response["updates"]["updatedRange"]
+    except (TypeError, KeyError):
+        return None
+    m = re.search(r"![A-Z]+(\d+)", updated)
+    return int(m.group(1)) - 2 if m else None
+
+
+# -------------------------------
+# 로컬 SQLite (WAL, 네트워크 없음)
+# -------------------------------
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    password TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    password_key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS users_name_key ON users (name_key);
+CREATE TABLE IF NOT EXISTS logs (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    result TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS logs_name_type_time ON logs (name, type, timestamp);
+"""
+
+
+class SQLiteStorage:
+    """users / logs 테이블. 사용자는 정규화한 이름으로, 기록은 (이름, 유형, 시각) 으로 색인"""
+
+    def __init__(self, path, timeout=5.0):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=timeout)
+        # WAL + synchronous=NORMAL: 읽기가 쓰기를 막지 않고, 커밋마다 fsync 하지 않는다
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self.stats = {"logins": 0, "login_misses": 0, "logs": 0}
+        # 통계는 같은 파일/연결에 두고 로그를 넣는 트랜잭션에서 같이 갱신한다 (커서 = 로그 id)
+        self.log_stats = LogStats(db=self._db, lock=self._lock)
+        self.log_stats.catch_up(self._read_logs, STATS_CHUNK_SIZE)
+
+    def find_user(self, name, password):
+        name_key = normalize_login_data(name)
+        password_key = normalize_login_data(password)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT name FROM users WHERE name_key = ? AND password_key = ? ORDER BY id LIMIT 1",
+                (name_key, password_key),
+            ).fetchone()
+            self.stats["logins" if row else "login_misses"] += 1
+        return row[0] if row else None
+
+    def add_users(self, rows, replace=False):
+        """(이름, 비밀번호) 목록을 넣는다. replace 면 기존 명단을 지우고 넣는다"""
+        data = [(str(name), str(pw), normalize_login_data(name), normalize_login_data(pw)) for name, pw in rows]
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                if replace:
+                    self._db.execute("DELETE FROM users")
+                self._db.executemany(
+                    "INSERT INTO users (name, password, name_key, password_key) VALUES (?, ?, ?, ?)", data)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return len(data)
+
+    def users(self):
+        with self._lock:
+            rows = self._db.execute("SELECT name, password FROM users ORDER BY id").fetchall()
+        return [["name", "password"]] + [list(r) for r in rows]
+
+    def append_log(self, row):
+        timestamp, name, problem_type, result = row
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                log_id = self._db.execute("INSERT INTO logs (timestamp, name, type, result) VALUES (?, ?, ?, ?)",
+                                          (timestamp, name, problem_type, result)).lastrowid
+                inline = self.log_stats._apply_at([row], log_id - 1, log_id)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            self.stats["logs"] += 1
+        if not inline:  # 다른 프로세스가 같은 파일에 쓴 줄이 사이에 있음
+            self.log_stats.catch_up(self._read_logs, STATS_CHUNK_SIZE)
+
+    def _read_logs(self, position, n):
+        with self._lock:
+            rows = self._db.execute("SELECT id, timestamp, name, type, result FROM logs WHERE id > ? "
+                                    "ORDER BY id LIMIT ?", (position, n)).fetchall()
+        return [list(r[1:]) for r in rows], (rows[-1][0] if rows else position)
+
+    def logs(self, name=None, problem_type=None, since=None):
+        conditions, params = [], []
+        for column, value in (("name", name), ("type", problem_type)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            params.append(since)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows = self._db.execute(f"SELECT timestamp, name, type, result FROM logs{where} ORDER BY id",
+                                    params).fetchall()
+        return [list(r) for r in rows]
+
+    def student_stats(self, name):
+        return self.log_stats.student(name)
+
+    def stats_summary(self):
+        return self.log_stats.summary()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# -------------------------------
+# secrets.toml 로 고르기
+# -------------------------------
+def _section(secrets, key):
+    try:
+        return secrets[key] if key in secrets else None
+    except FileNotFoundError:  # secrets.toml 이 아예 없음
+        return None
+
+
+def backend_name(secrets):
+    config = _section(secrets, "storage") or {}
+    if "backend" in config:
+        backend = config["backend"]
+        if backend not in BACKENDS:
+            raise ValueError(f"알 수 없는 저장소: {backend} (가능: {', '.join(BACKENDS)})")
+        return backend
+    connections = _section(secrets, "connections") or {}
+    return "gsheets" if "gsheets" in connections else "sqlite"
+
+
+def from_secrets(secrets, base_dir="."):
+    """secrets (st.secrets 또는 딕셔너리) 에 맞는 저장소. 상대 경로는 base_dir 기준"""
+    config = _section(secrets, "storage") or {}
+    if backend_name(secrets) == "sqlite":
+        return SQLiteStorage(os.path.join(base_dir, config.get("path", DEFAULT_SQLITE_PATH)))
+    client = SheetsClient.from_secrets(secrets["connections"]["gsheets"])
+    return SheetsStorage(client, os.path.join(base_dir, config.get("spool_path", DEFAULT_SPOOL_PATH)),
+                         os.path.join(base_dir, config.get("stats_path", DEFAULT_STATS_PATH)))
+
+
+# -------------------------------
+# 명령줄: 명단 넣기 / 기록 내보내기 / 누적 요약 / 처리량 측정
+# -------------------------------
+def _bench(storage, threads=8, per_thread=2000):
+    import time
+
+    def work(t):
+        for i in range(per_thread):
+            storage.append_log(["2024-01-01 00:00:00", f"학생{t}", "완전제곱식", "정답" if i % 3 else "오답(1차)"])
+
+    workers = [threading.Thread(target=work, args=(t,)) for t in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return threads * per_thread / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="로컬 SQLite 저장소 관리")
+    parser.add_argument("--path", default=DEFAULT_SQLITE_PATH, help="SQLite 파일")
+    commands = parser.add_subparsers(dest="command", required=True)
+    users = commands.add_parser("import-users", help="name,password 열이 있는 CSV 로 명단을 바꾼다")
+    users.add_argument("csv")
+    users.add_argument("--append", action="store_true", help="기존 명단을 지우지 않고 추가")
+    export = commands.add_parser("export-logs", help="기록을 CSV 로 내보낸다")
+    export.add_argument("csv")
+    export.add_argument("--since", help="이 시각 이후만 (YYYY-MM-DD HH:MM:SS)")
+    report = commands.add_parser("stats", help="학생별 누적 요약 (교사용)")
+    report.add_argument("--name", help="이 학생만")
+    bench = commands.add_parser("bench", help="동시 기록 처리량 측정 (임시 파일)")
+    bench.add_argument("--threads", type=int, default=8)
+    bench.add_argument("--rows", type=int, default=2000, help="스레드당 줄 수")
+    args = parser.parse_args(argv)
+
+    if args.command == "bench":
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = SQLiteStorage(os.path.join(tmp, "bench.sqlite3"))
+            rate = _bench(storage, args.threads, args.rows)
+            print(f"append_log {args.threads}스레드: {rate:,.0f}줄/초, 저장된 줄 {len(storage.logs())}")
+            storage.close()
+        return 0
+
+    storage = SQLiteStorage(args.path)
+    try:
+        if args.command == "import-users":
+            with open(args.csv, newline="", encoding="utf-8-sig") as f:
+                rows = [(r["name"], r["password"]) for r in csv.DictReader(f)]
+            n = storage.add_users(rows, replace=not args.append)
+            print(f"{n}명 저장: {args.path}")
+        elif args.command == "stats":
+            rows = list(storage.student_stats(args.name).values()) if args.name else storage.stats_summary()
+            print("이름\t공식\t제출\t정답\t1차\t2차\t3차\t마지막")
+            for r in rows:
+                print("\t".join(str(r[k]) for k in ("name", "type", "attempts", "correct", "wrong1", "wrong2",
+                                                    "wrong3", "last_activity")))
+        else:
+            rows = storage.logs(since=args.since)
+            with open(args.csv, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(LOG_FIELDS)
+                writer.writerows(rows)
+            print(f"{len(rows)}줄 내보냄: {args.csv}")
+    finally:
+        storage.close()
+    return 0
+
+
+# -------------------------------
+# 실행: python -m services.storage import-users users.csv
+# -------------------------------
+if __name__ == "__main__":
+    sys.exit(main())